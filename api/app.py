@@ -1,11 +1,13 @@
 import os
 import hashlib
+import mimetypes
 import pathlib
-import shutil
+import re
 import urllib.parse as urlparse
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+import jinja2
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import (
@@ -17,6 +19,7 @@ from fastapi.responses import (
 )
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.datastructures import Headers
 from api.core.config import get_settings, validate_membership_webhook_settings
 from api.core.http_security import SecurityHeadersMiddleware
 from api.routers import auth as auth_router
@@ -28,7 +31,11 @@ from api.routers import pages as pages_router
 from api.routers import slug as slug_router
 from api.integrations.membership_platform import router as membership_webhook_router
 from api.services.slug_service import SlugService
-from api.services.card_display import configure_public_base
+from api.services.card_display import (
+    configure_public_base,
+    start_card_view_flusher,
+    stop_card_view_flusher,
+)
 
 app = FastAPI(title="Soomei Card API v2")
 
@@ -36,16 +43,46 @@ BASE = os.path.dirname(__file__)
 WEB = os.path.join(BASE, "..", "web")
 
 
+# Uploads endereçados por conteúdo (<nome>-<hash16>.jpg); assets com hash no nome saem do _STATIC_MANIFEST
+_IMMUTABLE_STATIC_RE = re.compile(r"/uploads/.+-[0-9a-f]{16}\.[a-z]+$")
+
+
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Assets versionados mantidos em memória: nome com hash -> (conteúdo, media type, etag)
+_STATIC_MANIFEST: dict[str, tuple[bytes, str, str]] = {}
+
+
 class CachedStaticFiles(StaticFiles):
-    def set_headers(self, scope, resp, path, stat_result):
-        # Cache forte para assets versionados por fingerprint
-        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    async def get_response(self, path, scope):
+        asset = _STATIC_MANIFEST.get(path.replace("\\", "/"))
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+        data, media_type, etag = asset
+        headers = {"Cache-Control": _IMMUTABLE_CACHE_CONTROL, "ETag": etag}
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        if etag in [tag.strip(" W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(data, media_type=media_type, headers=headers)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        resp = super().file_response(full_path, stat_result, scope, status_code)
+        # Cache forte apenas para arquivos cujo nome muda junto com o conteúdo
+        if _IMMUTABLE_STATIC_RE.search(os.fspath(full_path).replace("\\", "/")):
+            resp.headers["Cache-Control"] = _IMMUTABLE_CACHE_CONTROL
+        return resp
 
 
 app.mount("/static", CachedStaticFiles(directory=WEB), name="static")
-templates = Jinja2Templates(directory=os.path.join(BASE, "..", "templates"))
 
 settings = get_settings()
+# Em produção os templates não mudam em runtime: auto_reload desligado evita um stat() de mtime a cada render.
+templates = Jinja2Templates(
+    env=jinja2.Environment(
+        loader=jinja2.FileSystemLoader(os.path.join(BASE, "..", "templates")),
+        autoescape=True,
+        auto_reload=settings.app_env != "prod",
+    )
+)
 validate_membership_webhook_settings(settings)
 PUBLIC_BASE = settings.public_base_url
 configure_public_base(PUBLIC_BASE)
@@ -77,8 +114,9 @@ app.add_middleware(SecurityHeadersMiddleware, enforce_hsts=settings.app_env == "
 
 def _fingerprint_asset(rel_path: str) -> str:
     """
-    Gera cópia com hash curto no nome: "card.css" -> "card.<hash8>.css".
-    Retorna o nome do arquivo versionado (sem /static).
+    Registra o asset em memória com hash curto no nome: "card.css" -> "card.<hash8>.css".
+    Retorna o nome versionado (sem /static); o conteúdo é servido direto do manifesto,
+    sem cópia em disco nem stat/open por requisição.
     """
     src = pathlib.Path(WEB) / rel_path
     if not src.exists():
@@ -86,12 +124,10 @@ def _fingerprint_asset(rel_path: str) -> str:
         return rel_path.replace("\\", "/")
     data = src.read_bytes()
     h = hashlib.sha1(data).hexdigest()[:8]
-    stem = src.stem
-    suffix = src.suffix  # ex: ".css"
-    dst_name = f"{stem}.{h}{suffix}"
-    dst = src.with_name(dst_name)
-    if not dst.exists():
-        shutil.copy2(src, dst)
+    rel = pathlib.PurePosixPath(rel_path.replace("\\", "/"))
+    dst_name = str(rel.with_name(f"{rel.stem}.{h}{rel.suffix}"))
+    media_type = mimetypes.guess_type(src.name)[0] or "application/octet-stream"
+    _STATIC_MANIFEST[dst_name] = (data, media_type, f'"{h}"')
     return dst_name
 
 # Prepara href do CSS principal
@@ -103,6 +139,16 @@ CSS_HREF = f"/static/{_css_fp}"
 app.state.css_href = CSS_HREF
 templates.env.globals["css_href"] = CSS_HREF
 cards_router.set_css_href(CSS_HREF)
+try:
+    _card_js_fp = _fingerprint_asset("js/card.js")
+except Exception:
+    _card_js_fp = "js/card.js"
+cards_router.set_card_js_src(f"/static/{_card_js_fp}")
+try:
+    _edit_js_fp = _fingerprint_asset("js/edit.js")
+except Exception:
+    _edit_js_fp = "js/edit.js"
+card_edit_router.set_edit_js_src(f"/static/{_edit_js_fp}")
 card_edit_router.set_css_href(CSS_HREF)
 app.state.templates = templates
 
@@ -120,23 +166,37 @@ def favicon():
         return FileResponse(png_fallback, media_type="image/png")
     return Response(status_code=204)
 
+_BRAND_FOOTER_SNIPPET = (
+    "\n    <div class='edit-footer soomei-footer-mark'>\n"
+    "        <a class='soomei-watermark' href='https://soomei.cc' target='_blank' rel='noopener' aria-label='Soomei'>\n"
+    "          <span class='soomei-watermark__brand'>Soomei</span>\n"
+    "          <span class='soomei-watermark__text'>cartão digital</span>\n"
+    "        </a>\n"
+    "        <span class='soomei-footer-separator' aria-hidden='true'></span>\n"
+    "        <span class='soomei-footer-action'>{footer_action_html}</span>\n"
+    "      </div>\n  "
+)
+# Substituicoes prontas para cada layout; evitam concatenar o snippet a cada resposta.
+_BRAND_FOOTER_AFTER_MAIN = "</main>" + _BRAND_FOOTER_SNIPPET
+_BRAND_FOOTER_BEFORE_MAIN = _BRAND_FOOTER_SNIPPET + "</main>"
+_MAIN_CLOSE = "</main>"
+
+
 def _brand_footer_inject(html_doc: str) -> str:
-    snippet = (
-        "\n    <div class='edit-footer soomei-footer-mark'>\n"
-        "        <a class='soomei-watermark' href='https://soomei.cc' target='_blank' rel='noopener' aria-label='Soomei'>\n"
-        "          <span class='soomei-watermark__brand'>Soomei</span>\n"
-        "          <span class='soomei-watermark__text'>cartão digital</span>\n"
-        "        </a>\n"
-        "        <span class='soomei-footer-separator' aria-hidden='true'></span>\n"
-        "        <span class='soomei-footer-action'>{footer_action_html}</span>\n"
-        "      </div>\n  "
-    )
-    if "</main>" not in html_doc:
-        return html_doc + snippet
-    if "utility-shell" in html_doc:
-        return html_doc.replace("</main>", "</main>" + snippet, 1)
-    return html_doc.replace("</main>", snippet + "</main>", 1)
+    # Uma busca localiza </main>; a classe utility-shell fica na abertura do <main>, antes dele.
+    idx = html_doc.find(_MAIN_CLOSE)
+    if idx < 0:
+        return html_doc + _BRAND_FOOTER_SNIPPET
+    if html_doc.find("utility-shell", 0, idx) >= 0:
+        replacement = _BRAND_FOOTER_AFTER_MAIN
+    else:
+        replacement = _BRAND_FOOTER_BEFORE_MAIN
+    return html_doc[:idx] + replacement + html_doc[idx + len(_MAIN_CLOSE):]
+
 
+# Visitas ficam em memoria e sao gravadas periodicamente; o shutdown grava o restante
+app.add_event_handler("startup", start_card_view_flusher)
+app.add_event_handler("shutdown", stop_card_view_flusher)
 
 app.include_router(auth_router.router)
 app.include_router(slug_router.router)
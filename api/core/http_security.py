@@ -2,6 +2,22 @@ from __future__ import annotations
 
 from starlette.middleware.base import BaseHTTPMiddleware
 
+# Cabecalhos ja em bytes minusculos (formato de raw_headers), montados uma vez por processo.
+_BASE_HEADERS: tuple[tuple[bytes, bytes], ...] = (
+    (
+        b"content-security-policy",
+        b"default-src 'self'; "
+        b"img-src 'self' data:; "
+        b"style-src 'self' 'unsafe-inline' https://unpkg.com; "
+        b"script-src 'self' 'unsafe-inline' https://static.cloudflareinsights.com https://cdn.jsdelivr.net; "
+        b"connect-src 'self' https://cloudflareinsights.com https://static.cloudflareinsights.com",
+    ),
+    (b"x-frame-options", b"DENY"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"referrer-policy", b"no-referrer-when-downgrade"),
+)
+_HSTS_HEADER = (b"strict-transport-security", b"max-age=31536000; includeSubDomains")
+
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Inject baseline security headers (CSP, anti clickjacking, referrer policy)."""
@@ -9,20 +25,11 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, *, enforce_hsts: bool) -> None:
         super().__init__(app)
         self._enforce_hsts = enforce_hsts
+        self._headers = _BASE_HEADERS + ((_HSTS_HEADER,) if enforce_hsts else ())
 
     async def dispatch(self, request, call_next):
         response = await call_next(request)
-        response.headers.setdefault(
-            "Content-Security-Policy",
-            "default-src 'self'; "
-            "img-src 'self' data:; "
-            "style-src 'self' 'unsafe-inline' https://unpkg.com; "
-            "script-src 'self' 'unsafe-inline' https://static.cloudflareinsights.com https://cdn.jsdelivr.net; "
-            "connect-src 'self' https://cloudflareinsights.com https://static.cloudflareinsights.com",
-        )
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("Referrer-Policy", "no-referrer-when-downgrade")
-        if self._enforce_hsts:
-            response.headers.setdefault("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
+        # Equivale a headers.setdefault para cada item, sem passar pelo MutableHeaders a cada chamada.
+        present = {name for name, _ in response.raw_headers}
+        response.raw_headers.extend(item for item in self._headers if item[0] not in present)
         return response
@@ -10,6 +10,8 @@ from argon2 import PasswordHasher, exceptions as argon_exc
 _ph = PasswordHasher()
 _LEGACY_SALT = b"soomei"
 _PREFIX = "argon2$"
+# scrypt com dklen padrao (64 bytes) -> 128 caracteres hex
+_LEGACY_HEX_LEN = 128
 
 
 def hash_password(password: str) -> str:
@@ -18,8 +20,8 @@ def hash_password(password: str) -> str:
     return f"{_PREFIX}{hashed}"
 
 
-def _legacy_hash(password: str) -> str:
-    return hashlib.scrypt(password.encode(), salt=_LEGACY_SALT, n=2**14, r=8, p=1).hex()
+def _legacy_digest(password: str) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=_LEGACY_SALT, n=2**14, r=8, p=1)
 
 
 def verify_password(password: str, stored_hash: str | None) -> bool:
@@ -30,6 +32,13 @@ def verify_password(password: str, stored_hash: str | None) -> bool:
             return _ph.verify(hashed, password)
         except (argon_exc.VerifyMismatchError, argon_exc.VerificationError):
             return False
-    legacy = _legacy_hash(password)
-    return secrets.compare_digest(legacy, stored)
+    if len(stored) != _LEGACY_HEX_LEN:
+        # Hash vazio ou em formato desconhecido nunca confere; evita gastar um scrypt inteiro.
+        return False
+    try:
+        expected = bytes.fromhex(stored)
+    except ValueError:
+        return False
+    # Compara o digest cru em tempo constante, sem gerar a string hex do scrypt a cada login.
+    return secrets.compare_digest(_legacy_digest(password), expected)
 
@@ -34,7 +34,4 @@ def slug_in_use(db: Mapping[str, Any], value: str | None) -> bool:
     cards = db.get("cards") if isinstance(db, dict) else None
     if not isinstance(cards, dict):
         return False
-    for _uid, card in cards.items():
-        if isinstance(card, dict) and card.get("vanity") == value:
-            return True
-    return False
+    return any(isinstance(card, dict) and card.get("vanity") == value for card in cards.values())
@@ -1,10 +1,10 @@
 """Application service for membership platform webhooks."""
 from __future__ import annotations
 
-import json
 import logging
 import uuid
 
+import orjson
 from pydantic import ValidationError
 
 from api.core.config import Settings, get_settings
@@ -47,8 +47,9 @@ class MembershipWebhookService:
         if len(raw_body or b"") > int(self.settings.membership_webhook_max_payload_bytes or 1048576):
             raise WebhookPayloadError("Payload exceeds maximum size.")
         try:
-            payload = json.loads(raw_body.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            # orjson valida UTF-8 e faz o parse direto dos bytes, sem decodificar para str antes.
+            payload = orjson.loads(raw_body)
+        except orjson.JSONDecodeError as exc:
             raise WebhookPayloadError("Malformed JSON payload.") from exc
         if not isinstance(payload, dict):
             raise WebhookPayloadError("Webhook payload must be an object.")
@@ -21,6 +21,8 @@ RESERVED_CODES = {
     "NULL",
     "NONE",
 }
+_CODE_STRIP_RE = re.compile(r"[^A-Z0-9-]+")
+_DASH_RUN_RE = re.compile(r"-{2,}")
 
 
 class ReferralService:
@@ -32,8 +34,8 @@ class ReferralService:
         raw = unicodedata.normalize("NFKD", value or "")
         raw = "".join(ch for ch in raw if not unicodedata.combining(ch))
         raw = raw.upper().strip()
-        raw = re.sub(r"[^A-Z0-9-]+", "", raw)
-        raw = re.sub(r"-{2,}", "-", raw).strip("-")
+        raw = _CODE_STRIP_RE.sub("", raw)
+        raw = _DASH_RUN_RE.sub("-", raw).strip("-")
         return raw[:40]
 
     def ensure_code_for_card(self, *, card_uid: str, owner_email: str | None = None, preferred: str | None = None):
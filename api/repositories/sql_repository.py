@@ -5,9 +5,9 @@ import secrets
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from math import ceil
-from typing import Generic, Optional, TypeVar
+from typing import Generic, Mapping, Optional, TypeVar
 
-from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy import case, delete, func, or_, select, update
 
 from api.db.models import (
     AdminSession,
@@ -130,7 +130,13 @@ class SQLRepository:
             return session.execute(stmt).scalar_one_or_none()
 
     def email_exists(self, email: str) -> bool:
-        return self.get_user_by_email_ci(email) is not None
+        # So a chave: nao hidrata o User inteiro para responder sim/nao (checagem chamada a cada digitacao)
+        email_norm = (email or "").strip().lower()
+        if not email_norm:
+            return False
+        with get_session() as session:
+            stmt = select(User.email).where(func.lower(User.email) == email_norm).limit(1)
+            return session.execute(stmt).first() is not None
 
     def list_users(self) -> list[User]:
         with get_session() as session:
@@ -195,6 +201,32 @@ class SQLRepository:
             stmt = select(Card).where(Card.vanity == vanity)
             return session.execute(stmt).scalar_one_or_none()
 
+    def get_card_by_slug(self, slug: str) -> Optional[Card]:
+        """Resolve vanity ou UID numa unica consulta indexada; vanity tem prioridade."""
+        with get_session() as session:
+            stmt = (
+                select(Card)
+                .where(or_(Card.vanity == slug, Card.uid == slug))
+                .order_by(case((Card.vanity == slug, 0), else_=1))
+                .limit(1)
+            )
+            return session.execute(stmt).scalars().first()
+
+    def get_card_with_profile_by_slug(self, slug: str) -> tuple[Optional[Card], Optional[dict]]:
+        """Como get_card_by_slug, trazendo junto o perfil do dono (LEFT JOIN) na mesma consulta."""
+        with get_session() as session:
+            stmt = (
+                select(Card, Profile.data)
+                .outerjoin(Profile, Profile.email == Card.owner_email)
+                .where(or_(Card.vanity == slug, Card.uid == slug))
+                .order_by(case((Card.vanity == slug, 0), else_=1))
+                .limit(1)
+            )
+            row = session.execute(stmt).first()
+            if row is None:
+                return None, None
+            return row[0], row[1]
+
     def get_cards_by_owner(self, email: str) -> list[Card]:
         with get_session() as session:
             stmt = select(Card).where(Card.owner_email == email).order_by(Card.created_at.asc(), Card.uid.asc())
@@ -373,17 +405,20 @@ class SQLRepository:
             session.execute(stmt)
             session.commit()
 
-    def increment_card_views(self, uid: str) -> int:
+    def add_card_views(self, deltas: Mapping[str, int]) -> None:
+        # Aplica um lote de visitas acumuladas numa unica transacao; soma no banco, sem ler o card.
+        # Ordem fixa por uid: workers com lotes sobrepostos travam as linhas na mesma ordem (sem deadlock).
+        if not deltas:
+            return
+        now = datetime.now(timezone.utc)
         with get_session() as session:
-            card = session.get(Card, uid)
-            if not card:
-                return 0
-            card.metrics_views = int(card.metrics_views or 0) + 1
-            card.updated_at = datetime.now(timezone.utc)
+            for uid, count in sorted(deltas.items()):
+                session.execute(
+                    update(Card)
+                    .where(Card.uid == uid)
+                    .values(metrics_views=func.coalesce(Card.metrics_views, 0) + count, updated_at=now)
+                )
             session.commit()
-            session.refresh(card)
-            return int(card.metrics_views or 0)
-        return 0
 
     def update_card_custom_domain_meta(self, uid: str, meta: dict) -> None:
         with get_session() as session:
@@ -578,12 +578,12 @@ def pending(request: Request, uid: str = "", pin: str = ""):
         resp.delete_cookie("pending_pin", path="/auth")
         return resp
     if str(card.pin or "").strip() != pin_value:
-        resp = RedirectResponse(f"/onboard/{html.escape(uid_value)}/pin?error=PIN%20incorreto", status_code=303)
+        resp = RedirectResponse(f"/onboard/{uid_value}/pin?error=PIN%20incorreto", status_code=303)
         resp.delete_cookie("pending_pin", path="/auth")
         return resp
     owner = (card.owner_email or "").strip()
     if not owner:
-        resp = RedirectResponse(f"/onboard/{html.escape(uid_value)}", status_code=303)
+        resp = RedirectResponse(f"/onboard/{uid_value}", status_code=303)
         resp.delete_cookie("pending_pin", path="/auth")
         return resp
     user = _sql_repo.get_user(owner)
@@ -592,7 +592,7 @@ def pending(request: Request, uid: str = "", pin: str = ""):
         _sql_repo.upsert_user(owner, password_hash="")
         user = _sql_repo.get_user(owner)
     if user and user.email_verified_at:
-        resp = RedirectResponse(f"/{html.escape(card.vanity or uid_value)}", status_code=303)
+        resp = RedirectResponse(f"/{card.vanity or uid_value}", status_code=303)
         resp.delete_cookie("pending_pin", path="/auth")
         return resp
     email_sent = auth_service.resend_verification(owner)
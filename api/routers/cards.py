@@ -1,23 +1,35 @@
 from __future__ import annotations
 import base64
+import hashlib
 import html
 import io
 import json
+import mmap
 import os
 import re
+import threading
+import time
 import urllib.parse as urlparse
+from collections import OrderedDict
+from functools import lru_cache
+import orjson
 import qrcode
+import qrcode.image.svg as qrcode_svg
+from PIL import Image
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from api.core import csrf
-from api.services.card_service import find_card_by_slug
+from api.services.card_service import find_card_by_slug, find_card_with_profile
 from api.services.card_display import (
     DEFAULT_AVATAR,
     FEATURED_DEFAULT_COLOR,
+    NON_DIGIT_RE,
+    VCARD_PHOTO_SIZE,
+    VCARD_PHOTO_SUFFIX,
     featured_icon_svg,
     build_pix_emv,
     get_card_view_count,
-    increment_card_view,
+    record_card_view,
     normalize_featured_icon,
     normalize_external_url,
     profile_complete,
@@ -28,6 +40,7 @@ from api.services.card_display import (
     _card_entry_path,
     _card_public_base,
     _card_share_url,
+    _is_hex_color,
     _normalize_hex_color,
     _mix_hex_color,
     _pick_text_color,
@@ -39,6 +52,7 @@ from api.repositories.sql_repository import SQLRepository
 from api.referrals.service import ReferralService
 router = APIRouter(prefix="", tags=["cards"])
 CSS_HREF = "/static/card.css"
+CARD_JS_SRC = "/static/js/card.js"
 BRAND_FOOTER = lambda html_doc: html_doc
 SETTINGS = None
 PUBLIC_BASE = ""
@@ -61,6 +75,24 @@ LINK_TYPE_VALUES = {
     "portfolio",
     "link",
 }
+# Deteccao de plataforma dos links: cada alternativa e um lookahead ancorado no inicio, entao
+# a ordem de prioridade vale mesmo quando a marca aparece mais adiante no texto; lastgroup diz qual casou.
+_PLATFORM_RE = re.compile(
+    r"^(?:"
+    r"(?=\s*@|.*instagram)(?P<instagram>)"
+    r"|(?=.*linkedin)(?P<linkedin>)"
+    r"|(?=.*(?:facebook|(?<![a-z0-9-])fb\.com))(?P<facebook>)"
+    r"|(?=.*(?:youtube|youtu\.be))(?P<youtube>)"
+    r"|(?=.*tiktok)(?P<tiktok>)"
+    r"|(?=.*(?:twitter|(?<![a-z0-9-])x\.com))(?P<twitter>)"
+    r"|(?=.*github)(?P<github>)"
+    r"|(?=.*behance)(?P<behance>)"
+    r"|(?=.*dribbble)(?P<dribbble>)"
+    r")",
+    re.DOTALL,
+)
+_SITE_WORD_RE = re.compile(r"site|pagina")
+_MAPS_RE = re.compile(r"maps\.google|goo\.gl/maps|maps\.app\.goo\.gl|waze\.com|maps\.apple\.com")
 _sql_repo = SQLRepository()
 _referral_service = ReferralService()
 
@@ -70,9 +102,27 @@ def _normalize_link_type(value: object) -> str:
     if raw in {"", "auto"}:
         return ""
     return raw if raw in LINK_TYPE_VALUES else ""
+
+
+@lru_cache(maxsize=4096)
+def _link_platform(label: str, href: str, link_type: str = "") -> str:
+    """Plataforma do link (tipo explicito ou deteccao por texto); memoizada por (label, href, tipo)."""
+    explicit = _normalize_link_type(link_type)
+    if explicit:
+        return explicit
+    s = f"{(label or '').lower()} {(href or '').lower()}"
+    m = _PLATFORM_RE.match(s)
+    if m: return m.lastgroup
+    if (href or "").startswith("tel:"): return "phone"
+    if (href or "").startswith("mailto:"): return "email"
+    if _SITE_WORD_RE.search(s): return "site"
+    return "link"
 def set_css_href(value: str) -> None:
     global CSS_HREF
     CSS_HREF = value or "/static/card.css"
+def set_card_js_src(value: str) -> None:
+    global CARD_JS_SRC
+    CARD_JS_SRC = value or "/static/js/card.js"
 def set_brand_footer(func):
     global BRAND_FOOTER
     BRAND_FOOTER = func or (lambda html_doc: html_doc)
@@ -86,17 +136,243 @@ def configure_environment(*, settings, public_base: str, public_base_host: str,
 
 def _find_card(slug: str):
     return find_card_by_slug(slug)
+def _find_card_with_profile(slug: str):
+    return find_card_with_profile(slug)
 def _templates(request: Request):
     tpl = getattr(getattr(request.app, "state", None), "templates", None)
     if tpl:
         return tpl
     raise RuntimeError("Templates nao configurados")
+
+
+def _render_qr_png(payload: str, box_size: int = 8) -> bytes:
+    qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=box_size, border=4)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    # Mantem a imagem em 1 bit (sem convert("RGB")): PNG ~3x menor e codificacao ~2x mais rapida
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=512)
+def _qr_png_bytes(payload: str, box_size: int = 8) -> bytes:
+    """PNG do QR por payload; a rasterizacao PIL e o custo dominante e a maioria dos payloads se repete."""
+    return _render_qr_png(payload, box_size)
+
+
+def _qr_data_url(payloads: tuple[str, ...], render_png=_render_qr_png) -> str:
+    """
+    data URL do QR: PNG do primeiro payload que couber; se nenhum couber, SVG do ultimo.
+    Devolve "" quando nem o SVG pode ser gerado (quem chama decide a mensagem de erro).
+    """
+    for payload in payloads:
+        try:
+            return "data:image/png;base64," + base64.b64encode(render_png(payload)).decode("ascii")
+        except Exception:
+            continue
+    try:
+        buf = io.BytesIO()
+        qrcode.make(payloads[-1], image_factory=qrcode_svg.SvgImage).save(buf)
+        return "data:image/svg+xml;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+    except Exception:
+        return ""
+
+
+@lru_cache(maxsize=2048)
+def _pix_qr_data_url(payload: str) -> str:
+    """data URL do QR Pix por payload EMV; revisitas nao repetem rasterizacao nem base64."""
+    return _qr_data_url((payload,))
+
+
+def _fold_vcard_b64(raw: bytes | mmap.mmap) -> str:
+    """base64 dobrado para vCard (76 colunas, CRLF + espaco); encodebytes ja quebra as linhas em C."""
+    return base64.encodebytes(raw).decode("ascii").rstrip("\n").replace("\n", "\r\n ")
+
+
+def _upload_path(photo_url: str) -> str:
+    """Caminho em disco de um upload a partir da URL publica (ignora ?v= e qualquer diretorio da URL)."""
+    return os.path.join(UPLOADS_DIR, os.path.basename(photo_url.partition("?")[0]))
+
+
+@lru_cache(maxsize=128)
+def _vcard_photo_line(photo_path: str, photo_mtime_ns: int) -> str:
+    """
+    Linha PHOTO do .vcf com a foto original em base64; mtime na chave invalida o cache.
+    Uploads sao redimensionados para 800px, entao cada entrada fica na casa das centenas de KB.
+    Levanta OSError se o arquivo nao puder ser lido (quem chama cai no PHOTO;VALUE=URI).
+    O arquivo e mapeado em memoria e codificado direto do mmap, sem a copia intermediaria de read().
+    """
+    with open(photo_path, "rb") as fh:
+        if not os.fstat(fh.fileno()).st_size:
+            return ""
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            folded = _fold_vcard_b64(mm)
+    typ = "PNG" if os.path.splitext(photo_path)[1].lower() == ".png" else "JPEG"
+    return f"PHOTO;ENCODING=b;TYPE={typ}:{folded}"
+
+
+@lru_cache(maxsize=1024)
+def _vcard_photo_b64(photo_path: str, photo_mtime_ns: int) -> str:
+    """
+    Miniatura JPEG (160px) da foto em base64 ja dobrada para vCard; mtime na chave invalida o cache.
+    Usa a miniatura gravada no upload (<foto>.qr.jpg) quando existe; fotos antigas caem no PIL.
+    Levanta excecao se a imagem nao puder ser lida (quem chama decide o fallback).
+    """
+    try:
+        with open(photo_path + VCARD_PHOTO_SUFFIX, "rb") as fh:
+            raw = fh.read()
+    except OSError:
+        with Image.open(photo_path) as src:
+            # draft faz o libjpeg decodificar ja reduzido (escala DCT); no-op para outros formatos
+            src.draft("RGB", VCARD_PHOTO_SIZE)
+            im = src.convert("RGB")
+        im.thumbnail(VCARD_PHOTO_SIZE)
+        buf = io.BytesIO()
+        im.save(buf, format="JPEG", quality=70)
+        raw = buf.getvalue()
+    return _fold_vcard_b64(raw) if raw else ""
+
+
+def _offline_vcards(
+    full_name: str,
+    title: str,
+    wa_digits: str,
+    email: str,
+    share_url: str,
+    photo_line: str = "",
+) -> tuple[str, ...]:
+    """
+    vCards tentados no QR offline, em ordem: com foto (se houver) e o basico.
+    Cabecalho e rodape sao montados uma vez e compartilhados pelas duas versoes.
+    """
+    head = f"BEGIN:VCARD\r\nVERSION:3.0\r\nFN:{full_name}\r\n"
+    tail = "\r\n".join(
+        line
+        for line in (
+            f"TITLE:{title}" if title else "",
+            f"TEL;TYPE=CELL:{wa_digits}" if wa_digits else "",
+            f"EMAIL:{email}" if email else "",
+            f"URL:{share_url}",
+            "END:VCARD",
+        )
+        if line
+    )
+    basic = head + tail
+    # Sem foto a versao "com foto" seria identica; so o basico e tentado
+    return (f"{head}{photo_line}\r\n{tail}", basic) if photo_line else (basic,)
+
+
+@lru_cache(maxsize=2048)
+def _offline_vcard_qr(
+    full_name: str,
+    title: str,
+    wa_digits: str,
+    email: str,
+    share_url: str,
+    photo_path: str,
+    photo_mtime_ns: int,
+) -> str:
+    """
+    data URL do QR do vCard offline exibido no cartao publico.
+    photo_mtime_ns entra na chave do cache para que a troca da foto gere um novo QR.
+    """
+    # PHOTO inline (base64, downscaled for QR). Em offline, omite em caso de falha.
+    photo_line = ""
+    if photo_path:
+        try:
+            folded = _vcard_photo_b64(photo_path, photo_mtime_ns)
+            if folded:
+                photo_line = f"PHOTO;ENCODING=b;TYPE=JPEG:{folded}"
+        except Exception:
+            photo_line = ""
+    # Tenta com foto; se falhar por tamanho, tenta sem foto; depois fallback para SVG do basico.
+    return _qr_data_url(_offline_vcards(full_name, title, wa_digits, email, share_url, photo_line))
+
+
+# HTML do cartao para visitantes (nao-dono): so depende de perfil, cartao e host, entao
+# reaproveitamos o render. A chave inclui o perfil e os campos do cartao que a pagina usa,
+# logo edicoes geram outra entrada; o TTL curto cobre o que vem de fora (selo de destaque expirando).
+# Cada entrada guarda tambem o ETag do corpo, para responder 304 a revisitas sem re-render.
+_VISITOR_HTML_TTL_SECONDS = 60.0
+_VISITOR_HTML_MAX_BYTES = 8 * 1024 * 1024
+_VISITOR_HTML_CACHE_CONTROL = "private, no-cache"
+_visitor_html_cache: OrderedDict[tuple, tuple[float, bytes, str]] = OrderedDict()
+_visitor_html_bytes = 0
+_visitor_html_lock = threading.Lock()
+# Fora da chave: metrics (muda a cada visita e a pagina do visitante nao mostra) e pin (segredo).
+_VISITOR_HTML_CARD_FIELDS = ("uid", "vanity", "status", "custom_domain")
+
+
+def _visitor_html_key(prof: dict, slug: str, card: dict | None, request: Request | None) -> tuple | None:
+    card_state = {field: card.get(field) for field in _VISITOR_HTML_CARD_FIELDS} if isinstance(card, dict) else None
+    try:
+        state = orjson.dumps(
+            (prof, card_state),
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            default=str,
+        )
+    except TypeError:
+        return None
+    scheme = (request.url.scheme if request else "") or ""
+    return (slug, _request_host(request), scheme, state)
+
+
+def _visitor_html_get(key: tuple) -> tuple[bytes, str] | None:
+    with _visitor_html_lock:
+        entry = _visitor_html_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            _visitor_html_drop(key)
+            return None
+        _visitor_html_cache.move_to_end(key)
+        return entry[1], entry[2]
+
+
+def _visitor_html_put(key: tuple, body: bytes) -> str:
+    """Guarda o HTML do visitante e devolve o ETag calculado para o corpo."""
+    global _visitor_html_bytes
+    etag = f'"{hashlib.blake2b(body, digest_size=10).hexdigest()}"'
+    if len(body) > _VISITOR_HTML_MAX_BYTES:
+        return etag
+    with _visitor_html_lock:
+        _visitor_html_drop(key)
+        _visitor_html_cache[key] = (time.monotonic() + _VISITOR_HTML_TTL_SECONDS, body, etag)
+        _visitor_html_bytes += len(body)
+        while _visitor_html_bytes > _VISITOR_HTML_MAX_BYTES:
+            _visitor_html_drop(next(iter(_visitor_html_cache)))
+    return etag
+
+
+def _visitor_html_drop(key: tuple) -> None:
+    # Chamar com _visitor_html_lock adquirido.
+    global _visitor_html_bytes
+    entry = _visitor_html_cache.pop(key, None)
+    if entry is not None:
+        _visitor_html_bytes -= len(entry[1])
+
+
+def _etag_matches(request: Request | None, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "") if request else ""
+    return bool(if_none_match) and etag in [tag.strip(" W/") for tag in if_none_match.split(",")]
+
+
+_QR_PNG_CACHE_CONTROL = "public, max-age=3600"
+
+
 _FOOTER_SLOT = "<span id='footerActionSlot' class='footer-auth-slot'></span>"
 _FOOTER_PLACEHOLDER = "{footer_action_html}"
 
 
 def _apply_brand_footer(html_doc: str, action_html: str | None = None) -> str:
     footer_html = BRAND_FOOTER(html_doc) if BRAND_FOOTER else html_doc
+    return _fill_footer_action(footer_html, action_html)
+
+
+def _fill_footer_action(footer_html: str, action_html: str | None = None) -> str:
+    """Preenche o slot de acao de um documento que ja passou por BRAND_FOOTER."""
     if _FOOTER_PLACEHOLDER in footer_html:
         replacement = action_html or ""
         return footer_html.replace(_FOOTER_PLACEHOLDER, replacement, 1)
@@ -113,6 +389,106 @@ def _apply_brand_footer(html_doc: str, action_html: str | None = None) -> str:
     return footer_html
 
 
+@lru_cache(maxsize=1024)
+def _pix_amount_page(css_href: str, brand_footer, entry_href: str, bg_hex: str, photo: str) -> str:
+    """
+    Pagina ?pix=amount ja com o rodape da marca; por requisicao so resta preencher a acao do rodape.
+    css_href e brand_footer entram na chave para o cache acompanhar set_css_href/set_brand_footer.
+    """
+    page = f"""
+    <!doctype html><html lang='pt-br'><head>
+    <meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'>
+    <link rel='stylesheet' href='{css_href}'><title>Pagamento Pix</title></head><body>
+    <main class='wrap utility-shell'>
+      <section class='utility-card utility-card--pix carbon' style='background-color: {html.escape(bg_hex)}'>
+        <a class='utility-back' href='{entry_href}' aria-label='Voltar' title='Voltar'>&larr;</a>
+        <div class='utility-brand'>
+          <img src='/static/img/soomei_logo.png' alt='Soomei' class='utility-logo'>
+          <span>Soomei</span>
+        </div>
+        <div class='utility-support'>
+        <p class='utility-kicker'>Pagamento instantâneo</p>
+        </div>
+        <h1>Gerar Pix</h1>
+        <p class='utility-intro'>Informe o valor para criar um QR Code pronto para pagamento. Se quiser deixar aberto, mantenha 0,00.</p>
+        {f"<img class='utility-avatar' src='{photo}' alt='foto'>" if photo else ""}
+        <div class='utility-panel'>
+          <h2>Valor do Pix</h2>
+          <p class='utility-note'>Use vírgula para centavos. Exemplo: 150,00</p>
+          <div class='utility-amount-row'>
+            <label class='utility-currency' for='pixAmount'>R$</label>
+            <input id='pixAmount' class='utility-input' type='tel' inputmode='numeric' pattern='[0-9,]*' placeholder='0,00' autocomplete='off'>
+            <a id='genPix' class='btn utility-primary' href='#'>Gerar QR <svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='14' height='14'><path d='M9 18l6-6-6-6' fill='none' stroke='currentColor' stroke-width='2' stroke-linecap='round' stroke-linejoin='round'/></svg></a>
+          </div>
+        </div>
+      </section>
+    </main>
+    <script>
+    (function(){{
+      var btn = document.getElementById('genPix');
+      var amt = document.getElementById('pixAmount');
+      function maskMoney(){{
+        if (!amt) return;
+        var s = (amt.value||'').replace(/\\D/g,'');
+        if (s.length === 0) {{ amt.value = ''; return; }}
+        while (s.length < 3) s = '0' + s;
+        var intp = s.slice(0, -2).replace(/^0+/, '') || '0';
+        var decp = s.slice(-2);
+        amt.value = intp + ',' + decp;
+      }}
+      if (amt) {{
+        amt.addEventListener('input', maskMoney);
+        amt.addEventListener('blur', maskMoney);
+      }}
+      if (btn && amt){{
+        btn.addEventListener('click', function(e){{
+          e.preventDefault();
+          var s = (amt.value||'').replace(/\\D/g,'');
+          if (!s) s = '0';
+          var cents = parseInt(s, 10) || 0;
+          var v = (cents/100).toFixed(2).replace('.', ',');
+          window.location.href = '{entry_href}?pix=qr&v=' + encodeURIComponent(v);
+        }});
+      }}
+    }})();
+    </script>
+    """
+    return brand_footer(page) if brand_footer else page
+
+
+@lru_cache(maxsize=512)
+def _offline_page(css_href: str, brand_footer, entry_href: str, bg_hex: str, photo: str, data_url: str) -> str:
+    """Pagina ?offline ja com o rodape da marca; data_url vem do cache de _offline_vcard_qr."""
+    page = f"""
+    <!doctype html><html lang='pt-br'><head>
+    <meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'>
+    <link rel='stylesheet' href='{css_href}'><title>Modo Offline</title></head><body>
+    <main class='wrap utility-shell'>
+      <section class='utility-card carbon' style='background-color: {html.escape(bg_hex)}'>
+        <a class='utility-back' href='{entry_href}' aria-label='Voltar' title='Voltar'>&larr;</a>
+        <div class='utility-brand'>
+          <img src='/static/img/soomei_logo.png' alt='Soomei' class='utility-logo'>
+          <span>Soomei</span>
+        </div>
+        <p class='utility-kicker'>Contato sem internet</p>
+        <h1>Modo Offline</h1>
+        <p class='utility-intro'>Salve o contato direto na agenda do cliente mesmo quando a internet não colaborar. Basta apontar a câmera para o QR Code.</p>
+        {f"<img class='utility-avatar' src='{photo}' alt='foto'>" if photo else ""}
+        <div class='utility-panel'>
+          <img class='utility-qr' src='{data_url}' alt='QR Offline'>
+          <p class='utility-note'><strong>Dica:</strong> tire um print desta tela e marque como favorita na galeria para acesso rápido.</p>
+          <p class='utility-note'>Não recomendamos imprimir este código: ele não recebe atualizações online. Para materiais impressos, use o QR Code online.</p>
+        </div>
+        <div class='utility-actions'>
+          <a class='btn ghost' href='{entry_href}'>Voltar ao cartão</a>
+        </div>
+      </section>
+    </main>
+    </body></html>
+    """
+    return brand_footer(page) if brand_footer else page
+
+
 def _footer_action_markup(*, is_owner: bool, slug: str, csrf_token_html: str = "") -> str:
     slug_safe = html.escape(slug)
     if is_owner:
@@ -199,6 +575,75 @@ def _public_message_response(
     if footer_token:
         csrf.set_csrf_cookie(response, footer_token)
     return response
+# Separador de milhar pt-BR sem mexer no locale do processo (global e nao thread-safe)
+_PT_BR_THOUSANDS = str.maketrans(",", ".")
+_WA_SHARE_TEXT = urlparse.quote_plus("Ola! Vim pelo seu cartao da Soomei.")
+_VIEW_CHIP_ICON = (
+    "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true'><path fill='currentColor' d='M12 5c-5 0-9.27 3.11-11 7 1.73 3.89 6 7 11 7s9.27-3.11 11-7c-1.73-3.89-6-7-11-7zm0 11a4 4 0 1 1 0-8 4 4 0 0 1 0 8zm0-6a2 2 0 1 0 .001 4.001A2 2 0 0 0 12 10z'/></svg>"
+)
+_EDIT_GEAR_ICON = (
+    "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>"
+    "<path fill='currentColor' d='M19.14 12.94c.04-.31.06-.63.06-.94s-.02-.63-.06-.94l2.03-1.58a.5.5 0 0 0 .12-.64l-1.92-3.32a.5.5 0 0 0-.6-.22l-2.39.96c-.5-.4-1.05-.73-1.63-.95l-.36-2.5A.5.5 0 0 0 13.9 2h-3.8a.5.5 0 0 0-.5.42l-.36 2.5c-.58.22-1.12.55-1.63.95l-2.39-.96a.5.5 0 0 0-.6.22L.7 7.84a.5.5 0 0 0 .12.64L2.85 10.06c-.04.31-.06.63-.06.94s.02.63.06.94L.82 13.52a.5.5 0 0 0-.12.64l1.92 3.32a.5.5 0 0 0 .6.22l2.39-.96c.5.4 1.05.73 1.63.95l.36 2.5a.5.5 0 0 0 .5.42h3.8a.5.5 0 0 0 .5-.42l.36-2.5c.58-.22 1.12-.55 1.63-.95l2.39.96a.5.5 0 0 0 .6-.22l1.92-3.32a.5.5 0 0 0-.12-.64l-2.03-1.58zM12 15a3 3 0 1 1 0-6 3 3 0 0 1 0 6z'/>"
+    "</svg>"
+)
+_WHATSAPP_ICON = (
+    "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>"
+    "<path fill='currentColor' d='M20.52 3.48A11.86 11.86 0 0 0 12.02 0C5.39 0 .04 5.35.04 11.98c0 2.11.56 4.16 1.62 5.98L0 24l6.2-1.62a11.96 11.96 0 0 0 5.82 1.49h0c6.63 0 12.02-5.35 12.02-11.98 0-3.21-1.25-6.23-3.52-8.41ZM12.02 22.1h0c-1.9 0-3.76-.5-5.39-1.44l-.39-.23-3.68.96.98-3.59-.25-.37A9.77 9.77 0 0 1 2 11.98C2 6.48 6.52 2 12.02 2c2.62 0 5.08 1.02 6.93 2.86A9.71 9.71 0 0 1 22.06 12c0 5.5-4.52 10.1-10.04 10.1Zm5.53-7.49c-.3-.15-1.78-.88-2.05-.98-.27-.1-.47-.15-.68.15-.2.3-.78.98-.96 1.18-.18.2-.36.22-.66.07-.3-.15-1.27-.47-2.42-1.5-.9-.8-1.5-1.78-1.68-2.08-.18-.3-.02-.46.13-.61.13-.13.3-.34.45-.51.15-.17.2-.3.3-.5.1-.2.05-.37-.03-.52-.08-.15-.68-1.63-.93-2.23-.25-.6-.5-.52-.68-.53l-.58-.01c-.2 0-.52.08-.8.37-.27.3-1.05 1.03-1.05 2.5s1.07 2.9 1.23 3.1c.15.2 2.1 3.2 5.07 4.48.71.31 1.27.5 1.7.64.72.23 1.37.2 1.88.12.57-.08 1.78-.73 2.03-1.44.25-.7.25-1.3.18-1.43-.07-.13-.27-.2-.57-.35Z'/>"
+    "</svg>"
+)
+# Icones dos atalhos de links (ate 4) ja montados como <svg> completo: uma busca no dict por link.
+_QUICK_LINK_SVG_OPEN = "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>"
+_QUICK_LINK_ICONS = {
+    "facebook": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M22 12A10 10 0 1 0 10.5 21.9v-6.9H7.9v-3h2.6V9.2c0-2.6 1.6-4 3.9-4 1.1 0 2.2.2 2.2.2v2.5h-1.2c-1.2 0-1.6.8-1.6 1.6V12h2.8l-.4 3h-2.4v6.9A10 10 0 0 0 22 12z"/>' + "</svg>",
+    "linkedin": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M4.98 3.5A2.5 2.5 0 1 1 0 3.5a2.5 2.5 0 0 1 4.98 0zM0 8h5v16H0V8zm7 0h4.8v2.2h.1c.7-1.3 2.5-2.7 5.1-2.7 5.4 0 6.4 3.6 6.4 8.3V24h-5v-8c0-1.9 0-4.4-2.7-4.4-2.7 0-3.1 2.1-3.1 4.3V24H7V8z"/>' + "</svg>",
+    "instagram": _QUICK_LINK_SVG_OPEN + '<rect x="3" y="3" width="18" height="18" rx="5" ry="5" fill="none" stroke="currentColor" stroke-width="2"/><circle cx="12" cy="12" r="4" fill="none" stroke="currentColor" stroke-width="2"/><circle cx="17.5" cy="6.5" r="1.5" fill="currentColor"/>' + "</svg>",
+    "youtube": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M23.5 6.2c-.2-1.1-1.1-2-2.2-2.3C19.3 3.5 12 3.5 12 3.5s-7.3 0-9.3.4C1.6 4.2.7 5.1.5 6.2.1 8.4 0 10.2 0 12s.1 3.6.5 5.8c.2 1.1 1.1 2 2.2 2.3 2 .4 9.3.4 9.3.4s7.3 0 9.3-.4c1.1-.3 2-1.2 2.2-2.3.4-2.2.5-4 .5-5.8s-.1-3.6-.5-5.8zM9.8 15.5v-7l6 3.5-6 3.5z"/>' + "</svg>",
+    "tiktok": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M16.7 2c.5 3 2.1 4.8 4.8 5.1v3.5c-1.8.1-3.4-.4-4.8-1.4v6.7c0 3.5-2.3 6.1-5.8 6.1-3.2 0-5.8-2.3-5.8-5.5 0-3.6 3.3-6.3 6.9-5.5v3.7c-1.6-.5-3.1.4-3.1 1.8 0 1.1.9 1.9 2 1.9 1.4 0 2.2-.9 2.2-2.6V2h3.6z"/>' + "</svg>",
+    "whatsapp": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M20.5 3.5A11.9 11.9 0 0 0 12 0C5.4 0 0 5.4 0 12c0 2.1.6 4.1 1.6 5.9L0 24l6.2-1.6A12 12 0 0 0 12 23.9c6.6 0 12-5.4 12-12 0-3.2-1.2-6.2-3.5-8.4zM12 21.9c-1.8 0-3.6-.5-5.2-1.4l-.4-.2-3.6.9 1-3.5-.3-.4A9.8 9.8 0 1 1 12 21.9zm5.4-7.4c-.3-.1-1.7-.8-2-.9-.3-.1-.5-.1-.7.2s-.8.9-.9 1.1c-.2.2-.4.2-.7.1-1.9-.9-3.1-1.7-4.2-3.7-.3-.5.3-.5.8-1.6.1-.2.1-.4 0-.6-.1-.1-.7-1.6-.9-2.2-.2-.6-.5-.5-.7-.5h-.6c-.2 0-.6.1-.9.4-.3.3-1 1-1 2.4s1 2.8 1.2 3c.1.2 2 3.1 4.9 4.3 1.8.8 2.5.9 3.4.8.5-.1 1.7-.7 2-1.4.2-.7.2-1.3.1-1.4-.1-.1-.3-.2-.6-.3z"/>' + "</svg>",
+    "site": _QUICK_LINK_SVG_OPEN + '<circle cx="12" cy="12" r="10" fill="none" stroke="currentColor" stroke-width="2"/><path d="M2 12h20M12 2c3 3 3 17 0 20M12 2c-3 3-3 17 0 20" fill="none" stroke="currentColor" stroke-width="2"/>' + "</svg>",
+    "email": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M4 5h16a2 2 0 0 1 2 2v10a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V7a2 2 0 0 1 2-2zm8 8 8-5H4l8 5zm0 2L4 10v7h16v-7l-8 5z"/>' + "</svg>",
+    "calendar": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M7 2h2v3h6V2h2v3h3a2 2 0 0 1 2 2v13a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V7a2 2 0 0 1 2-2h3V2zm13 8H4v10h16V10zM6 12h4v4H6v-4z"/>' + "</svg>",
+    "store": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M4 4h16l2 6v2h-2v8H4v-8H2v-2l2-6zm2 8v6h12v-6a4 4 0 0 1-4-1.5A4 4 0 0 1 10 12a4 4 0 0 1-4 0zm-.6-6-1.1 4h15.4l-1.1-4H5.4z"/>' + "</svg>",
+    "course": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M12 3 1 8l11 5 9-4.1V16h2V8L12 3zm-6 9v4.2c0 1.7 3.1 3.8 6 3.8s6-2.1 6-3.8V12l-6 2.7L6 12z"/>' + "</svg>",
+    "community": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M8 11a4 4 0 1 1 0-8 4 4 0 0 1 0 8zm8.5 1a3.5 3.5 0 1 1 0-7 3.5 3.5 0 0 1 0 7zM8 13c3.3 0 6 1.7 6 3.8V20H2v-3.2C2 14.7 4.7 13 8 13zm8.5.5c2.8 0 5 1.4 5 3.1V20H16v-3.2c0-1.1-.5-2.1-1.4-2.9.6-.2 1.2-.4 1.9-.4z"/>' + "</svg>",
+    "portfolio": _QUICK_LINK_SVG_OPEN + '<path fill="currentColor" d="M9 4h6l1 2h4a2 2 0 0 1 2 2v10a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h4l1-2zm3 13a4 4 0 1 0 0-8 4 4 0 0 0 0 8zm0-2.2a1.8 1.8 0 1 1 0-3.6 1.8 1.8 0 0 1 0 3.6z"/>' + "</svg>",
+    "link": _QUICK_LINK_SVG_OPEN + '<path fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" d="M10 13a5 5 0 0 0 7.1 0l2.1-2.1a5 5 0 0 0-7.1-7.1L11 4.9"/><path fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" d="M14 11a5 5 0 0 0-7.1 0l-2.1 2.1a5 5 0 0 0 7.1 7.1L13 19.1"/>' + "</svg>",
+}
+_QUICK_LINK_DEFAULT_ICON = (
+    _QUICK_LINK_SVG_OPEN + '<circle cx="12" cy="12" r="9" fill="none" stroke="currentColor" stroke-width="2"/>' + "</svg>"
+)
+# Icones dos botoes fixos (site, e-mail, endereco, Pix), iguais nas versoes ativa e desabilitada.
+_FIXED_ICON_SVG_OPEN = "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'>"
+_FIXED_SITE_ICON = (
+    _FIXED_ICON_SVG_OPEN
+    + "<circle cx='12' cy='12' r='10' stroke='currentColor' stroke-width='2' fill='none'/><path d='M2 12h20M12 2c3 3 3 19 0 20M12 2c-3 3-3 19 0 20' stroke='currentColor' stroke-width='2' fill='none'/></svg>"
+)
+_FIXED_EMAIL_ICON = (
+    _FIXED_ICON_SVG_OPEN
+    + "<path fill='currentColor' d='M4 6h16a1 1 0 0 1 1 1v10a1 1 0 0 1-1 1H4a1 1 0 0 1-1-1V7a1 1 0 0 1 1-1zm8 6 9-6H3l9 6zm0 2L3 8v9h18V8l-9 6z'/></svg>"
+)
+_FIXED_MAPS_ICON = (
+    _FIXED_ICON_SVG_OPEN
+    + "<path fill='currentColor' d='M12 2C8.69 2 6 4.69 6 8c0 4.5 6 12 6 12s6-7.5 6-12c0-3.31-2.69-6-6-6zm0 8a2 2 0 110-4 2 2 0 010 4z'/></svg>"
+)
+_FIXED_PIX_ICON = (
+    _FIXED_ICON_SVG_OPEN
+    + "<path fill='currentColor' d='M3 3h6v6H3V3zm2 2v2h2V5H5zm10-2h6v6h-6V3zm2 2v2h2V5h-2zM3 15h6v6H3v-6zm2 2v2h2v-2H5zm10 0h2v2h2v2h-4v-4zm0-4h2v2h-2v-2zm4 0h2v2h-2v-2z'/></svg>"
+)
+# Versoes desabilitadas dos botoes fixos nao dependem do perfil: montadas uma vez no import.
+def _fixed_action_disabled(kind: str, icon: str, label: str, hint: str) -> str:
+    return (
+        f"<span class='btn fixed {kind} disabled' role='button' aria-disabled='true' tabindex='-1'>"
+        f"<span class='fixed-action-icon'>{icon}</span><span class='fixed-action-copy'><strong>{label}</strong><small>{hint}</small></span></span>"
+    )
+
+
+_FIXED_SITE_DISABLED = _fixed_action_disabled("website", _FIXED_SITE_ICON, "Site", "Não informado")
+_FIXED_EMAIL_DISABLED = _fixed_action_disabled("email", _FIXED_EMAIL_ICON, "E-mail", "Não informado")
+_FIXED_MAPS_DISABLED = _fixed_action_disabled("maps", _FIXED_MAPS_ICON, "Endereço", "Não informado")
+_FIXED_PIX_DISABLED = _fixed_action_disabled("pix", _FIXED_PIX_ICON, "Pagamento Pix", "Não configurado")
+
+
 def visitor_public_card(
     prof: dict,
     slug: str,
@@ -207,35 +652,55 @@ def visitor_public_card(
     card: dict | None = None,
     request: Request | None = None,
 ):
+    cache_key = None if is_owner else _visitor_html_key(prof, slug, card, request)
+    if cache_key is not None:
+        cached = _visitor_html_get(cache_key)
+        if cached is not None:
+            cached_body, etag = cached
+            headers = {"ETag": etag, "Cache-Control": _VISITOR_HTML_CACHE_CONTROL}
+            if _etag_matches(request, etag):
+                return Response(status_code=304, headers=headers)
+            return HTMLResponse(cached_body, headers=headers)
     footer_action_html, csrf_token_value = _footer_action_context(
         request,
         is_owner=is_owner,
         slug=slug,
     )
-    raw_photo = (prof.get("photo_url", "") or "") if prof else ""
-    raw_cover = (prof.get("cover_url", "") or "") if prof else ""
-    cover_show = bool(prof.get("cover_show", True)) if prof else True
+    # Le cada campo do perfil uma unica vez; o restante da funcao usa apenas os locais.
+    # Nome, cargo, foto e o e-mail do vCard offline seguem sem strip, como sempre foram exibidos.
+    _g = prof.get if prof else {}.get
+    full_name = _g("full_name", "") or ""
+    title = _g("title", "") or ""
+    wa_raw = (_g("whatsapp", "") or "").strip()
+    email_raw = _g("email_public", "") or ""
+    email_pub = email_raw.strip()
+    raw_photo = _g("photo_url", "") or ""
+    raw_cover = _g("cover_url", "") or ""
+    cover_show = bool(_g("cover_show", True))
+    address_text = (_g("address", "") or "").strip()
+    pix_key = (_g("pix_key", "") or "").strip()
+    theme_base = _g("theme_color", "#000000") or "#000000"
+    google_review_url = (_g("google_review_url", "") or "").strip()
+    google_review_show = bool(_g("google_review_show", True))
+    site_url = _g("site_url", "")
+    slug_e = html.escape(slug)
+    full_name_e = html.escape(full_name)
+    title_e = html.escape(title)
     raw_cover_public = raw_cover if cover_show else ""
     photo_src = resolve_photo(raw_photo)
     photo = html.escape(photo_src) if photo_src else ""
     cover = html.escape(raw_cover_public) if raw_cover_public else ""
-    wa_raw = (prof.get("whatsapp", "") or "").strip()
-    wa_digits = "".join([c for c in wa_raw if c.isdigit()])
-    email_pub = (prof.get("email_public", "") or "").strip()
-    address_text = (prof.get("address", "") or "").strip() if prof else ""
-    pix_key = (prof.get("pix_key", "") or "").strip()
-    google_review_url = (prof.get("google_review_url", "") or "").strip()
-    google_review_show = bool(prof.get("google_review_show", True))
+    wa_digits = NON_DIGIT_RE.sub("", wa_raw)
     try:
         total_views = max(0, int(view_count))
     except (TypeError, ValueError):
         total_views = 0
     view_chip = ""
     if is_owner:
-        formatted_views = f"{total_views:,}".replace(",", ".")
+        formatted_views = format(total_views, ",d").translate(_PT_BR_THOUSANDS)
         view_chip = (
             "<div class='view-chip' title='Total de acessos de visitantes'>"
-            "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true'><path fill='currentColor' d='M12 5c-5 0-9.27 3.11-11 7 1.73 3.89 6 7 11 7s9.27-3.11 11-7c-1.73-3.89-6-7-11-7zm0 11a4 4 0 1 1 0-8 4 4 0 0 1 0 8zm0-6a2 2 0 1 0 .001 4.001A2 2 0 0 0 12 10z'/></svg>"
+            f"{_VIEW_CHIP_ICON}"
             f"<span class='view-chip__count'>{formatted_views}</span>"
             "<span class='view-chip__label'>visualizações</span>"
             "</div>"
@@ -243,7 +708,7 @@ def visitor_public_card(
     connector_badge = ""
     connector_modal = ""
     card_uid = (card or {}).get("uid") if isinstance(card, dict) else ""
-    spotlight_badge_show = bool(prof.get("spotlight_badge_show", True))
+    spotlight_badge_show = bool(_g("spotlight_badge_show", True))
     if card_uid and spotlight_badge_show:
         try:
             active_badge = _referral_service.repository.active_badge(str(card_uid))
@@ -268,25 +733,7 @@ def visitor_public_card(
                 "</div>"
                 "</div>"
             )
-    links_list = prof.get("links", []) or []
-    def platform(label: str, href: str, link_type: str = "") -> str:
-        explicit = _normalize_link_type(link_type)
-        if explicit:
-            return explicit
-        s = f"{(label or '').lower()} {(href or '').lower()}"
-        if "instagram" in s or s.strip().startswith("@"): return "instagram"
-        if "linkedin" in s: return "linkedin"
-        if "facebook" in s or "fb.com" in s: return "facebook"
-        if "youtube" in s or "youtu.be" in s or s.strip().startswith("@"): return "youtube"
-        if "tiktok" in s: return "tiktok"
-        if "twitter" in s or "x.com" in s: return "twitter"
-        if "github" in s: return "github"
-        if "behance" in s: return "behance"
-        if "dribbble" in s: return "dribbble"
-        if (href or "").startswith("tel:"): return "phone"
-        if (href or "").startswith("mailto:"): return "email"
-        if ("site" in s or "website" in s or "pagina" in s): return "site"
-        return "link"
+    links_list = _g("links", []) or []
     site_link = None
     other_links = []
     for item in links_list:
@@ -294,21 +741,18 @@ def visitor_public_card(
             continue
         label = item.get("label", "")
         href = item.get("href", "")
-        plat = platform(label, href, item.get("type") or item.get("category", ""))
         # Avoid duplicate maps icon: if address in profile, skip map links in grid
-        if address_text and href:
-            _hl = (href or "").lower()
-            if ("maps.google" in _hl) or ("goo.gl/maps" in _hl) or ("maps.app.goo.gl" in _hl) or ("waze.com" in _hl) or ("maps.apple.com" in _hl):
-                continue
+        # (antes de detectar a plataforma, para nao classificar links descartados)
+        if address_text and href and _MAPS_RE.search(href.lower()):
+            continue
+        # Tipo vem do JSON salvo: normaliza antes da chamada em cache (lista/dict nao sao hashable)
+        plat = _link_platform(label, href, _normalize_link_type(item.get("type") or item.get("category")))
         if plat == "site" and site_link is None:
             site_link = (label, href)
         else:
             other_links.append((label, href, plat))
     share_url = _card_share_url(card, slug, request)
     card_base = _card_public_base(card, request)
-    share_text = urlparse.quote_plus(f"Ola! Vim pelo seu cartao da Soomei.")
-    share_base_message = "Este é o meu Cartão de Visita Digital"
-    share_base_message_js = json.dumps(share_base_message)
     cover_block = (
         "<div class='card-cover'>"
         f"<img src='{cover}' alt='capa do cartão'>"
@@ -316,84 +760,37 @@ def visitor_public_card(
         if cover
         else ""
     )
-    actions = []
-    if wa_digits:
-        actions.append(f"<a class='btn action whatsapp' target='_blank' rel='noopener' href='https://wa.me/{wa_digits}?text={share_text}'>WhatsApp</a>")
-    if site_link:
-        _, href = site_link
-        actions.append(f"<a class='btn action website' target='_blank' rel='noopener' href='{html.escape(href)}'>Site</a>")
-    if email_pub:
-        actions.append(f"<a class='btn action email' href='mailto:{html.escape(email_pub)}'>E-mail</a>")
-    actions.append("<a class='btn action share' id='shareBtn' href='#'>Compartilhar</a>")
-    if pix_key:
-        actions.append(f"<a class='btn action pix' id='pixBtn' data-key='{html.escape(pix_key)}' href='#'>Copiar PIX</a>")
     # Engrenagem de edição discreta no canto superior direito (somente dono)
     owner_gear = (
-        "<a class='edit-gear' href='/edit/"
-        + html.escape(slug)
-        + "' title='Editar' aria-label='Editar'>"
-        + "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>"
-        + "<path fill='currentColor' d='M19.14 12.94c.04-.31.06-.63.06-.94s-.02-.63-.06-.94l2.03-1.58a.5.5 0 0 0 .12-.64l-1.92-3.32a.5.5 0 0 0-.6-.22l-2.39.96c-.5-.4-1.05-.73-1.63-.95l-.36-2.5A.5.5 0 0 0 13.9 2h-3.8a.5.5 0 0 0-.5.42l-.36 2.5c-.58.22-1.12.55-1.63.95l-2.39-.96a.5.5 0 0 0-.6.22L.7 7.84a.5.5 0 0 0 .12.64L2.85 10.06c-.04.31-.06.63-.06.94s.02.63.06.94L.82 13.52a.5.5 0 0 0-.12.64l1.92 3.32a.5.5 0 0 0 .6.22l2.39-.96c.5.4 1.05.73 1.63.95l.36 2.5a.5.5 0 0 0 .5.42h3.8a.5.5 0 0 0 .5-.42l.36-2.5c.58-.22 1.12-.55 1.63-.95l2.39.96a.5.5 0 0 0 .6-.22l1.92-3.32a.5.5 0 0 0-.12-.64l-2.03-1.58zM12 15a3 3 0 1 1 0-6 3 3 0 0 1 0 6z'/>"
-        + "</svg>"
-        + "</a>"
+        f"<a class='edit-gear' href='/edit/{slug_e}' title='Editar' aria-label='Editar'>{_EDIT_GEAR_ICON}</a>"
         if is_owner
         else ""
     )
-    actions_html = "".join(actions)
-    link_items = []
-    for label, href, plat in other_links:
-        cls = f"brand-{plat}"
-        icon = ""
-        if plat == "facebook":
-            icon = (
-                "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'>"
-                "<path fill='currentColor' d='M22 12A10 10 0 1 0 10.5 21.9v-6.9H7.9v-3h2.6V9.2c0-2.6 1.6-4 3.9-4 1.1 0 2.2.2 2.2.2v2.5h-1.2c-1.2 0-1.6.8-1.6 1.6V12h2.8l-.4 3h-2.4v6.9A10 10 0 0 0 22 12z'/>"
-                "</svg> "
-            )
-        elif plat == "linkedin":
-            icon = (
-                "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'>"
-                "<path fill='currentColor' d='M4.98 3.5A2.5 2.5 0 1 1 0 3.5a2.5 2.5 0 0 1 4.98 0zM0 8h5v16H0V8zm7 0h4.8v2.2h.1c.7-1.3 2.5-2.7 5.1-2.7 5.4 0 6.4 3.6 6.4 8.3V24h-5v-8c0-1.9 0-4.4-2.7-4.4-2.7 0-3.1 2.1-3.1 4.3V24H7V8z'/>"
-                "</svg> "
-            )
-        elif plat == "youtube":
-            icon = (
-                "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' width='16' height='16' aria-hidden='true'>"
-                "<path fill='currentColor' d='M23.5 6.2c-.2-1.1-1.1-2-2.2-2.3C19.3 3.5 12 3.5 12 3.5s-7.3 0-9.3.4C1.6 4.2.7 5.1.5 6.2.1 8.4 0 10.2 0 12s.1 3.6.5 5.8c.2 1.1 1.1 2 2.2 2.3 2 .4 9.3.4 9.3.4s7.3 0 9.3-.4c1.1-.3 2-1.2 2.2-2.3.4-2.2.5-4 .5-5.8s-.1-3.6-.5-5.8zM9.8 15.5v-7l6 3.5-6 3.5z'/>"
-                "</svg> "
-            )
-        elif plat == "instagram":
-            icon = (
-                "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>"
-                "<path fill='currentColor' d='M7 2C4.24 2 2 4.24 2 7v10c0 2.76 2.24 5 5 5h10c2.76 0 5-2.24 5-5V7c0-2.76-2.24-5-5-5H7zm0 2h10c1.66 0 3 1.34 3 3v10c0 1.66-1.34 3-3 3H7c-1.66 0-3-1.34-3-3V7c0-1.66 1.34-3 3-3zm11 1.5a1 1 0 100 2 1 1 0 000-2zM12 7a5 5 0 100 10 5 5 0 000-10z'/>"
-                "</svg>"
-            )
-        text = html.escape(label or plat.title())
-        link_items.append(
-            f"<li><a class='link {cls}' href='{html.escape(href)}' target='_blank' rel='noopener'>{icon}{text}</a></li>"
-        )
-    links_grid_html = "".join(link_items)
-    portfolio_raw = prof.get("portfolio_images") or []
+    portfolio_raw = _g("portfolio_images") or []
     portfolio_images = []
     if isinstance(portfolio_raw, list):
         for item in portfolio_raw[:5]:
             val = (item or "").strip()
             if val:
                 portfolio_images.append(html.escape(val))
-    portfolio_enabled_flag = bool(prof.get("portfolio_enabled"))
+    portfolio_enabled_flag = bool(_g("portfolio_enabled"))
     portfolio_section = ""
     if portfolio_enabled_flag and portfolio_images:
-        slides_html = "".join(
-            f"<div class='portfolio-slide{' is-active' if idx == 0 else ''}' style='--i:{idx};'>"
-            f"<div class='portfolio-frame'><div class='portfolio-glow'></div><img src='{src}' alt='Portfolio {idx + 1}' loading='lazy'></div>"
-            f"</div>"
-            for idx, src in enumerate(portfolio_images)
-        )
-        dots_html = "".join(
-            f"<button type='button' class='portfolio-dot{' is-active' if idx == 0 else ''}' data-index='{idx}' aria-label='Mostrar foto {idx + 1}' aria-current='{'true' if idx == 0 else 'false'}'></button>"
-            for idx in range(len(portfolio_images))
-        )
-        plural = "s" if len(portfolio_images) != 1 else ""
+        # Slides e pontos em uma passada so, acumulando em listas para um unico join cada
+        slide_parts = []
+        dot_parts = []
+        for idx, src in enumerate(portfolio_images):
+            active = " is-active" if idx == 0 else ""
+            slide_parts.append(
+                f"<div class='portfolio-slide{active}' style='--i:{idx};'>"
+                f"<div class='portfolio-frame'><div class='portfolio-glow'></div><img src='{src}' alt='Portfolio {idx + 1}' loading='lazy'></div>"
+                f"</div>"
+            )
+            dot_parts.append(
+                f"<button type='button' class='portfolio-dot{active}' data-index='{idx}' aria-label='Mostrar foto {idx + 1}' aria-current='{'true' if idx == 0 else 'false'}'></button>"
+            )
+        slides_html = "".join(slide_parts)
+        dots_html = "".join(dot_parts)
         portfolio_section = f"""
         <section class='portfolio-showcase'>
           <div class='portfolio-head'>
@@ -411,736 +808,42 @@ def visitor_public_card(
           </div>
         </section>
         """
-    scripts = """
-
-    <script>
-
-    (function(){
-
-      var __s = document.createElement('style');
-
-      if (__s) {
-
-        __s.textContent = '.is-hidden{display:none!important}';
-
-        document.head.appendChild(__s);
-
-      }
-
-      function getShareData(){
-
-        var pageUrl = window.location.href;
-
-        var text = """ + share_base_message_js + """ + " " + pageUrl;
-
-        return {url: pageUrl, text: text};
-
-      }
-
-      var shareBtn = document.getElementById('shareBtn');
-
-      if (shareBtn) {
-
-        shareBtn.addEventListener('click', function(e){
-
-          e.preventDefault();
-
-          var data = getShareData();
-
-          if (navigator.share) {
-
-            navigator.share({title: document.title, text: data.text}).catch(function(err){
-
-              if (err && err.name === 'AbortError') { return; }
-
-            });
-
-            return;
-
-          }
-
-          if (navigator.clipboard && window.isSecureContext) {
-
-            navigator.clipboard.writeText(data.url).then(function(){
-
-              shareBtn.textContent = 'Link copiado';
-
-              setTimeout(function(){ shareBtn.textContent = 'Compartilhar'; }, 1500);
-
-            }).catch(function(){});
-
-            return;
-
-          }
-
-          var ta = document.createElement('textarea');
-
-          ta.value = data.url;
-
-          ta.setAttribute('readonly','');
-
-          ta.style.position = 'absolute';
-
-          ta.style.left = '-9999px';
-
-          document.body.appendChild(ta);
-
-          ta.select();
-
-          try {
-
-            document.execCommand('copy');
-
-            shareBtn.textContent = 'Link copiado';
-
-            setTimeout(function(){ shareBtn.textContent = 'Compartilhar'; }, 1500);
-
-          } catch (_e) {}
-
-          document.body.removeChild(ta);
-
-        });
-
-      }
-
-      var pixBtn = document.getElementById('pixBtn');
-
-      if (pixBtn) {
-
-        pixBtn.addEventListener('click', function(e){
-
-          e.preventDefault();
-
-          var key = pixBtn.getAttribute('data-key') || '';
-
-          function fallbackCopy(){
-
-            var ta = document.createElement('textarea');
-
-            ta.value = key;
-
-            ta.setAttribute('readonly','');
-
-            ta.style.position='fixed';
-
-            ta.style.top='0';
-
-            ta.style.left='0';
-
-            ta.style.opacity='0';
-
-            document.body.appendChild(ta);
-
-            ta.focus(); ta.select(); ta.setSelectionRange(0, ta.value.length);
-
-            try {
-
-              if (document.execCommand('copy')) {
-
-                pixBtn.textContent = 'PIX copiado';
-
-                setTimeout(function(){ pixBtn.textContent = 'Copiar PIX'; }, 1500);
-
-              }
-
-            } catch (_e) {}
-
-            document.body.removeChild(ta);
-
-          }
-
-          if (navigator.clipboard && window.isSecureContext) {
-
-            navigator.clipboard.writeText(key).then(function(){
-
-              pixBtn.textContent = 'PIX copiado';
-
-              setTimeout(function(){ pixBtn.textContent = 'Copiar PIX'; }, 1500);
-
-            }).catch(fallbackCopy);
-
-          } else {
-
-            fallbackCopy();
-
-          }
-
-        });
-
-      }
-
-      (function(){
-
-        var spotlightBtn = document.getElementById('soomeiSpotlightBtn');
-
-        var spotlightModal = document.getElementById('soomeiSpotlightModal');
-
-        if (!spotlightBtn || !spotlightModal) return;
-
-        var lastFocus = null;
-
-        function openSpotlight(){
-
-          lastFocus = document.activeElement;
-
-          spotlightModal.classList.remove('is-hidden');
-
-          document.body.classList.add('spotlight-modal-open');
-
-          var closeBtn = spotlightModal.querySelector('[data-spotlight-close]');
-
-          if (closeBtn && closeBtn.focus) closeBtn.focus();
-
-        }
-
-        function closeSpotlight(){
-
-          spotlightModal.classList.add('is-hidden');
-
-          document.body.classList.remove('spotlight-modal-open');
-
-          if (lastFocus && lastFocus.focus) lastFocus.focus();
-
-        }
-
-        spotlightBtn.addEventListener('click', function(e){
-
-          e.preventDefault();
-
-          openSpotlight();
-
-        });
-
-        spotlightModal.addEventListener('click', function(e){
-
-          if (e.target && e.target.hasAttribute('data-spotlight-close')) closeSpotlight();
-
-        });
-
-        document.addEventListener('keydown', function(e){
-
-          if (e.key === 'Escape' && !spotlightModal.classList.contains('is-hidden')) closeSpotlight();
-
-        });
-
-      })();
-
-      (function(){
-
-        var shareCardBtn = document.getElementById('shareCardBtn');
-
-        if (!shareCardBtn) return;
-
-        var shareBackdrop = document.getElementById('shareBackdrop');
-
-        var sharePhone = document.getElementById('sharePhone');
-
-        var shareSend = document.getElementById('shareSend');
-
-        var shareCancel = document.getElementById('shareCancel');
-
-        var shareClose = document.getElementById('shareClose');
-
-        var shareError = document.getElementById('shareError');
-
-        function isMobile(){
-
-          return /Android|iPhone|iPad|iPod/i.test(navigator.userAgent || '');
-
-        }
-
-        function toggleShareError(msg){
-
-          if (!shareError) return;
-
-          if (msg){
-
-            shareError.textContent = msg;
-
-            shareError.style.display = 'block';
-
-          } else {
-
-            shareError.textContent = '';
-
-            shareError.style.display = 'none';
-
-          }
-
-        }
-
-        function openShareModal(){
-
-          if (!shareBackdrop) return;
-
-          toggleShareError('');
-
-          shareBackdrop.style.display = 'flex';
-
-          shareBackdrop.classList.add('show');
-
-          shareBackdrop.setAttribute('aria-hidden','false');
-
-          if (sharePhone){
-
-            sharePhone.focus();
-
-            sharePhone.select();
-
-          }
-
-        }
-
-        function closeShareModal(){
-
-          if (!shareBackdrop) return;
-
-          shareBackdrop.classList.remove('show');
-
-          shareBackdrop.style.display = 'none';
-
-          shareBackdrop.setAttribute('aria-hidden','true');
-
-          if (sharePhone) sharePhone.value = '';
-
-          toggleShareError('');
-
-        }
-
-        function sendViaModal(){
-
-          if (!sharePhone) return;
-
-          var digits = (sharePhone.value || '').replace(/\D/g,'');
-
-          if (digits.length < 10){
-
-            toggleShareError('Informe DDD + telefone com pelo menos 10 dígitos.');
-
-            return;
-
-          }
-
-          var shareData = getShareData();
-
-          var target = 'https://wa.me/' + digits + '?text=' + encodeURIComponent(shareData.text);
-
-          window.open(target, '_blank');
-
-          closeShareModal();
-
-        }
-
-        shareCardBtn.addEventListener('click', function(e){
-
-          e.preventDefault();
-
-          var shareData = getShareData();
-
-          if (navigator.share && isMobile()){
-
-            navigator.share({title: document.title, text: shareData.text}).catch(function(err){
-
-              if (err && err.name === 'AbortError') { return; }
-
-              window.location.href = 'https://wa.me/?text=' + encodeURIComponent(shareData.text);
-
-            });
-
-            return;
-
-          }
-
-          if (isMobile()){
-
-            window.location.href = 'https://wa.me/?text=' + encodeURIComponent(shareData.text);
-
-            return;
-
-          }
-
-          openShareModal();
-
-        });
-
-        if (shareSend) shareSend.addEventListener('click', function(e){ e.preventDefault(); sendViaModal(); });
-
-        if (shareCancel) shareCancel.addEventListener('click', function(e){ e.preventDefault(); closeShareModal(); });
-
-        if (shareClose) shareClose.addEventListener('click', function(e){ e.preventDefault(); closeShareModal(); });
-
-        if (shareBackdrop){
-
-          shareBackdrop.addEventListener('click', function(ev){
-
-            if (ev.target === shareBackdrop){ closeShareModal(); }
-
-          });
-
-        }
-
-        document.addEventListener('keydown', function(ev){
-
-          if (ev.key === 'Escape'){ closeShareModal(); }
-
-        });
-
-      })();
-
-    var editForm = document.getElementById('editForm');
-
-    var loaderCtrl = window.soomeiLoader || null;
-
-    if (editForm) {
-
-      var saveBtn = document.getElementById('saveBtn');
-
-      var loaderEl = document.getElementById('formLoading');
-
-      var submitted = false;
-
-      var originalBtnText = saveBtn ? saveBtn.textContent : '';
-
-      var canAsyncSubmit = typeof window.fetch === 'function' && typeof window.FormData !== 'undefined';
-
-      var showLoader = function(){
-
-        if (loaderCtrl && loaderCtrl.show) {
-
-          loaderCtrl.show();
-
-        } else if (loaderEl) {
-
-          loaderEl.classList.add('show');
-
-          loaderEl.setAttribute('aria-hidden','false');
-
-        }
-
-      };
-
-      var hideLoader = function(){
-
-        if (loaderCtrl && loaderCtrl.hide) {
-
-          loaderCtrl.hide();
-
-        } else if (loaderEl) {
-
-          loaderEl.classList.remove('show');
-
-          loaderEl.setAttribute('aria-hidden','true');
-
-        }
-
-      };
-
-      var resetSubmission = function(message){
-
-        submitted = false;
-
-        hideLoader();
-
-        if (saveBtn) {
-
-          saveBtn.disabled = false;
-
-          saveBtn.textContent = originalBtnText || 'Salvar alteraçes';
-
-        }
-
-        if (message) {
-
-          alert(message);
-
-        }
-
-      };
-
-      editForm.addEventListener('submit', function(ev){
-
-        if (submitted) { return; }
-
-        if (typeof editForm.reportValidity === 'function') {
-
-          if (!editForm.reportValidity()) { return; }
-
-        } else if (typeof editForm.checkValidity === 'function' && !editForm.checkValidity()) {
-
-          return;
-
-        }
-
-        ev.preventDefault();
-
-        submitted = true;
-
-        showLoader();
-
-        if (saveBtn) { saveBtn.disabled = true; saveBtn.textContent = 'Salvando...'; }
-
-        if (canAsyncSubmit) {
-
-          var formData = new FormData(editForm);
-
-          fetch(editForm.action, {
-
-            method: 'POST',
-
-            body: formData,
-
-            credentials: 'same-origin',
-
-          }).then(function(response){
-
-            if (response.type === 'opaqueredirect') {
-
-              window.location.assign(editForm.action);
-
-              return;
-
-            }
-
-            if (response.redirected) {
-
-              window.location.assign(response.url);
-
-              return;
-
-            }
-
-            if (response.ok) {
-
-              return response.text().then(function(html){
-
-                document.open('text/html','replace');
-
-                document.write(html);
-
-                document.close();
-
-              });
-
-            }
-
-            return response.text().then(function(body){
-
-              var clean = (body || '').replace(/<[^>]+>/g, '').trim();
-
-              throw new Error(clean || 'Erro ao salvar. Tente novamente.');
-
-            });
-
-          }).catch(function(err){
-
-            console.error('Falha ao salvar edicao', err);
-
-            var msg = (err && err.message) || 'Não foi possível salvar. Verifique sua conexão e tente novamente.';
-
-            resetSubmission(msg);
-
-          });
-
-          return;
-
-        }
-
-        var submitAfterPaint = function(){
-
-          if (window.requestAnimationFrame) {
-
-            window.requestAnimationFrame(function(){
-
-              window.requestAnimationFrame(function(){ editForm.submit(); });
-
-            });
-
-          } else {
-
-            setTimeout(function(){ editForm.submit(); }, 16);
-
-          }
-
-        };
-
-        submitAfterPaint();
-
-      });
-
-    }
-
-    })();
-
-    (function(){
-      var ring = document.querySelector('.portfolio-ring');
-      if (!ring) { return; }
-      var slides = ring.querySelectorAll('.portfolio-slide');
-      if (!slides.length) { return; }
-      var dots = document.querySelectorAll('.portfolio-dot');
-      var carousel = document.querySelector('.portfolio-carousel');
-      var total = slides.length;
-      var active = 0;
-      var timer = null;
-      var prefersReduce = false;
-      var startX = null;
-      var lastDx = 0;
-      var moved = false;
-      try {
-        prefersReduce = window.matchMedia && window.matchMedia('(prefers-reduced-motion: reduce)').matches;
-      } catch (_e) {}
-      function setActive(idx){
-        active = ((idx % total) + total) % total;
-        ring.style.setProperty('--active', active);
-        slides.forEach(function(slide, i){
-          slide.classList.toggle('is-active', i === active);
-        });
-        dots.forEach(function(dot, i){
-          var isCurrent = i === active;
-          dot.classList.toggle('is-active', isCurrent);
-          dot.setAttribute('aria-current', isCurrent ? 'true' : 'false');
-        });
-      }
-      function schedule(){
-        if (timer){ clearInterval(timer); }
-        if (prefersReduce){ return; }
-        timer = setInterval(function(){
-          setActive(active + 1);
-        }, 4200);
-      }
-      dots.forEach(function(dot){
-        dot.addEventListener('click', function(ev){
-          ev.preventDefault();
-          var idx = parseInt(dot.getAttribute('data-index') || '0', 10) || 0;
-          setActive(idx);
-          schedule();
-        });
-      });
-      if (carousel){
-        carousel.addEventListener('pointerdown', function(ev){
-          startX = ev.clientX;
-          moved = false;
-          lastDx = 0;
-          if (timer){ clearInterval(timer); }
-          try { carousel.setPointerCapture(ev.pointerId); } catch(_e){}
-        });
-        carousel.addEventListener('pointermove', function(ev){
-          if (startX === null) return;
-          var dx = ev.clientX - startX;
-          lastDx = dx;
-          if (Math.abs(dx) > 8){ moved = true; }
-        });
-        carousel.addEventListener('pointerup', function(ev){
-          if (startX === null) return;
-          if (Math.abs(lastDx) > 40){
-            var step = lastDx > 0 ? -1 : 1;
-            setActive(active + step);
-          } else if (!moved){
-            setActive(active + 1);
-          }
-          startX = null;
-          schedule();
-        });
-        carousel.addEventListener('mouseenter', function(){ if (timer) { clearInterval(timer); } });
-        carousel.addEventListener('mouseleave', function(){ schedule(); });
-        carousel.addEventListener('wheel', function(ev){
-          ev.preventDefault();
-          var delta = ev.deltaY || ev.deltaX || 0;
-          if (delta === 0) return;
-          setActive(active + (delta > 0 ? 1 : -1));
-          schedule();
-        }, { passive: false });
-      }
-      setActive(0);
-      schedule();
-    })();
-
-    </script>
-
-    """
+    # Script estatico em /static/js (nome com hash): o navegador reaproveita do cache entre cartoes
+    scripts = f"<script src='{CARD_JS_SRC}' defer></script>"
     # Cor de fundo suavizada para o card público
-    theme_base = (prof.get("theme_color", "#000000") or "#000000") if prof else "#000000"
-    if not re.fullmatch(r"#([0-9a-fA-F]{6})", theme_base or ""):
+    if not _is_hex_color(theme_base):
         theme_base = "#000000"
     bg_hex = theme_base + "30"
     # vCard offline QR pré-gerado para subseção inline
     try:
-        off_full_name = (prof.get("full_name", "") or slug) if prof else slug
-        off_title = prof.get("title", "") if prof else ""
-        off_email = (prof.get("email_public", "") or "") if prof else ""
-        off_wa_raw = (prof.get("whatsapp", "") or "") if prof else ""
-        off_wa_digits = "".join([c for c in off_wa_raw if c.isdigit()])
-        off_share_url = _card_share_url(card, slug, request)
-        # PHOTO inline (base64, downscaled for QR). Em offline, omite em caso de falha.
-        photo_line_off = ""
-        off_photo_url = (prof.get("photo_url", "") or "").strip() if prof else ""
+        off_photo_path = ""
+        off_photo_mtime_ns = 0
+        off_photo_url = raw_photo.strip()
         if off_photo_url:
+            off_photo_path = _upload_path(off_photo_url)
             try:
-                fname = os.path.basename(off_photo_url.split("?", 1)[0])
-                local_path = os.path.join(UPLOADS_DIR, fname)
-                from PIL import Image  # type: ignore
-                im = Image.open(local_path).convert("RGB")
-                im.thumbnail((160,160))
-                _tmp = io.BytesIO(); im.save(_tmp, format='JPEG', quality=70); _tmp.seek(0)
-                raw = _tmp.read()
-                if raw:
-                    data_b64 = base64.b64encode(raw).decode('ascii')
-                    chunks = [data_b64[i:i+76] for i in range(0, len(data_b64), 76)]
-                    folded = "\r\n ".join(chunks)
-                    photo_line_off = f"PHOTO;ENCODING=b;TYPE=JPEG:{folded}"
-            except Exception:
-                photo_line_off = ""
-        def _build_vcard(include_photo: bool) -> str:
-            parts = [
-                "BEGIN:VCARD",
-                "VERSION:3.0",
-                f"FN:{off_full_name}",
-            ]
-            if include_photo and photo_line_off:
-                parts.append(photo_line_off)
-            if off_title:
-                parts.append(f"TITLE:{off_title}")
-            if off_wa_digits:
-                parts.append(f"TEL;TYPE=CELL:{off_wa_digits}")
-            if off_email:
-                parts.append(f"EMAIL:{off_email}")
-            parts.append(f"URL:{off_share_url}")
-            parts.append("END:VCARD")
-            return "\r\n".join(parts)
-        def _qr_data_url(payload: str) -> str:
-            buf = io.BytesIO()
-            qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=8, border=4)
-            qr.add_data(payload)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-            img.save(buf, format='PNG')
-            buf.seek(0)
-            return "data:image/png;base64," + base64.b64encode(buf.read()).decode('ascii')
-        # Tenta com foto; se falhar por tamanho, tenta sem foto; depois fallback para SVG do basico
-        try:
-            _vcard1 = _build_vcard(include_photo=True)
-            offline_data_url = _qr_data_url(_vcard1)
-        except Exception:
-            try:
-                _vcard2 = _build_vcard(include_photo=False)
-                offline_data_url = _qr_data_url(_vcard2)
-            except Exception:
-                try:
-                    import qrcode.image.svg as qsvg  # type: ignore
-                    _buf2 = io.BytesIO()
-                    qrcode.make(_build_vcard(include_photo=False), image_factory=qsvg.SvgImage).save(_buf2)
-                    offline_data_url = "data:image/svg+xml;base64," + base64.b64encode(_buf2.getvalue()).decode('ascii')
-                except Exception:
-                    offline_data_url = ""
+                off_photo_mtime_ns = os.stat(off_photo_path).st_mtime_ns
+            except OSError:
+                off_photo_path = ""
+        offline_data_url = _offline_vcard_qr(
+            full_name or slug,
+            title,
+            wa_digits,
+            email_raw,
+            share_url,
+            off_photo_path,
+            off_photo_mtime_ns,
+        )
     except Exception:
         offline_data_url = ""
     # Normaliza URL do site para garantir esquema (https://) quando ausente
-    site_href = normalize_external_url(prof.get("site_url", ""))
+    site_href = normalize_external_url(site_url)
     # Botão destaque configurável
-    featured_label = (prof.get("featured_label", "") or "").strip()
-    featured_url = normalize_external_url(prof.get("featured_url", ""))
-    featured_enabled = bool(prof.get("featured_enabled", True))
-    featured_color = _normalize_hex_color(prof.get("featured_color"), FEATURED_DEFAULT_COLOR)
-    featured_icon = normalize_featured_icon(prof.get("featured_icon"))
+    featured_label = (_g("featured_label", "") or "").strip()
+    featured_url = normalize_external_url(_g("featured_url", ""))
+    featured_enabled = bool(_g("featured_enabled", True))
+    featured_color = _normalize_hex_color(_g("featured_color"), FEATURED_DEFAULT_COLOR)
+    featured_icon = normalize_featured_icon(_g("featured_icon"))
     feat_start = _mix_hex_color(featured_color, 0.25)
     feat_end = _mix_hex_color(featured_color, -0.15)
     feat_shadow_rgb = _rgb_string(featured_color)
@@ -1154,7 +857,7 @@ def visitor_public_card(
             f"--featured-text:{feat_text_color};"
         )
         featured_block = f"""
-        <a class='featured-cta' href='{html.escape(featured_url)}' target='_blank' rel='noopener' data-cta='featured-{html.escape(slug)}' style='{html.escape(featured_style)}'>
+        <a class='featured-cta' href='{html.escape(featured_url)}' target='_blank' rel='noopener' data-cta='featured-{slug_e}' style='{html.escape(featured_style)}'>
           <span class='featured-cta__lead-icon' aria-hidden='true'>{featured_icon_svg(featured_icon)}</span>
           <div class='featured-cta__text'>
             <span class='featured-cta__eyebrow'>Em destaque</span>
@@ -1170,67 +873,44 @@ def visitor_public_card(
         </a>
         """
     # Endereço (opcional) para link do Maps
-    address_text = (prof.get("address", "") or "").strip() if prof else ""
     if address_text:
         maps_q = urlparse.quote(address_text, safe="")
         maps_href = f"https://www.google.com/maps/search/?api=1&query={maps_q}"
     else:
         maps_href = ""
-    og_title = f"{prof.get('full_name','')} | Soomei Card".strip(" ?") if prof else "Soomei Card"
-    og_desc = prof.get("title") if prof and prof.get("title") else "Clique para me chamar no WhatsApp e salvar meu contato."
+    og_title_e = html.escape(f"{full_name} | Soomei Card".strip(" ?") if prof else "Soomei Card")
+    og_desc_e = html.escape(title or "Clique para me chamar no WhatsApp e salvar meu contato.")
     primary_image = raw_photo or raw_cover_public or DEFAULT_AVATAR
     secondary_image = raw_cover_public if (raw_cover_public and raw_cover_public != primary_image) else ""
     og_image_url = html.escape(_absolute_asset_url(primary_image, base=card_base))
     og_image_second = html.escape(_absolute_asset_url(secondary_image, base=card_base)) if secondary_image else ""
-    quick_link_icons = {
-        "facebook": '<path fill="currentColor" d="M22 12A10 10 0 1 0 10.5 21.9v-6.9H7.9v-3h2.6V9.2c0-2.6 1.6-4 3.9-4 1.1 0 2.2.2 2.2.2v2.5h-1.2c-1.2 0-1.6.8-1.6 1.6V12h2.8l-.4 3h-2.4v6.9A10 10 0 0 0 22 12z"/>',
-        "linkedin": '<path fill="currentColor" d="M4.98 3.5A2.5 2.5 0 1 1 0 3.5a2.5 2.5 0 0 1 4.98 0zM0 8h5v16H0V8zm7 0h4.8v2.2h.1c.7-1.3 2.5-2.7 5.1-2.7 5.4 0 6.4 3.6 6.4 8.3V24h-5v-8c0-1.9 0-4.4-2.7-4.4-2.7 0-3.1 2.1-3.1 4.3V24H7V8z"/>',
-        "instagram": '<rect x="3" y="3" width="18" height="18" rx="5" ry="5" fill="none" stroke="currentColor" stroke-width="2"/><circle cx="12" cy="12" r="4" fill="none" stroke="currentColor" stroke-width="2"/><circle cx="17.5" cy="6.5" r="1.5" fill="currentColor"/>',
-        "youtube": '<path fill="currentColor" d="M23.5 6.2c-.2-1.1-1.1-2-2.2-2.3C19.3 3.5 12 3.5 12 3.5s-7.3 0-9.3.4C1.6 4.2.7 5.1.5 6.2.1 8.4 0 10.2 0 12s.1 3.6.5 5.8c.2 1.1 1.1 2 2.2 2.3 2 .4 9.3.4 9.3.4s7.3 0 9.3-.4c1.1-.3 2-1.2 2.2-2.3.4-2.2.5-4 .5-5.8s-.1-3.6-.5-5.8zM9.8 15.5v-7l6 3.5-6 3.5z"/>',
-        "tiktok": '<path fill="currentColor" d="M16.7 2c.5 3 2.1 4.8 4.8 5.1v3.5c-1.8.1-3.4-.4-4.8-1.4v6.7c0 3.5-2.3 6.1-5.8 6.1-3.2 0-5.8-2.3-5.8-5.5 0-3.6 3.3-6.3 6.9-5.5v3.7c-1.6-.5-3.1.4-3.1 1.8 0 1.1.9 1.9 2 1.9 1.4 0 2.2-.9 2.2-2.6V2h3.6z"/>',
-        "whatsapp": '<path fill="currentColor" d="M20.5 3.5A11.9 11.9 0 0 0 12 0C5.4 0 0 5.4 0 12c0 2.1.6 4.1 1.6 5.9L0 24l6.2-1.6A12 12 0 0 0 12 23.9c6.6 0 12-5.4 12-12 0-3.2-1.2-6.2-3.5-8.4zM12 21.9c-1.8 0-3.6-.5-5.2-1.4l-.4-.2-3.6.9 1-3.5-.3-.4A9.8 9.8 0 1 1 12 21.9zm5.4-7.4c-.3-.1-1.7-.8-2-.9-.3-.1-.5-.1-.7.2s-.8.9-.9 1.1c-.2.2-.4.2-.7.1-1.9-.9-3.1-1.7-4.2-3.7-.3-.5.3-.5.8-1.6.1-.2.1-.4 0-.6-.1-.1-.7-1.6-.9-2.2-.2-.6-.5-.5-.7-.5h-.6c-.2 0-.6.1-.9.4-.3.3-1 1-1 2.4s1 2.8 1.2 3c.1.2 2 3.1 4.9 4.3 1.8.8 2.5.9 3.4.8.5-.1 1.7-.7 2-1.4.2-.7.2-1.3.1-1.4-.1-.1-.3-.2-.6-.3z"/>',
-        "site": '<circle cx="12" cy="12" r="10" fill="none" stroke="currentColor" stroke-width="2"/><path d="M2 12h20M12 2c3 3 3 17 0 20M12 2c-3 3-3 17 0 20" fill="none" stroke="currentColor" stroke-width="2"/>',
-        "email": '<path fill="currentColor" d="M4 5h16a2 2 0 0 1 2 2v10a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V7a2 2 0 0 1 2-2zm8 8 8-5H4l8 5zm0 2L4 10v7h16v-7l-8 5z"/>',
-        "calendar": '<path fill="currentColor" d="M7 2h2v3h6V2h2v3h3a2 2 0 0 1 2 2v13a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V7a2 2 0 0 1 2-2h3V2zm13 8H4v10h16V10zM6 12h4v4H6v-4z"/>',
-        "store": '<path fill="currentColor" d="M4 4h16l2 6v2h-2v8H4v-8H2v-2l2-6zm2 8v6h12v-6a4 4 0 0 1-4-1.5A4 4 0 0 1 10 12a4 4 0 0 1-4 0zm-.6-6-1.1 4h15.4l-1.1-4H5.4z"/>',
-        "course": '<path fill="currentColor" d="M12 3 1 8l11 5 9-4.1V16h2V8L12 3zm-6 9v4.2c0 1.7 3.1 3.8 6 3.8s6-2.1 6-3.8V12l-6 2.7L6 12z"/>',
-        "community": '<path fill="currentColor" d="M8 11a4 4 0 1 1 0-8 4 4 0 0 1 0 8zm8.5 1a3.5 3.5 0 1 1 0-7 3.5 3.5 0 0 1 0 7zM8 13c3.3 0 6 1.7 6 3.8V20H2v-3.2C2 14.7 4.7 13 8 13zm8.5.5c2.8 0 5 1.4 5 3.1V20H16v-3.2c0-1.1-.5-2.1-1.4-2.9.6-.2 1.2-.4 1.9-.4z"/>',
-        "portfolio": '<path fill="currentColor" d="M9 4h6l1 2h4a2 2 0 0 1 2 2v10a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h4l1-2zm3 13a4 4 0 1 0 0-8 4 4 0 0 0 0 8zm0-2.2a1.8 1.8 0 1 1 0-3.6 1.8 1.8 0 0 1 0 3.6z"/>',
-        "link": '<path fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" d="M10 13a5 5 0 0 0 7.1 0l2.1-2.1a5 5 0 0 0-7.1-7.1L11 4.9"/><path fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" d="M14 11a5 5 0 0 0-7.1 0l-2.1 2.1a5 5 0 0 0 7.1 7.1L13 19.1"/>',
-    }
-    quick_link_items = []
-    for label, href, plat in other_links[:4]:
-        escaped_label = html.escape(label or plat.title())
-        target_attrs = " target='_blank' rel='noopener'" if href.startswith("http") else ""
-        icon = quick_link_icons.get(
-            plat,
-            '<circle cx="12" cy="12" r="9" fill="none" stroke="currentColor" stroke-width="2"/>',
-        )
-        quick_link_items.append(
-            f"<div class='qa-item'>"
-            f"<a class='icon-btn brand-{plat}' href='{html.escape(href)}'{target_attrs} title='{escaped_label}' aria-label='{escaped_label}'>"
-            "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>"
-            f"{icon}</svg></a><div class='qa-label'>{escaped_label}</div></div>"
-        )
-    quick_links_block = (
-        "<div class='quick-actions'>" + "".join(quick_link_items) + "</div>"
-        if quick_link_items
-        else ""
-    )
+    quick_links_block = ""
+    if other_links:
+        quick_link_parts = ["<div class='quick-actions'>"]
+        for label, href, plat in other_links[:4]:
+            escaped_label = html.escape(label or plat.title())
+            target_attrs = " target='_blank' rel='noopener'" if href.startswith("http") else ""
+            quick_link_parts.append(
+                f"<div class='qa-item'>"
+                f"<a class='icon-btn brand-{plat}' href='{html.escape(href)}'{target_attrs} title='{escaped_label}' aria-label='{escaped_label}'>"
+                f"{_QUICK_LINK_ICONS.get(plat, _QUICK_LINK_DEFAULT_ICON)}</a><div class='qa-label'>{escaped_label}</div></div>"
+            )
+        quick_link_parts.append("</div>")
+        quick_links_block = "".join(quick_link_parts)
     html_doc = f"""<!doctype html><html lang='pt-br'><head>
     <meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'>
-    <link rel='stylesheet' href='{CSS_HREF}'><title>Soomei | {html.escape(prof.get('full_name',''))}</title>
+    <link rel='stylesheet' href='{CSS_HREF}'><title>Soomei | {full_name_e}</title>
     <meta property='og:type' content='website'>
     <meta property='og:url' content='{html.escape(share_url)}'>
-    <meta property='og:title' content='{html.escape(og_title)}'>
-    <meta property='og:description' content='{html.escape(og_desc)}'>
+    <meta property='og:title' content='{og_title_e}'>
+    <meta property='og:description' content='{og_desc_e}'>
     <meta property='og:image' content='{og_image_url}'>
     {f"<meta property='og:image' content='{og_image_second}'>" if og_image_second else ""}
     <meta property='og:image:width' content='1200'>
     <meta property='og:image:height' content='630'>
     <meta name='twitter:card' content='summary_large_image'>
-    <meta name='twitter:title' content='{html.escape(og_title)}'>
-    <meta name='twitter:description' content='{html.escape(og_desc)}'>
+    <meta name='twitter:title' content='{og_title_e}'>
+    <meta name='twitter:description' content='{og_desc_e}'>
     <meta name='twitter:image' content='{og_image_url}'>
     </head><body>
     <main class='wrap'>
@@ -1239,8 +919,8 @@ def visitor_public_card(
         {cover_block}
         <header class='card-header'>
           {f"<div class='avatar-badge-wrap'><img class='avatar avatar-small' src='{photo}' alt='foto'>{connector_badge}</div>" if photo else connector_badge}
-          <h1 class='name'>{html.escape(prof.get('full_name',''))}</h1>
-          <p class='title'>{html.escape(prof.get('title',''))}</p>
+          <h1 class='name'>{full_name_e}</h1>
+          <p class='title'>{title_e}</p>
           {view_chip}
         </header>
           {f'''
@@ -1261,23 +941,17 @@ def visitor_public_card(
           <div class='qa-item'>
             {(
               f'''
-              <a class='icon-btn brand-wa' href='https://wa.me/{wa_digits}?text={share_text}' target='_blank' rel='noopener' title='WhatsApp' aria-label='WhatsApp'>
-                <svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>
-                  <path fill='currentColor' d='M20.52 3.48A11.86 11.86 0 0 0 12.02 0C5.39 0 .04 5.35.04 11.98c0 2.11.56 4.16 1.62 5.98L0 24l6.2-1.62a11.96 11.96 0 0 0 5.82 1.49h0c6.63 0 12.02-5.35 12.02-11.98 0-3.21-1.25-6.23-3.52-8.41ZM12.02 22.1h0c-1.9 0-3.76-.5-5.39-1.44l-.39-.23-3.68.96.98-3.59-.25-.37A9.77 9.77 0 0 1 2 11.98C2 6.48 6.52 2 12.02 2c2.62 0 5.08 1.02 6.93 2.86A9.71 9.71 0 0 1 22.06 12c0 5.5-4.52 10.1-10.04 10.1Zm5.53-7.49c-.3-.15-1.78-.88-2.05-.98-.27-.1-.47-.15-.68.15-.2.3-.78.98-.96 1.18-.18.2-.36.22-.66.07-.3-.15-1.27-.47-2.42-1.5-.9-.8-1.5-1.78-1.68-2.08-.18-.3-.02-.46.13-.61.13-.13.3-.34.45-.51.15-.17.2-.3.3-.5.1-.2.05-.37-.03-.52-.08-.15-.68-1.63-.93-2.23-.25-.6-.5-.52-.68-.53l-.58-.01c-.2 0-.52.08-.8.37-.27.3-1.05 1.03-1.05 2.5s1.07 2.9 1.23 3.1c.15.2 2.1 3.2 5.07 4.48.71.31 1.27.5 1.7.64.72.23 1.37.2 1.88.12.57-.08 1.78-.73 2.03-1.44.25-.7.25-1.3.18-1.43-.07-.13-.27-.2-.57-.35Z'/>
-                </svg>
+              <a class='icon-btn brand-wa' href='https://wa.me/{wa_digits}?text={_WA_SHARE_TEXT}' target='_blank' rel='noopener' title='WhatsApp' aria-label='WhatsApp'>
+                {_WHATSAPP_ICON}
               </a>
               <div class='qa-label'>WhatsApp</div>
               '''
             ) if wa_digits else (
-              '''
+              f'''
 
               <div class='icon-btn disabled' title='WhatsApp indisponvel' aria-disabled='true'>
 
-                <svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>
-
-                  <path fill='currentColor' d='M20.52 3.48A11.86 11.86 0 0 0 12.02 0C5.39 0 .04 5.35.04 11.98c0 2.11.56 4.16 1.62 5.98L0 24l6.2-1.62a11.96 11.96 0 0 0 5.82 1.49h0c6.63 0 12.02-5.35 12.02-11.98 0-3.21-1.25-6.23-3.52-8.41ZM12.02 22.1h0c-1.9 0-3.76-.5-5.39-1.44l-.39-.23-3.68.96.98-3.59-.25-.37A9.77 9.77 0 0 1 2 11.98C2 6.48 6.52 2 12.02 2c2.62 0 5.08 1.02 6.93 2.86A9.71 9.71 0 0 1 22.06 12c0 5.5-4.52 10.1-10.04 10.1Zm5.53-7.49c-.3-.15-1.78-.88-2.05-.98-.27-.1-.47-.15-.68.15-.2.3-.78.98-.96 1.18-.18.2-.36.22-.66.07-.3-.15-1.27-.47-2.42-1.5-.9-.8-1.5-1.78-1.68-2.08-.18-.3-.02-.46.13-.61.13-.13.3-.34.45-.51.15-.17.2-.3.3-.5.1-.2.05-.37-.03-.52-.08-.15-.68-1.63-.93-2.23-.25-.6-.5-.52-.68-.53l-.58-.01c-.2 0-.52.08-.8.37-.27.3-1.05 1.03-1.05 2.5s1.07 2.9 1.23 3.1c.15.2 2.1 3.2 5.07 4.48.71.31 1.27.5 1.7.64.72.23 1.37.2 1.88.12.57-.08 1.78-.73 2.03-1.44.25-.7.25-1.3.18-1.43-.07-.13-.27-.2-.57-.35Z'/>
-
-                </svg>
+                {_WHATSAPP_ICON}
 
               </div>
 
@@ -1287,7 +961,7 @@ def visitor_public_card(
             )}
           </div>
           <div class='qa-item'>
-            <a class='icon-btn elevated' href='/v/{html.escape(slug)}.vcf' title='Salvar contato' aria-label='Salvar contato'>
+            <a class='icon-btn elevated' href='/v/{slug_e}.vcf' title='Salvar contato' aria-label='Salvar contato'>
               <svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='18' height='18'>
                 <rect x='3' y='4' width='18' height='16' rx='2' ry='2' fill='none' stroke='currentColor' stroke-width='2'/>
                 <circle cx='9' cy='10' r='2' fill='currentColor'/>
@@ -1359,71 +1033,45 @@ def visitor_public_card(
         <div class='fixed-actions'>
           {(
             f"<a class='btn fixed website' target='_blank' rel='noopener' href='{html.escape(site_href)}'>"
-            f"<span class='fixed-action-icon'>"
-            f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'>"
-            f"<circle cx='12' cy='12' r='10' stroke='currentColor' stroke-width='2' fill='none'/><path d='M2 12h20M12 2c3 3 3 19 0 20M12 2c-3 3-3 19 0 20' stroke='currentColor' stroke-width='2' fill='none'/></svg> "
-            f"</span><span class='fixed-action-copy'><strong>Site</strong><small>Conheça mais</small></span><span class='fixed-action-arrow' aria-hidden='true'>→</span></a>"
+            f"<span class='fixed-action-icon'>{_FIXED_SITE_ICON} </span><span class='fixed-action-copy'><strong>Site</strong><small>Conheça mais</small></span><span class='fixed-action-arrow' aria-hidden='true'>→</span></a>"
           ) if site_href else (
-            "<span class='btn fixed website disabled' role='button' aria-disabled='true' tabindex='-1'>"
-            "<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'><circle cx='12' cy='12' r='10' stroke='currentColor' stroke-width='2' fill='none'/><path d='M2 12h20M12 2c3 3 3 19 0 20M12 2c-3 3-3 19 0 20' stroke='currentColor' stroke-width='2' fill='none'/></svg></span><span class='fixed-action-copy'><strong>Site</strong><small>Não informado</small></span></span>"
+            _FIXED_SITE_DISABLED
           )}
           {(
             f"<a class='btn fixed email' href='mailto:{html.escape(email_pub)}'>"
-            f"<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'><path fill='currentColor' d='M4 6h16a1 1 0 0 1 1 1v10a1 1 0 0 1-1 1H4a1 1 0 0 1-1-1V7a1 1 0 0 1 1-1zm8 6 9-6H3l9 6zm0 2L3 8v9h18V8l-9 6z'/></svg></span>"
+            f"<span class='fixed-action-icon'>{_FIXED_EMAIL_ICON}</span>"
             f"<span class='fixed-action-copy'><strong>E-mail</strong><small>Enviar mensagem</small></span><span class='fixed-action-arrow' aria-hidden='true'>→</span></a>"
           ) if email_pub else (
-            "<span class='btn fixed email disabled' role='button' aria-disabled='true' tabindex='-1'>"
-            "<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'><path fill='currentColor' d='M4 6h16a1 1 0 0 1 1 1v10a1 1 0 0 1-1 1H4a1 1 0 0 1-1-1V7a1 1 0 0 1 1-1zm8 6 9-6H3l9 6zm0 2L3 8v9h18V8l-9 6z'/></svg></span><span class='fixed-action-copy'><strong>E-mail</strong><small>Não informado</small></span></span>"
+            _FIXED_EMAIL_DISABLED
           )}
           {(
             f"<a class='btn fixed maps' id='mapsBtn' target='_blank' rel='noopener' href='{html.escape(maps_href)}'>"
-            f"<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'>"
-            f"<path fill='currentColor' d='M12 2C8.69 2 6 4.69 6 8c0 4.5 6 12 6 12s6-7.5 6-12c0-3.31-2.69-6-6-6zm0 8a2 2 0 110-4 2 2 0 010 4z'/>"
-            f"</svg></span>"
+            f"<span class='fixed-action-icon'>{_FIXED_MAPS_ICON}</span>"
             f"<span class='fixed-action-copy'><strong>Endereço</strong><small>Abrir no mapa</small></span><span class='fixed-action-arrow' aria-hidden='true'>→</span></a>"
           ) if maps_href else (
-            "<span class='btn fixed maps disabled' role='button' aria-disabled='true' tabindex='-1'>"
-            "<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'><path fill='currentColor' d='M12 2C8.69 2 6 4.69 6 8c0 4.5 6 12 6 12s6-7.5 6-12c0-3.31-2.69-6-6-6zm0 8a2 2 0 110-4 2 2 0 010 4z'/></svg></span><span class='fixed-action-copy'><strong>Endereço</strong><small>Não informado</small></span></span>"
+            _FIXED_MAPS_DISABLED
           )}
           {(
-            f"<a class='btn fixed pix' id='payPixBtn' href='/{html.escape(slug)}?pix=amount'>"
-            f"<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'>"
-            f"<path fill='currentColor' d='M3 3h6v6H3V3zm2 2v2h2V5H5zm10-2h6v6h-6V3zm2 2v2h2V5h-2zM3 15h6v6H3v-6zm2 2v2h2v-2H5zm10 0h2v2h2v2h-4v-4zm0-4h2v2h-2v-2zm4 0h2v2h-2v-2z'/></svg> "
-            f"</span><span class='fixed-action-copy'><strong>Pagamento Pix</strong><small>Pagar com QR Code</small></span><span class='fixed-action-arrow' aria-hidden='true'>→</span></a>"
+            f"<a class='btn fixed pix' id='payPixBtn' href='/{slug_e}?pix=amount'>"
+            f"<span class='fixed-action-icon'>{_FIXED_PIX_ICON} </span><span class='fixed-action-copy'><strong>Pagamento Pix</strong><small>Pagar com QR Code</small></span><span class='fixed-action-arrow' aria-hidden='true'>→</span></a>"
           ) if pix_key else (
-            "<span class='btn fixed pix disabled' role='button' aria-disabled='true' tabindex='-1'>"
-            "<span class='fixed-action-icon'><svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='16' height='16'><path fill='currentColor' d='M3 3h6v6H3V3zm2 2v2h2V5H5zm10-2h6v6h-6V3zm2 2v2h2V5h-2zM3 15h6v6H3v-6zm2 2v2h2v-2H5zm10 0h2v2h2v2h-4v-4zm0-4h2v2h-2v-2zm4 0h2v2h-2v-2z'/></svg></span><span class='fixed-action-copy'><strong>Pagamento Pix</strong><small>Não configurado</small></span></span>"
+            _FIXED_PIX_DISABLED
           )}
         </div>
       </section>
       {connector_modal}
       {scripts}
-      <script>
-      (function(){{
-        var off = document.getElementById('offlineBtn');
-        var sec = document.getElementById('offlineSection');
-        if (!off || !sec) return;
-        off.setAttribute('aria-controls', 'offlineSection');
-        off.setAttribute('aria-expanded', 'false');
-        function isVisible(el){{
-          var cs = window.getComputedStyle(el);
-          return cs.display !== 'none';
-        }}
-        off.addEventListener('click', function(e){{
-          e.preventDefault();
-          var willHide = isVisible(sec);
-          sec.classList.toggle('is-hidden', willHide);
-          off.setAttribute('aria-expanded', (!willHide).toString());
-          if (!willHide) {{
-            try {{ sec.scrollIntoView({{ behavior: 'smooth', block: 'start' }}); }} catch(_e){{}}
-          }}
-        }});
-      }})();
-      </script>
     </main></body></html>"""
     response = HTMLResponse(_apply_brand_footer(html_doc, footer_action_html))
     if request and csrf_token_value:
         csrf.set_csrf_cookie(response, csrf_token_value)
+    if cache_key is not None:
+        etag = _visitor_html_put(cache_key, response.body)
+        # Entrada expirada/removida do cache: o ETag recalculado ainda pode bater com o do navegador
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _VISITOR_HTML_CACHE_CONTROL})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _VISITOR_HTML_CACHE_CONTROL
     return response
 
 
@@ -1431,18 +1079,19 @@ def visitor_public_card(
 
 @router.get("/u/{slug}", response_class=HTMLResponse)
 def public_card(slug: str, request: Request):
-    db, uid, card = _find_card(slug)
+    uid, card, prof = _find_card_with_profile(slug)
     if not card:
         raise HTTPException(404, "Cartao nao encontrado")
     templates = _templates(request)
     owner = card.get("user", "")
-    prof = _sql_repo.get_profile(owner) or {}
     who = current_user_email(request)
     is_owner = bool(owner and who == owner)
+    # O contador so aparece para o dono; a visita do visitante e apenas registrada (gravada em lote)
+    view_count = 0
     if is_owner:
         view_count = get_card_view_count(uid)
-    else:
-        view_count = increment_card_view(uid) if should_track_view(request, slug) else get_card_view_count(uid)
+    elif should_track_view(request, slug):
+        record_card_view(uid)
     return visitor_public_card(prof, slug, is_owner, view_count, card=card, request=request)
 @router.get("/q/{slug}.png")
 def qr(slug: str, request: Request):
@@ -1451,40 +1100,56 @@ def qr(slug: str, request: Request):
         raise HTTPException(404, "Cartao nao encontrado")
     slug_value = card.get("vanity") or slug
     share_url = _card_share_url(card, slug_value, request)
-    img = qrcode.make(share_url)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return StreamingResponse(buf, media_type="image/png")
+    # Mesmo visual do qrcode.make (modulos de 10px), mas o PNG sai do cache por URL de destino.
+    # Sem "immutable": o slug pode passar a apontar para outro dominio; o ETag cobre as revalidacoes.
+    data = _qr_png_bytes(share_url, 10)
+    etag = f'"{hashlib.blake2b(data, digest_size=10).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": _QR_PNG_CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(data, media_type="image/png", headers=headers)
 @router.get("/v/{slug}.vcf")
 def vcard(slug: str, request: Request):
-    db, uid, card = _find_card(slug)
+    uid, card, prof = _find_card_with_profile(slug)
     if not card:
         raise HTTPException(404, "Cartao nao encontrado")
-    prof = _sql_repo.get_profile(card.get("user", "")) or {}
     name = prof.get("full_name", "")
     tel = prof.get("whatsapp", "")
     email = prof.get("email_public", "")
+    title = prof.get("title", "")
     slug_value = card.get("vanity") or slug
     url = _card_share_url(card, slug_value, request)
     card_base = _card_public_base(card, request)
+    photo_url = (prof.get("photo_url", "") or "").strip()
+    local_path = ""
+    photo_mtime_ns = 0
+    if photo_url:
+        local_path = _upload_path(photo_url)
+        try:
+            photo_mtime_ns = os.stat(local_path).st_mtime_ns
+        except OSError:
+            local_path = ""
+    # ETag pelas entradas do .vcf (perfil, URLs e mtime da foto): revisita com If-None-Match
+    # responde 304 sem ler nem codificar a foto.
+    etag_src = orjson.dumps(
+        [slug, name, title, tel, email, url, card_base, photo_url, photo_mtime_ns],
+        default=str,
+    )
+    etag = f'"{hashlib.blake2b(etag_src, digest_size=10).hexdigest()}"'
+    headers = {
+        "Content-Disposition": f"attachment; filename=\"{slug}.vcf\"",
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
     # Photo handling: embed as base64 (preferred), fallback to URI, with line folding
     photo_line = None
-    photo_url = (prof.get("photo_url", "") or "").strip()
     if photo_url:
         try:
-            fname = os.path.basename(photo_url.split("?", 1)[0])
-            local_path = os.path.join(UPLOADS_DIR, fname)
-            with open(local_path, "rb") as fh:
-                data = fh.read()
-            if data:
-                ext = (os.path.splitext(fname)[1] or "").lower()
-                typ = "JPEG" if ext in (".jpg", ".jpeg") else ("PNG" if ext == ".png" else "JPEG")
-                b64 = base64.b64encode(data).decode("ascii")
-                # fold base64 to 76 chars per line with CRLF + space continuation
-                chunks = [b64[i:i+76] for i in range(0, len(b64), 76)]
-                folded = "\r\n ".join(chunks)
-                photo_line = f"PHOTO;ENCODING=b;TYPE={typ}:{folded}"
+            if not local_path:
+                raise OSError(photo_url)
+            photo_line = _vcard_photo_line(local_path, photo_mtime_ns) or None
         except Exception:
             abs_url = photo_url
             if abs_url.startswith("/"):
@@ -1500,173 +1165,91 @@ def vcard(slug: str, request: Request):
         lines.append(photo_line)
     lines.extend([
         "ORG:Soomei",
-        f"TITLE:{prof.get('title','')}",
+        f"TITLE:{title}",
         f"TEL;TYPE=CELL:{tel}",
         f"EMAIL;TYPE=INTERNET:{email}",
         f"URL:{url}",
         "END:VCARD",
     ])
     vcf = "\r\n".join(lines) + "\r\n"
-    return Response(vcf, media_type="text/vcard; charset=utf-8", headers={
-        "Content-Disposition": f"attachment; filename=\"{slug}.vcf\""
-    })
+    return Response(vcf, media_type="text/vcard; charset=utf-8", headers=headers)
 def _serve_slug(slug: str, request: Request, prefetched: tuple[dict, str, dict] | None = None):
+    # Sem cartao pre-carregado, cartao e perfil do dono vem na mesma consulta
+    prof = None
     if prefetched:
         db, uid, card = prefetched
     else:
-        db, uid, card = _find_card(slug)
-    if card and card.get("vanity") and slug != card.get("vanity"):
-        return RedirectResponse(f"/{html.escape(card.get('vanity'))}", status_code=302)
+        uid, card, prof = _find_card_with_profile(slug)
     if not card:
         return RedirectResponse("/invalid", status_code=302)
-    if not card.get("status") or card.get("status") == "pending":
-        return RedirectResponse(f"/onboard/{html.escape(uid)}", status_code=302)
-    if card.get("status") == "blocked":
+    # Estado do cartao resolvido uma unica vez; o restante do fluxo usa apenas locais.
+    vanity = card.get("vanity") or ""
+    status = (card.get("status") or "").lower()
+    owner = card.get("user", "") or ""
+    if vanity and slug != vanity:
+        return RedirectResponse(f"/{vanity}", status_code=302)
+    if status in ("", "pending"):
+        return RedirectResponse(f"/onboard/{uid}", status_code=302)
+    if status == "blocked":
         return RedirectResponse("/blocked", status_code=302)
     templates = _templates(request)
-    owner = card.get("user", "")
-    prof = _sql_repo.get_profile(owner) or {}
+    if prof is None:
+        prof = _sql_repo.get_profile(owner) or {}
     who = current_user_email(request)
     is_owner = bool(owner and who == owner)
-    slug = (card.get("vanity") or slug or uid)
+    slug = (vanity or slug or uid)
     entry_path = _card_entry_path(card, slug)
-    card_base = _card_public_base(card, request)
     offline = request.query_params.get("offline", "")
     if offline:
         full_name = (prof.get("full_name", "") or slug) if prof else slug
         title = prof.get("title", "") if prof else ""
         email_pub = (prof.get("email_public", "") or "") if prof else ""
         wa_raw = (prof.get("whatsapp", "") or "") if prof else ""
-        wa_digits = "".join([c for c in wa_raw if c.isdigit()])
+        wa_digits = NON_DIGIT_RE.sub("", wa_raw)
         share_url = _card_share_url(card, slug, request)
-        photo_line = None
+        # Mesmo cache do QR inline do cartao: chave pelos campos + caminho/mtime da foto,
+        # nunca pelo vCard com a foto em base64.
+        photo_path = ""
+        photo_mtime_ns = 0
         photo_url = (prof.get("photo_url", "") or "").strip() if prof else ""
         if photo_url:
+            photo_path = _upload_path(photo_url)
             try:
-                fname = os.path.basename(photo_url.split("?", 1)[0])
-                local_path = os.path.join(UPLOADS_DIR, fname)
-                data_b64 = None
-                try:
-                    from PIL import Image  # type: ignore
-                    im = Image.open(local_path).convert("RGB")
-                    im.thumbnail((160, 160))
-                    _tmp = io.BytesIO()
-                    im.save(_tmp, format="JPEG", quality=70)
-                    _tmp.seek(0)
-                    raw = _tmp.read()
-                    data_b64 = base64.b64encode(raw).decode("ascii") if raw else None
-                    typ = "JPEG"
-                except Exception:
-                    with open(local_path, "rb") as fh:
-                        raw = fh.read()
-                    if raw:
-                        ext = (os.path.splitext(fname)[1] or "").lower()
-                        typ = "JPEG" if ext in (".jpg", ".jpeg") else ("PNG" if ext == ".png" else "JPEG")
-                        data_b64 = base64.b64encode(raw).decode("ascii")
-                if data_b64:
-                    chunks = [data_b64[i : i + 76] for i in range(0, len(data_b64), 76)]
-                    folded = "\r\n ".join(chunks)
-                    photo_line = f"PHOTO;ENCODING=b;TYPE={typ}:{folded}"
-            except Exception:
-                abs_url = photo_url
-                if abs_url.startswith("/"):
-                    abs_url = f"{card_base}{photo_url}"
-                photo_line = f"PHOTO;VALUE=URI:{abs_url}"
-        def _build_off(include_photo: bool) -> str:
-            parts = [
-                "BEGIN:VCARD",
-                "VERSION:3.0",
-                f"FN:{full_name}",
-            ]
-            if include_photo and photo_line:
-                parts.append(photo_line)
-            if title:
-                parts.append(f"TITLE:{title}")
-            if wa_digits:
-                parts.append(f"TEL;TYPE=CELL:{wa_digits}")
-            if email_pub:
-                parts.append(f"EMAIL:{email_pub}")
-            parts.append(f"URL:{share_url}")
-            parts.append("END:VCARD")
-            return "\r\n".join(parts)
-        def _qr_png(payload: str) -> str:
-            qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=8, border=4)
-            qr.add_data(payload)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-            buf = io.BytesIO()
-            img.save(buf, format="PNG")
-            buf.seek(0)
-            return "data:image/png;base64," + base64.b64encode(buf.read()).decode("ascii")
-        data_url = ""
-        try:
-            data_url = _qr_png(_build_off(True))
-        except Exception:
-            try:
-                data_url = _qr_png(_build_off(False))
-            except Exception:
-                try:
-                    import qrcode.image.svg as qsvg  # type: ignore
-                    buf2 = io.BytesIO()
-                    qrcode.make(_build_off(False), image_factory=qsvg.SvgImage).save(buf2)
-                    data_url = "data:image/svg+xml;base64," + base64.b64encode(buf2.getvalue()).decode("ascii")
-                except Exception:
-                    return _public_message_response(
-                        request,
-                        title="Falha ao gerar QR Offline",
-                        kicker="Modo offline",
-                        heading="Não conseguimos gerar o QR agora",
-                        message="O contato continua preservado. Volte para o cartão e tente novamente em alguns instantes.",
-                        href=entry_path,
-                        label="Voltar ao cartão",
-                        status_code=500,
-                        is_owner=is_owner,
-                        slug=slug,
-                    )
+                photo_mtime_ns = os.stat(photo_path).st_mtime_ns
+            except OSError:
+                photo_path = ""
+        data_url = _offline_vcard_qr(full_name, title, wa_digits, email_pub, share_url, photo_path, photo_mtime_ns)
+        if not data_url:
+            return _public_message_response(
+                request,
+                title="Falha ao gerar QR Offline",
+                kicker="Modo offline",
+                heading="Não conseguimos gerar o QR agora",
+                message="O contato continua preservado. Volte para o cartão e tente novamente em alguns instantes.",
+                href=entry_path,
+                label="Voltar ao cartão",
+                status_code=500,
+                is_owner=is_owner,
+                slug=slug,
+            )
         theme_base = (prof.get("theme_color", "#000000") or "#000000") if prof else "#000000"
-        if not re.fullmatch(r"#([0-9a-fA-F]{6})", theme_base or ""):
+        if not _is_hex_color(theme_base):
             theme_base = "#000000"
         bg_hex = theme_base + "30"
         photo = html.escape(prof.get("photo_url", "")) if prof else ""
         entry_href = html.escape(entry_path)
-        off_page = f"""
-        <!doctype html><html lang='pt-br'><head>
-        <meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'>
-        <link rel='stylesheet' href='{CSS_HREF}'><title>Modo Offline</title></head><body>
-        <main class='wrap utility-shell'>
-          <section class='utility-card carbon' style='background-color: {html.escape(bg_hex)}'>
-            <a class='utility-back' href='{entry_href}' aria-label='Voltar' title='Voltar'>&larr;</a>
-            <div class='utility-brand'>
-              <img src='/static/img/soomei_logo.png' alt='Soomei' class='utility-logo'>
-              <span>Soomei</span>
-            </div>
-            <p class='utility-kicker'>Contato sem internet</p>
-            <h1>Modo Offline</h1>
-            <p class='utility-intro'>Salve o contato direto na agenda do cliente mesmo quando a internet não colaborar. Basta apontar a câmera para o QR Code.</p>
-            {f"<img class='utility-avatar' src='{photo}' alt='foto'>" if photo else ""}
-            <div class='utility-panel'>
-              <img class='utility-qr' src='{data_url}' alt='QR Offline'>
-              <p class='utility-note'><strong>Dica:</strong> tire um print desta tela e marque como favorita na galeria para acesso rápido.</p>
-              <p class='utility-note'>Não recomendamos imprimir este código: ele não recebe atualizações online. Para materiais impressos, use o QR Code online.</p>
-            </div>
-            <div class='utility-actions'>
-              <a class='btn ghost' href='{entry_href}'>Voltar ao cartão</a>
-            </div>
-          </section>
-        </main>
-        </body></html>
-        """
+        off_page = _offline_page(CSS_HREF, BRAND_FOOTER, entry_href, bg_hex, photo, data_url)
         footer_action_html, footer_token = _footer_action_context(
             request,
             is_owner=is_owner,
             slug=slug,
         )
-        response = HTMLResponse(_apply_brand_footer(off_page, footer_action_html))
+        response = HTMLResponse(_fill_footer_action(off_page, footer_action_html))
         if footer_token:
             csrf.set_csrf_cookie(response, footer_token)
         return response
-    if who == owner and not card.get("vanity"):
-        return RedirectResponse(f"/slug/select/{html.escape(uid)}", status_code=302)
+    if is_owner and not vanity:
+        return RedirectResponse(f"/slug/select/{uid}", status_code=302)
     pix_mode = request.query_params.get("pix", "")
     if pix_mode:
         pix_key = (prof.get("pix_key", "") or "").strip()
@@ -1674,75 +1257,18 @@ def _serve_slug(slug: str, request: Request, prefetched: tuple[dict, str, dict]
             return RedirectResponse(entry_path, status_code=302)
         photo = html.escape(prof.get("photo_url", "")) if prof else ""
         theme_base = (prof.get("theme_color", "#000000") or "#000000") if prof else "#000000"
-        if not re.fullmatch(r"#([0-9a-fA-F]{6})", theme_base or ""):
+        if not _is_hex_color(theme_base):
             theme_base = "#000000"
         bg_hex = theme_base + "30"
         entry_href = html.escape(entry_path)
         if pix_mode in ("amount", "1"):
-            amt_page = f"""
-            <!doctype html><html lang='pt-br'><head>
-            <meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'>
-            <link rel='stylesheet' href='{CSS_HREF}'><title>Pagamento Pix</title></head><body>
-            <main class='wrap utility-shell'>
-              <section class='utility-card utility-card--pix carbon' style='background-color: {html.escape(bg_hex)}'>
-                <a class='utility-back' href='{entry_href}' aria-label='Voltar' title='Voltar'>&larr;</a>
-                <div class='utility-brand'>
-                  <img src='/static/img/soomei_logo.png' alt='Soomei' class='utility-logo'>
-                  <span>Soomei</span>
-                </div>
-                <div class='utility-support'>
-                <p class='utility-kicker'>Pagamento instantâneo</p>
-                </div>
-                <h1>Gerar Pix</h1>
-                <p class='utility-intro'>Informe o valor para criar um QR Code pronto para pagamento. Se quiser deixar aberto, mantenha 0,00.</p>
-                {f"<img class='utility-avatar' src='{photo}' alt='foto'>" if photo else ""}
-                <div class='utility-panel'>
-                  <h2>Valor do Pix</h2>
-                  <p class='utility-note'>Use vírgula para centavos. Exemplo: 150,00</p>
-                  <div class='utility-amount-row'>
-                    <label class='utility-currency' for='pixAmount'>R$</label>
-                    <input id='pixAmount' class='utility-input' type='tel' inputmode='numeric' pattern='[0-9,]*' placeholder='0,00' autocomplete='off'>
-                    <a id='genPix' class='btn utility-primary' href='#'>Gerar QR <svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 24 24' aria-hidden='true' width='14' height='14'><path d='M9 18l6-6-6-6' fill='none' stroke='currentColor' stroke-width='2' stroke-linecap='round' stroke-linejoin='round'/></svg></a>
-                  </div>
-                </div>
-              </section>
-            </main>
-            <script>
-            (function(){{
-              var btn = document.getElementById('genPix');
-              var amt = document.getElementById('pixAmount');
-              function maskMoney(){{
-                if (!amt) return;
-                var s = (amt.value||'').replace(/\\D/g,'');
-                if (s.length === 0) {{ amt.value = ''; return; }}
-                while (s.length < 3) s = '0' + s;
-                var intp = s.slice(0, -2).replace(/^0+/, '') || '0';
-                var decp = s.slice(-2);
-                amt.value = intp + ',' + decp;
-              }}
-              if (amt) {{
-                amt.addEventListener('input', maskMoney);
-                amt.addEventListener('blur', maskMoney);
-              }}
-              if (btn && amt){{
-                btn.addEventListener('click', function(e){{
-                  e.preventDefault();
-                  var s = (amt.value||'').replace(/\\D/g,'');
-                  if (!s) s = '0';
-                  var cents = parseInt(s, 10) || 0;
-                  var v = (cents/100).toFixed(2).replace('.', ',');
-                  window.location.href = '{entry_href}?pix=qr&v=' + encodeURIComponent(v);
-                }});
-              }}
-            }})();
-            </script>
-            """
+            amt_page = _pix_amount_page(CSS_HREF, BRAND_FOOTER, entry_href, bg_hex, photo)
             footer_action_html, footer_token = _footer_action_context(
                 request,
                 is_owner=is_owner,
                 slug=slug,
             )
-            response = HTMLResponse(_apply_brand_footer(amt_page, footer_action_html))
+            response = HTMLResponse(_fill_footer_action(amt_page, footer_action_html))
             if footer_token:
                 csrf.set_csrf_cookie(response, footer_token)
             return response
@@ -1755,35 +1281,20 @@ def _serve_slug(slug: str, request: Request, prefetched: tuple[dict, str, dict]
             name = (prof.get("full_name", "") if prof else "") or slug
             city = (prof.get("city", "") if prof else "") or "BRASILIA"
             payload = build_pix_emv(pix_key, amount if amount > 0 else None, name, city, txid="***")
-            data_url = ""
-            try:
-                qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=8, border=4)
-                qr.add_data(payload)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-                buf = io.BytesIO()
-                img.save(buf, format="PNG")
-                buf.seek(0)
-                data_url = "data:image/png;base64," + base64.b64encode(buf.read()).decode("ascii")
-            except Exception:
-                try:
-                    import qrcode.image.svg as qsvg  # type: ignore
-                    buf = io.BytesIO()
-                    qrcode.make(payload, image_factory=qsvg.SvgImage).save(buf)
-                    data_url = "data:image/svg+xml;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
-                except Exception:
-                    return _public_message_response(
-                        request,
-                        title="Falha ao gerar QR Pix",
-                        kicker="Pagamento Pix",
-                        heading="Não conseguimos gerar o QR agora",
-                        message="A chave Pix continua salva. Volte para o cartão e tente gerar o código novamente.",
-                        href=entry_path,
-                        label="Voltar ao cartão",
-                        status_code=500,
-                        is_owner=is_owner,
-                        slug=slug,
-                    )
+            data_url = _pix_qr_data_url(payload)
+            if not data_url:
+                return _public_message_response(
+                    request,
+                    title="Falha ao gerar QR Pix",
+                    kicker="Pagamento Pix",
+                    heading="Não conseguimos gerar o QR agora",
+                    message="A chave Pix continua salva. Volte para o cartão e tente gerar o código novamente.",
+                    href=entry_path,
+                    label="Voltar ao cartão",
+                    status_code=500,
+                    is_owner=is_owner,
+                    slug=slug,
+                )
             page = f"""
             <!doctype html><html lang='pt-br'><head>
             <meta charset='utf-8'><meta name='viewport' content='width=device-width,initial-scale=1'>
@@ -1868,24 +1379,19 @@ def _serve_slug(slug: str, request: Request, prefetched: tuple[dict, str, dict]
             if footer_token:
                 csrf.set_csrf_cookie(response, footer_token)
             return response
+    # O contador so aparece para o dono; a visita do visitante e apenas registrada (gravada em lote)
+    view_count = 0
     if is_owner:
         view_count = get_card_view_count(uid)
-    else:
-        view_count = increment_card_view(uid) if should_track_view(request, slug) else get_card_view_count(uid)
+    elif should_track_view(request, slug):
+        record_card_view(uid)
     if not is_owner:
         owner_name = (prof.get("full_name") or "").strip() if isinstance(prof, dict) else ""
-        status = (card.get("status") or "").lower()
-        owner_email = card.get("user", "")
-        owner_user = _sql_repo.get_user(owner_email) if owner_email else None
+        owner_user = _sql_repo.get_user(owner) if owner else None
         is_unverified_owner = owner_user is not None and not owner_user.email_verified_at
-        needs_blocked_view = (
-            (not profile_complete(prof))
-            or (not owner_email)
-            or status == "pending"
-            or is_unverified_owner
-        )
-        if needs_blocked_view:
-            if (not owner_email) or status == "pending" or is_unverified_owner:
+        needs_activation = (not owner) or is_unverified_owner
+        if needs_activation or not profile_complete(prof):
+            if needs_activation:
                 cta_url = f"/onboard/{uid}/pin"
                 cta_label = "Sou o dono? Finalizar ativacao"
             else:
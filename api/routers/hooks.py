@@ -1,18 +1,21 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 from api.repositories.sql_repository import SQLRepository
 
 router = APIRouter(prefix="/hooks", tags=["hooks"])
 _sql_repo = SQLRepository()
+# Status de cobranca -> status do cartao; status fora do mapa nao alteram o cartao
+_CARD_STATUS_BY_BILLING = {"blocked": "blocked", "delinquent": "blocked", "ok": "active"}
 
 
-@router.post("/themembers")
+@router.post("/themembers", response_class=ORJSONResponse)
 def themembers(payload: dict):
     uid = payload.get("uid")
     if not uid:
         return {"ok": True}
     status = payload.get("status", "ok")
-    new_status = "blocked" if status in ("blocked", "delinquent") else ("active" if status == "ok" else None)
+    new_status = _CARD_STATUS_BY_BILLING.get(status)
     if new_status:
         _sql_repo.update_card_status(uid, new_status, billing_status=status)
     return {"ok": True}
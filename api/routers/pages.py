@@ -17,6 +17,8 @@ _settings = get_settings()
 CSS_HREF = "/static/card.css"
 BRAND_FOOTER = lambda content: content
 LEGAL_TERMS_PATH = ""
+# Termos ja escapados, reaproveitados enquanto o arquivo nao mudar: (path, st_mtime_ns, html).
+_legal_terms_cache: tuple[str, int, str] | None = None
 
 
 def configure_pages(*, css_href: str, brand_footer, legal_terms_path: str) -> None:
@@ -34,6 +36,19 @@ def _templates(request: Request):
     raise RuntimeError("Templates nao configurados")
 
 
+def _legal_terms_html(path: str) -> str:
+    """Le e escapa os termos apenas quando o arquivo muda (chave: st_mtime_ns)."""
+    global _legal_terms_cache
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _legal_terms_cache
+    if cached and cached[0] == path and cached[1] == mtime_ns:
+        return cached[2]
+    with open(path, "r", encoding="utf-8") as handle:
+        safe = html.escape(handle.read()).replace("\n", "<br>")
+    _legal_terms_cache = (path, mtime_ns, safe)
+    return safe
+
+
 def _apply_brand_footer(content: str) -> str:
     footer_html = BRAND_FOOTER(content) if BRAND_FOOTER else content
     marker = "</footer>"
@@ -49,7 +64,7 @@ def onboard(request: Request, uid: str, email: str = "", vanity: str = "", refer
         return RedirectResponse("/invalid", status_code=302)
     status = (card_entity.status or "").lower()
     if status == "active":
-        return RedirectResponse(f"/{html.escape(card_entity.vanity or uid)}", status_code=302)
+        return RedirectResponse(f"/{card_entity.vanity or uid}", status_code=302)
     if status == "blocked":
         return RedirectResponse("/blocked", status_code=302)
     templates = _templates(request)
@@ -130,8 +145,7 @@ def legal_terms(request: Request):
         </body></html>
         """
         return HTMLResponse(_apply_brand_footer(html_doc), status_code=404)
-    with open(LEGAL_TERMS_PATH, "r", encoding="utf-8") as handle:
-        safe = html.escape(handle.read()).replace("\n", "<br>")
+    safe = _legal_terms_html(LEGAL_TERMS_PATH)
     templates = _templates(request)
     response = templates.TemplateResponse("legal_terms.html", {"request": request, "safe": safe})
     response.headers["X-Frame-Options"] = "SAMEORIGIN"
@@ -69,7 +69,7 @@ def _slug_message_response(request: Request, *, heading: str, message: str, stat
 
 def _redirect_to_card(card: dict, uid: str) -> RedirectResponse:
     dest = card.get("vanity", uid)
-    return RedirectResponse(f"/{html.escape(dest)}", status_code=303)
+    return RedirectResponse(f"/{dest}", status_code=303)
 
 
 def _wants_json_response(request: Request) -> bool:
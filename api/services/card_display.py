@@ -1,9 +1,14 @@
 """Helpers for card display and public profile routes."""
 from __future__ import annotations
 
+import asyncio
+import binascii
+import logging
 import re
+import threading
 import unicodedata
-import urllib.parse as urlparse
+from collections import Counter
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import Request
@@ -11,6 +16,8 @@ from fastapi import Request
 from api.repositories.sql_repository import SQLRepository
 from api.services.domain_service import active_custom_domain_host
 
+logger = logging.getLogger(__name__)
+
 PUBLIC_BASE = ""
 _repo = SQLRepository()
 
@@ -21,14 +28,27 @@ def configure_public_base(base_url: str) -> None:
     base = (base_url or "").strip()
     PUBLIC_BASE = base.rstrip("/") if base else ""
 
-CPF_RE   = re.compile(r"^\d{11}$")
+E164_RE  = re.compile(r"\+\d{11,15}")
+
+NON_DIGIT_RE = re.compile(r"\D")
+
+PIX_TEXT_STRIP_RE = re.compile(r"[^A-Za-z0-9 \-\.]+")
 
-CNPJ_RE  = re.compile(r"^\d{14}$")
+# Formatos de chave Pix reconhecidos numa unica passada (o grupo que casou indica o tipo)
+PIX_KEY_SHAPE_RE = re.compile(
+    r"(?P<evp>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})"
+    r"|(?P<e164>\+\d{11,15})"
+)
 
-UUID_RE  = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+# Prefixos de esquema aceitos como estao (comparados em minusculas, numa unica chamada startswith)
+_EXTERNAL_URL_SCHEMES = ("http://", "https://", "mailto:", "tel:")
 
 DEFAULT_AVATAR = "/static/img/user01.png"
 
+# Miniatura da foto embutida no vCard/QR offline, gravada ao lado do upload (<arquivo>.qr.jpg)
+VCARD_PHOTO_SIZE = (160, 160)
+VCARD_PHOTO_SUFFIX = ".qr.jpg"
+
 FEATURED_DEFAULT_COLOR = "#FFB473"
 
 FEATURED_ICON_OPTIONS = {
@@ -76,7 +96,7 @@ def normalize_external_url(value: str) -> str:
     v = (value or "").strip()
     if not v:
         return ""
-    if re.match(r"^(https?://|mailto:|tel:)", v, re.IGNORECASE):
+    if v[:8].lower().startswith(_EXTERNAL_URL_SCHEMES):
         return v
     return "https://" + v.lstrip("/")
 
@@ -84,22 +104,30 @@ def _absolute_asset_url(path: str, base: str | None = None) -> str:
     p = (path or "").strip()
     if not p:
         p = DEFAULT_AVATAR
-    if p.startswith("http://") or p.startswith("https://"):
+    if p.startswith(("http://", "https://")):
         return p
     base_url = (base or PUBLIC_BASE).rstrip("/")
     if p.startswith("/"):
         return f"{base_url}{p}"
     return f"{base_url}/{p.lstrip('/')}"
 
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def _is_hex_color(value: str | None) -> bool:
+    """True para cores no formato #RRGGBB (sem regex: tamanho fixo + conjunto de digitos)."""
+    return bool(value) and len(value) == 7 and value[0] == "#" and _HEX_DIGITS.issuperset(value[1:])
+
+
 def _normalize_hex_color(value: str | None, fallback: str = FEATURED_DEFAULT_COLOR) -> str:
     if not value:
         return fallback
     v = value.strip()
     if not v:
         return fallback
-    if re.fullmatch(r"#([0-9a-fA-F]{6})", v):
+    if _is_hex_color(v):
         return v.upper()
-    if re.fullmatch(r"[0-9a-fA-F]{6}", v):
+    if len(v) == 6 and _HEX_DIGITS.issuperset(v):
         return ("#" + v).upper()
     return fallback
 
@@ -124,53 +152,54 @@ def _pick_text_color(value: str) -> str:
     luminance = 0.299 * r + 0.587 * g + 0.114 * b
     return "#2B1600" if luminance > 140 else "#FFF8F0"
 
-def _tlv(_id: str, value: str) -> str:
-    l = f"{len(value):02d}"
-    return f"{_id}{l}{value}"
-
-def _crc16_ccitt(data: str) -> str:
-    # CRC16/CCITT-FALSE (poly 0x1021, init 0xFFFF)
-    crc = 0xFFFF
-    for ch in data:
-        crc ^= (ord(ch) << 8) & 0xFFFF
-        for _ in range(8):
-            if (crc & 0x8000):
-                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return f"{crc:04X}"
+def _tlv(_id: bytes, value: bytes) -> bytes:
+    # Payload EMV montado em bytes: o tamanho é contado em bytes, como o leitor do QR conta
+    return b"%b%02d%b" % (_id, len(value), value)
+
+def _crc16_ccitt(data: bytes) -> bytes:
+    # CRC16/CCITT-FALSE (poly 0x1021, init 0xFFFF); binascii.crc_hqx faz o laço em C
+    return b"%04X" % binascii.crc_hqx(data, 0xFFFF)
 
+@lru_cache(maxsize=4096)
 def _norm_text(s: str, maxlen: int) -> str:
     t = unicodedata.normalize("NFKD", (s or "")).encode("ascii", "ignore").decode("ascii")
-    t = re.sub(r"[^A-Za-z0-9 \-\.]+", "", t).strip() or "NA"
+    t = PIX_TEXT_STRIP_RE.sub("", t).strip() or "NA"
     return t[:maxlen].upper()
 
+_CPF_WEIGHTS_1 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+_CPF_WEIGHTS_2 = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+_CNPJ_WEIGHTS_1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+_CNPJ_WEIGHTS_2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+_ASCII_DIGIT_VALUES = bytes((b - 48) if 48 <= b <= 57 else b for b in range(256))
+
+def _digit_values(digits: str) -> bytes:
+    # Dígitos ASCII -> valores 0..9 numa única passada em C (sem int() por caractere)
+    return digits.encode("ascii").translate(_ASCII_DIGIT_VALUES)
+
 def _is_valid_cpf(cpf: str) -> bool:
-    cpf = re.sub(r"\D", "", cpf)
-    if len(cpf) != 11 or cpf == cpf[0] * 11:
+    """Espera apenas dígitos (o chamador já removeu a formatação)."""
+    if len(cpf) != 11 or not (cpf.isascii() and cpf.isdigit()) or cpf == cpf[0] * 11:
         return False
-    def dv(nums, mult):
-        s = sum(int(d) * m for d, m in zip(nums, mult))
-        r = (s * 10) % 11
-        return 0 if r == 10 else r
-    d1 = dv(cpf[:9], range(10, 1, -1))
-    d2 = dv(cpf[:9] + str(d1), range(11, 1, -1))
-    return cpf[-2:] == f"{d1}{d2}"
+    nums = _digit_values(cpf)
+    r = (sum(d * w for d, w in zip(nums, _CPF_WEIGHTS_1)) * 10) % 11
+    d1 = 0 if r == 10 else r
+    r = (sum(d * w for d, w in zip(nums, _CPF_WEIGHTS_2)) * 10) % 11
+    d2 = 0 if r == 10 else r
+    return nums[9] == d1 and nums[10] == d2
 
 def _is_valid_cnpj(cnpj: str) -> bool:
-    cnpj = re.sub(r"\D", "", cnpj)
-    if len(cnpj) != 14 or cnpj == cnpj[0] * 14:
+    """Espera apenas dígitos (o chamador já removeu a formatação)."""
+    if len(cnpj) != 14 or not (cnpj.isascii() and cnpj.isdigit()) or cnpj == cnpj[0] * 14:
         return False
-    def calc_dv(nums, pesos):
-        s = sum(int(n) * p for n, p in zip(nums, pesos))
-        r = s % 11
-        return 0 if r < 2 else 11 - r
-    p1 = [5,4,3,2,9,8,7,6,5,4,3,2]
-    p2 = [6] + p1
-    d1 = calc_dv(cnpj[:12], p1)
-    d2 = calc_dv(cnpj[:12] + str(d1), p2)
-    return cnpj[-2:] == f"{d1}{d2}"
-
+    nums = _digit_values(cnpj)
+    r = sum(d * w for d, w in zip(nums, _CNPJ_WEIGHTS_1)) % 11
+    d1 = 0 if r < 2 else 11 - r
+    r = sum(d * w for d, w in zip(nums, _CNPJ_WEIGHTS_2)) % 11
+    d2 = 0 if r < 2 else 11 - r
+    return nums[12] == d1 and nums[13] == d2
+
+@lru_cache(maxsize=4096)
 def _normalize_pix_key(pix_key: str) -> str:
     key = (pix_key or "").strip()
 
@@ -181,15 +210,11 @@ def _normalize_pix_key(pix_key: str) -> str:
             raise ValueError("E-mail da chave Pix excede 77 caracteres.")
         return k
 
-    # EVP (aleatória) comum como UUID
-    if UUID_RE.match(key):
+    # EVP (aleatória) como UUID ou telefone já em E.164: um único fullmatch decide os dois casos
+    if PIX_KEY_SHAPE_RE.fullmatch(key):
         return key
 
-    # Já está em E.164?
-    if key.startswith("+") and re.fullmatch(r"\+\d{11,15}", key):
-        return key
-
-    digits = re.sub(r"\D", "", key)
+    digits = NON_DIGIT_RE.sub("", key)
 
     # CPF/CNPJ válidos: retornar exatamente os dígitos
     if _is_valid_cpf(digits):
@@ -203,7 +228,7 @@ def _normalize_pix_key(pix_key: str) -> str:
             phone = "+" + digits
         else:
             phone = "+55" + digits
-        if not re.fullmatch(r"\+\d{11,15}", phone):
+        if not E164_RE.fullmatch(phone):
             raise ValueError("Telefone fora do padrão E.164 após normalização.")
         return phone
 
@@ -216,46 +241,36 @@ def _sanitize_txid(txid: str) -> str:
     return (txid or "***").strip()[:25]
 
 def build_pix_emv(pix_key: str, amount: Optional[float], merchant_name: str, merchant_city: str, txid: str = "***") -> str:
-    # 00: Payload Format Indicator
-    payload = _tlv("00", "01")
-
-    # 01: Point of Initiation Method ? 12 (dinâmico) quando tem valor; 11 (estático) sem valor
-    poi = "12" if (amount or 0) > 0 else "11"
-    payload += _tlv("01", poi)
-
+    has_amount = (amount or 0) > 0
     # 26: Merchant Account Information (GUI + chave normalizada)
-    normalized_key = _normalize_pix_key(pix_key)
-    mai = _tlv("00", "br.gov.bcb.pix") + _tlv("01", normalized_key)
-    payload += _tlv("26", mai)
-
+    normalized_key = _normalize_pix_key(pix_key).encode("utf-8")
+    mai = _tlv(b"00", b"br.gov.bcb.pix") + _tlv(b"01", normalized_key)
+    payload = bytearray(b"000201")  # 00: Payload Format Indicator
+    # 01: Point of Initiation Method ? 12 (dinâmico) quando tem valor; 11 (estático) sem valor
+    payload += b"010212" if has_amount else b"010211"
+    payload += _tlv(b"26", mai)
     # 52: MCC (0000), 53: Moeda (986)
-    payload += _tlv("52", "0000")
-    payload += _tlv("53", "986")
-
+    payload += b"520400005303986"
     # 54: Valor (opcional)
-    if (amount or 0) > 0:
-        payload += _tlv("54", f"{amount:.2f}")
-
+    if has_amount:
+        payload += _tlv(b"54", b"%.2f" % amount)
     # 58: País, 59: Nome, 60: Cidade
-    payload += _tlv("58", "BR")
-    payload += _tlv("59", _norm_text(merchant_name, 25))
-    payload += _tlv("60", _norm_text(merchant_city, 15))
-
+    payload += b"5802BR"
+    payload += _tlv(b"59", _norm_text(merchant_name, 25).encode("ascii"))
+    payload += _tlv(b"60", _norm_text(merchant_city, 15).encode("ascii"))
     # 62: Dados Adicionais (05: txid)
-    add = _tlv("05", _sanitize_txid(txid))
-    payload += _tlv("62", add)
-
-    # 63: CRC16
-    to_crc = payload + "6304"
-    crc = _crc16_ccitt(to_crc)
-    return to_crc + crc
+    payload += _tlv(b"62", _tlv(b"05", _sanitize_txid(txid).encode("utf-8")))
+    # 63: CRC16 (id + tamanho entram no cálculo)
+    payload += b"6304"
+    payload += _crc16_ccitt(payload)
+    return payload.decode("utf-8")
 
 def sanitize_phone(raw: str) -> str:
     s = (raw or "").strip()
     if not s:
         return ""
     keep_plus = s.startswith("+")
-    digits = re.sub(r"\D", "", s)
+    digits = NON_DIGIT_RE.sub("", s)
     return ("+" + digits) if keep_plus else digits
 
 def _int_or_zero(value, default: int = 0) -> int:
@@ -266,17 +281,72 @@ def _int_or_zero(value, default: int = 0) -> int:
     except (TypeError, ValueError):
         return default
 
+# Visitas acumuladas em memoria e gravadas em lote por uma tarefa de fundo: um UPDATE por cartao
+# a cada intervalo, em vez de um commit por visita. O lote e somado no banco, entao varios workers nao conflitam.
+VIEW_FLUSH_INTERVAL_SECONDS = 5.0
+_pending_views: Counter[str] = Counter()
+_pending_views_lock = threading.Lock()
+_view_flusher_task: asyncio.Task | None = None
+
+
 def get_card_view_count(uid: str) -> int:
     entity = _repo.get_card_by_uid(uid)
+    with _pending_views_lock:
+        pending = _pending_views.get(uid, 0)
     if entity:
-        return _int_or_zero(entity.metrics_views, 0)
+        return _int_or_zero(entity.metrics_views, 0) + pending
     return 0
 
-def increment_card_view(uid: str) -> int:
-    updated = _repo.increment_card_views(uid)
-    if updated:
-        return updated
-    return 0
+
+def record_card_view(uid: str) -> None:
+    """Conta uma visita em memoria; a gravacao fica com a tarefa de fundo (nunca na requisicao)."""
+    with _pending_views_lock:
+        _pending_views[uid] += 1
+
+
+def flush_card_views() -> None:
+    """Grava as visitas pendentes; se o banco falhar, o lote volta para a fila e o erro sobe."""
+    with _pending_views_lock:
+        if not _pending_views:
+            return
+        batch = dict(_pending_views)
+        _pending_views.clear()
+    try:
+        _repo.add_card_views(batch)
+    except Exception:
+        with _pending_views_lock:
+            _pending_views.update(batch)
+        raise
+
+
+async def _flush_card_views_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_card_views)
+        except Exception:
+            logger.exception("Falha ao gravar visitas dos cartoes; lote mantido para a proxima tentativa")
+
+
+async def start_card_view_flusher() -> None:
+    """Startup do app: agenda a gravacao periodica das visitas pendentes."""
+    global _view_flusher_task
+    if _view_flusher_task is None or _view_flusher_task.done():
+        _view_flusher_task = asyncio.create_task(_flush_card_views_periodically(VIEW_FLUSH_INTERVAL_SECONDS))
+
+
+async def stop_card_view_flusher() -> None:
+    """Shutdown do app: para a tarefa periodica e grava o que ainda estiver em memoria."""
+    global _view_flusher_task
+    task, _view_flusher_task = _view_flusher_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await asyncio.to_thread(flush_card_views)
+
 
 def should_track_view(request: Request, slug: str) -> bool:
     if request.method.upper() != "GET":
@@ -284,22 +354,32 @@ def should_track_view(request: Request, slug: str) -> bool:
     referer = request.headers.get("referer", "")
     if not referer:
         return True
-    try:
-        parsed = urlparse.urlparse(referer)
-    except ValueError:
-        return True
-    ref_host = (parsed.hostname or "").lower()
-    current_host = (request.headers.get("host") or "").split(":", 1)[0].lower()
-    if ref_host and current_host and ref_host != current_host:
-        return True
-    path = parsed.path or ""
+    # Varredura direta do Referer (sem urlparse/parse_qs): este caminho roda em todo GET de cartao.
+    rest = referer.split("#", 1)[0]
+    rest, _, query = rest.partition("?")
+    scheme_end = rest.find("://")
+    path = rest
+    if scheme_end >= 0:
+        host_start = scheme_end + 3
+        host_end = rest.find("/", host_start)
+        if host_end < 0:
+            host_end = len(rest)
+        netloc = rest[host_start:host_end].rpartition("@")[2]
+        if netloc.startswith("["):
+            ref_host = netloc[1:].split("]", 1)[0].lower()
+        else:
+            ref_host = netloc.split(":", 1)[0].lower()
+        current_host = (request.headers.get("host") or "").split(":", 1)[0].lower()
+        if ref_host and current_host and ref_host != current_host:
+            return True
+        path = rest[host_end:]
     if path.startswith("/auth/logout"):
         return False
-    normalized = {f"/{slug}", f"/u/{slug}"}
-    if path in normalized:
-        q_keys = {k.lower() for k in urlparse.parse_qs(parsed.query or "").keys()}
-        if q_keys & {"pix", "offline"}:
-            return False
+    if query and (path == f"/{slug}" or path == f"/u/{slug}"):
+        for pair in query.split("&"):
+            key, _, value = pair.partition("=")
+            if value and key.lower() in ("pix", "offline"):
+                return False
     return True
 
 def profile_complete(prof: dict) -> bool:
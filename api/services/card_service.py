@@ -30,8 +30,24 @@ def find_card_by_slug(slug: str) -> Tuple[dict, str | None, dict | None]:
     Locate a card by vanity slug or UID. Returns (db, uid, card).
     """
     slug_value = (slug or "").strip()
-    entity = _repo.get_card_by_vanity(slug_value) or _repo.get_card_by_uid(slug_value)
+    if not slug_value:
+        return {}, None, None
+    entity = _repo.get_card_by_slug(slug_value)
     if entity:
         card = _entity_to_card_dict(entity)
         return {}, entity.uid, card
     return {}, None, None
+
+
+def find_card_with_profile(slug: str) -> Tuple[str | None, dict | None, dict]:
+    """
+    Like find_card_by_slug, but also returns the owner's profile fetched in the same query.
+    Returns (uid, card, profile); profile is {} when the card has no owner/profile yet.
+    """
+    slug_value = (slug or "").strip()
+    if not slug_value:
+        return None, None, {}
+    entity, profile = _repo.get_card_with_profile_by_slug(slug_value)
+    if not entity:
+        return None, None, {}
+    return entity.uid, _entity_to_card_dict(entity), profile or {}
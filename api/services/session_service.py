@@ -2,10 +2,10 @@
 from __future__ import annotations
 
 import secrets
-import time
 from datetime import datetime, timedelta, timezone
 
 from fastapi import Request, Response
+from sqlalchemy import delete
 
 from api.core.config import get_settings
 from api.db.models import UserSession
@@ -37,7 +37,10 @@ def current_user_email(request: Request) -> str | None:
     with get_session() as session:
         db_session = session.get(UserSession, token)
         if db_session:
-            if db_session.expires_at and db_session.expires_at < now:
+            expires_at = db_session.expires_at
+            if expires_at and expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at and expires_at < now:
                 session.delete(db_session)
                 session.commit()
                 return None
@@ -68,8 +71,8 @@ def delete_session(token: str) -> None:
     """Remove a session token from persistent stores."""
     if not token:
         return
+    # DELETE direto (um round trip, sem SELECT/carregar a entidade); so faz commit se removeu algo
     with get_session() as session:
-        entity = session.get(UserSession, token)
-        if entity:
-            session.delete(entity)
+        result = session.execute(delete(UserSession).where(UserSession.token == token))
+        if result.rowcount:
             session.commit()
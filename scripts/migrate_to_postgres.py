@@ -1,7 +1,7 @@
 """One-off migration script: JSON (data.json) -> Postgres."""
 from __future__ import annotations
 
-import json
+import orjson
 from pathlib import Path
 import sys
 from datetime import datetime, timezone
@@ -30,8 +30,8 @@ def _to_datetime(value) -> datetime | None:
 def _load_json(path: Path) -> dict:
     if not path.exists():
         raise SystemExit(f"Arquivo nao encontrado: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Leitura única em bytes + parse em C; o data.json legado pode ter vários MB.
+    data = orjson.loads(path.read_bytes())
     # defaults
     data.setdefault("users", {})
     data.setdefault("cards", {})
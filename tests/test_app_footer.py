@@ -45,3 +45,46 @@ def test_auth_manual_pages_can_receive_standard_soomei_footer():
     assert "soomei-watermark" in rendered
     assert "cartão digital" in rendered
     assert rendered.index("Senha") < rendered.index("soomei-watermark")
+
+
+def test_fingerprinted_css_is_served_from_memory_with_etag():
+    from fastapi.testclient import TestClient
+
+    from api.app import CSS_HREF, app
+
+    client = TestClient(app)
+    first = client.get(CSS_HREF)
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("text/css")
+    assert first.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = first.headers["etag"]
+
+    second = client.get(CSS_HREF, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_brand_footer_goes_after_main_for_utility_shell_pages():
+    body = "<main class='wrap utility-shell'><section>x</section></main></body>"
+
+    rendered = _brand_footer_inject(body)
+
+    assert rendered.index("</main>") < rendered.index("soomei-footer-mark")
+    assert rendered.endswith("</body>")
+
+
+def test_page_scripts_are_fingerprinted_and_served_immutable():
+    from fastapi.testclient import TestClient
+
+    from api.app import app
+    from api.routers import card_edit, cards
+
+    assert cards.CARD_JS_SRC.startswith("/static/js/card.")
+    assert card_edit.EDIT_JS_SRC.startswith("/static/js/edit.")
+    client = TestClient(app)
+    for src, marker in ((cards.CARD_JS_SRC, b"offlineSection"), (card_edit.EDIT_JS_SRC, b"__SOOMEI_EDIT")):
+        resp = client.get(src)
+        assert resp.status_code == 200
+        assert "javascript" in resp.headers["content-type"]
+        assert resp.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert marker in resp.content
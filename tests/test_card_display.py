@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from api.services import card_display
+
+
+def test_is_hex_color_accepts_only_hash_rrggbb():
+    assert card_display._is_hex_color("#0a1B2c")
+    assert not card_display._is_hex_color("0a1B2c")
+    assert not card_display._is_hex_color("#0a1B2")
+    assert not card_display._is_hex_color("#0a1B2g")
+    assert not card_display._is_hex_color("#0a1B2c\n")
+    assert not card_display._is_hex_color("")
+    assert not card_display._is_hex_color(None)
+
+
+def test_normalize_hex_color_uppercases_and_falls_back():
+    assert card_display._normalize_hex_color(" #ffb473 ") == "#FFB473"
+    assert card_display._normalize_hex_color("ffb473") == "#FFB473"
+    assert card_display._normalize_hex_color("#fff", "#000000") == "#000000"
+    assert card_display._normalize_hex_color(None, "#000000") == "#000000"
+
+
+def test_crc16_ccitt_matches_ccitt_false_check_value():
+    assert card_display._crc16_ccitt(b"123456789") == b"29B1"
+    assert card_display._crc16_ccitt(b"") == b"FFFF"
+
+
+def test_build_pix_emv_ends_with_valid_crc():
+    payload = card_display.build_pix_emv("fulano@example.com", 10.5, "Fulano de Tal", "Sao Paulo", txid="***")
+    assert payload.startswith("000201010212")
+    assert "540510.50" in payload
+    assert payload[-8:-4] == "6304"
+    assert payload[-4:].encode("ascii") == card_display._crc16_ccitt(payload[:-4].encode("ascii"))
+
+
+def test_tlv_length_counts_utf8_bytes():
+    assert card_display._tlv(b"01", "joão@x.com".encode("utf-8")) == "0111joão@x.com".encode("utf-8")
+    payload = card_display.build_pix_emv("joão@x.com", None, "Fulano", "Recife")
+    assert "0111joão@x.com" in payload
+    raw = payload.encode("utf-8")
+    assert raw[-4:] == card_display._crc16_ccitt(raw[:-4])
+
+
+def test_normalize_pix_key_shapes():
+    evp = "123e4567-e89b-12d3-a456-426614174000"
+    assert card_display._normalize_pix_key(evp) == evp
+    assert card_display._normalize_pix_key("+5511987654321") == "+5511987654321"
+    assert card_display._normalize_pix_key("(11) 98765-4321") == "+5511987654321"
+    assert card_display._normalize_pix_key(" Fulano@Example.com ") == "fulano@example.com"
+    assert card_display._normalize_pix_key("529.982.247-25") == "52998224725"
+
+
+def test_cpf_and_cnpj_check_digits():
+    assert card_display._is_valid_cpf("52998224725")
+    assert not card_display._is_valid_cpf("52998224724")
+    assert not card_display._is_valid_cpf("11111111111")
+    assert card_display._is_valid_cnpj("11222333000181")
+    assert not card_display._is_valid_cnpj("11222333000180")
+
+
+def test_cpf_and_cnpj_reject_formatted_or_non_ascii_input():
+    # A formatação é removida em _normalize_pix_key antes da validação.
+    assert not card_display._is_valid_cpf("529.982.247-25")
+    assert not card_display._is_valid_cnpj("11.222.333/0001-81")
+    assert not card_display._is_valid_cpf("5299822472²")
+
+
+def _view_request(referer: str, method: str = "GET") -> SimpleNamespace:
+    return SimpleNamespace(method=method, headers={"referer": referer, "host": "soomei.cc:8000"})
+
+
+def test_should_track_view_skips_own_pix_offline_and_logout_referers():
+    track = card_display.should_track_view
+    assert track(_view_request(""), "ana")
+    assert not track(_view_request("", method="POST"), "ana")
+    assert not track(_view_request("https://SOOMEI.cc/ana?pix=qr#top"), "ana")
+    assert not track(_view_request("https://soomei.cc/u/ana?x=1&offline=1"), "ana")
+    assert not track(_view_request("https://soomei.cc/auth/logout"), "ana")
+    assert track(_view_request("https://soomei.cc/ana?pix="), "ana")
+    assert track(_view_request("https://other.cc/ana?pix=qr"), "ana")
+    assert track(_view_request("https://soomei.cc/bob?pix=qr"), "ana")
+
+
+def test_normalize_external_url_keeps_known_schemes_case_insensitively():
+    assert card_display.normalize_external_url(" HTTPS://soomei.cc ") == "HTTPS://soomei.cc"
+    assert card_display.normalize_external_url("Mailto:ana@soomei.cc") == "Mailto:ana@soomei.cc"
+    assert card_display.normalize_external_url("tel:+5511999999999") == "tel:+5511999999999"
+    assert card_display.normalize_external_url("//soomei.cc/ana") == "https://soomei.cc/ana"
+    assert card_display.normalize_external_url("") == ""
+
+
+def test_record_card_view_batches_writes(monkeypatch):
+    batches = []
+    monkeypatch.setattr(card_display._repo, "add_card_views", batches.append)
+    monkeypatch.setattr(
+        card_display._repo,
+        "get_card_by_uid",
+        lambda uid: SimpleNamespace(metrics_views=10),
+    )
+    card_display._pending_views.clear()
+
+    card_display.record_card_view("a")
+    card_display.record_card_view("b")
+    card_display.record_card_view("a")
+    assert batches == []
+    assert card_display.get_card_view_count("a") == 12
+
+    card_display.flush_card_views()
+    assert batches == [{"a": 2, "b": 1}]
+    assert card_display.get_card_view_count("a") == 10
+
+    card_display.record_card_view("b")
+    card_display.flush_card_views()
+    card_display.flush_card_views()
+    assert batches == [{"a": 2, "b": 1}, {"b": 1}]
+
+
+def test_flush_card_views_keeps_batch_when_write_fails(monkeypatch):
+    def _fail(_batch):
+        raise RuntimeError("banco fora")
+
+    monkeypatch.setattr(card_display._repo, "add_card_views", _fail)
+    card_display._pending_views.clear()
+    card_display.record_card_view("a")
+
+    with pytest.raises(RuntimeError):
+        card_display.flush_card_views()
+    card_display.record_card_view("a")
+
+    assert card_display._pending_views == {"a": 2}
+    card_display._pending_views.clear()
+
+
+def test_view_flusher_writes_pending_views_while_idle(monkeypatch):
+    batches = []
+    monkeypatch.setattr(card_display._repo, "add_card_views", batches.append)
+    monkeypatch.setattr(card_display, "VIEW_FLUSH_INTERVAL_SECONDS", 0.01)
+    card_display._pending_views.clear()
+
+    async def scenario():
+        await card_display.start_card_view_flusher()
+        card_display.record_card_view("a")
+        for _ in range(100):
+            if batches:
+                break
+            await asyncio.sleep(0.01)
+        card_display.record_card_view("b")
+        await card_display.stop_card_view_flusher()
+
+    asyncio.run(scenario())
+    assert batches == [{"a": 1}, {"b": 1}]
@@ -6,6 +6,7 @@ import json
 import re
 import shutil
 import subprocess
+from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
@@ -30,11 +31,21 @@ class _Repo:
         self.saved_profile = profile
 
 
+def _patch_owner_card(monkeypatch) -> None:
+    card = {"user": "owner@example.com"}
+    monkeypatch.setattr(card_edit, "find_card_by_slug", lambda _slug: ({}, "tksc4o", card))
+    monkeypatch.setattr(
+        card_edit,
+        "find_card_with_profile",
+        lambda _slug: ("tksc4o", card, _Repo().get_profile("owner@example.com")),
+    )
+
+
 class _PhotoUpload:
     filename = "foto.jpg"
     content_type = "image/jpeg"
 
-    async def read(self) -> bytes:
+    async def read(self, size: int = -1) -> bytes:
         return b"\xff\xd8\xffimage-data"
 
 
@@ -96,11 +107,7 @@ def _photo_json_request(token: str) -> Request:
 
 def test_editor_renders_session_csrf_and_valid_javascript(monkeypatch):
     request = _request()
-    monkeypatch.setattr(
-        card_edit,
-        "find_card_by_slug",
-        lambda _slug: ({}, "tksc4o", {"user": "owner@example.com"}),
-    )
+    _patch_owner_card(monkeypatch)
     monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
     monkeypatch.setattr(card_edit, "_sql_repo", _Repo())
     monkeypatch.setattr(card_edit, "SETTINGS", SimpleNamespace(custom_domains_enabled=False))
@@ -109,8 +116,14 @@ def test_editor_renders_session_csrf_and_valid_javascript(monkeypatch):
     response = card_edit.edit_card("cezar", request)
     body = response.body.decode("utf-8")
     expected = csrf.ensure_csrf_token(request)
+    script = Path("web/js/edit.js").read_text(encoding="utf-8")
+    config = json.loads(re.search(r"window\.__SOOMEI_EDIT = (\{.*?\});</script>", body).group(1))
 
     assert f"name='csrf_token' value='{expected}'" in body
+    assert config["slug"] == "cezar"
+    assert config["uid"] == "tksc4o"
+    assert config["csrfToken"] == expected
+    assert f"<script src='{card_edit.EDIT_JS_SRC}'></script>" in body
     assert f"action='/edit/cezar?csrf_token={expected}'" in body
     assert "class='edit-form'" in body
     assert "Central do cartão" in body
@@ -122,16 +135,16 @@ def test_editor_renders_session_csrf_and_valid_javascript(monkeypatch):
     assert "data-edit-jump='portfolio'" in body
     assert "data-edit-jump='seguranca'" in body
     assert "data-edit-panel='perfil'" in body
-    assert "function openEditPanel(key, shouldScroll)" in body
+    assert "function openEditPanel(key, shouldScroll)" in script
     assert "id='backToEditMenu'" in body
-    assert "function showEditMenu()" in body
-    assert "backToEditMenu.classList.remove('is-hidden')" in body
-    assert "Object.keys(sectionRegistry).forEach" in body
+    assert "function showEditMenu()" in script
+    assert "backToEditMenu.classList.remove('is-hidden')" in script
+    assert "Object.keys(sectionRegistry).forEach" in script
     assert "name='featured_icon'" in body
     assert "class='link-icon-choice featured-icon-choice'" in body
     assert "value='calendar' checked" in body
     assert "Ícone Agenda" in body
-    assert "hexToRgba" in body
+    assert "hexToRgba" in script
     assert "id='featuredColorReset' onclick=" in body
     assert "id='togglePassword' aria-expanded='false' onclick=" in body
     assert "id='spotlightBadgeShow' name='spotlight_badge_show'" in body
@@ -146,24 +159,24 @@ def test_editor_renders_session_csrf_and_valid_javascript(monkeypatch):
     assert "class='link-icon-choice'" in body
     assert "value='auto' checked" in body
     assert "value='course'" in body
-    assert "hydrateSwitch(\"input[id='linkVisible\" + linkSwitchIndex + \"']\")" in body
+    assert "hydrateSwitch(\"input[id='linkVisible\" + linkSwitchIndex + \"']\")" in script
     assert "id='shareReferralInvite'" in body
     assert "referral-share-btn__icon" in body
     assert "Compartilhar convite pelo WhatsApp" in body
     assert "id='referralShareBackdrop'" in body
     assert "id='referralSharePhone'" in body
-    assert "sendReferralViaWhatsApp" in body
-    assert "https://wa.me/" in body
+    assert "sendReferralViaWhatsApp" in script
+    assert "https://wa.me/" in script
     assert "data-switch-label" in body
     assert "l.textContent=this.checked?&#x27;Exibindo&#x27;:&#x27;Oculto&#x27;" in body
     assert "id='addSlug' class='btn ghost'" in body
     assert "href='/slug/select/tksc4o?next=edit'" in body
     assert "window.soomeiOpenSlugModal" in body
-    assert "featuredColor.dispatchEvent(new Event('input'" in body
-    assert "function focusInvalidField(field)" in body
-    assert "form.addEventListener('invalid'" in body
-    assert "field.reportValidity" in body
-    assert "style.setProperty('background', 'linear-gradient(135deg,#4f8cff,#73d6ff)', 'important')" in body
+    assert "featuredColor.dispatchEvent(new Event('input'" in script
+    assert "function focusInvalidField(field)" in script
+    assert "form.addEventListener('invalid'" in script
+    assert "field.reportValidity" in script
+    assert "style.setProperty('background', 'linear-gradient(135deg,#4f8cff,#73d6ff)', 'important')" in script
     assert "Cache-Control" in response.headers
     assert "csrf_token=" in response.headers.get("set-cookie", "")
 
@@ -172,6 +185,7 @@ def test_editor_renders_session_csrf_and_valid_javascript(monkeypatch):
         pytest.skip("Node.js is required only for the rendered JavaScript syntax check")
     scripts = re.findall(r"<script>(.*?)</script>", body, flags=re.DOTALL)
     assert scripts
+    scripts.append(script)
     for script in scripts:
         result = subprocess.run([node, "--check"], input=script, text=True, capture_output=True)
         assert result.returncode == 0, result.stderr
@@ -180,17 +194,13 @@ def test_editor_renders_session_csrf_and_valid_javascript(monkeypatch):
 def test_photo_only_submission_preserves_profile_fields(monkeypatch):
     request = _request()
     repo = _Repo()
-    monkeypatch.setattr(
-        card_edit,
-        "find_card_by_slug",
-        lambda _slug: ({}, "tksc4o", {"user": "owner@example.com"}),
-    )
+    _patch_owner_card(monkeypatch)
     monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
     monkeypatch.setattr(card_edit, "_sql_repo", repo)
     monkeypatch.setattr(
         card_edit,
         "_save_resized_image",
-        lambda _data, filename, _size: f"/static/uploads/{filename}?v=new",
+        lambda _data, filename, _size, **_kwargs: f"/static/uploads/{filename}?v=new",
     )
     token = csrf.ensure_csrf_token(request)
 
@@ -221,11 +231,7 @@ def test_photo_only_submission_preserves_profile_fields(monkeypatch):
 def test_empty_submission_with_existing_complete_profile_redirects_without_error(monkeypatch):
     request = _request()
     repo = _Repo()
-    monkeypatch.setattr(
-        card_edit,
-        "find_card_by_slug",
-        lambda _slug: ({}, "tksc4o", {"user": "owner@example.com"}),
-    )
+    _patch_owner_card(monkeypatch)
     monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
     monkeypatch.setattr(card_edit, "_sql_repo", repo)
     token = csrf.ensure_csrf_token(request)
@@ -257,17 +263,13 @@ def test_empty_submission_with_existing_complete_profile_redirects_without_error
 def test_hidden_photo_data_url_submission_updates_photo(monkeypatch):
     request = _request()
     repo = _Repo()
-    monkeypatch.setattr(
-        card_edit,
-        "find_card_by_slug",
-        lambda _slug: ({}, "tksc4o", {"user": "owner@example.com"}),
-    )
+    _patch_owner_card(monkeypatch)
     monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
     monkeypatch.setattr(card_edit, "_sql_repo", repo)
     monkeypatch.setattr(
         card_edit,
         "_save_resized_image",
-        lambda _data, filename, _size: f"/static/uploads/{filename}?v=hidden",
+        lambda _data, filename, _size, **_kwargs: f"/static/uploads/{filename}?v=hidden",
     )
     token = csrf.ensure_csrf_token(request)
     data_url = "data:image/jpeg;base64," + base64.b64encode(b"\xff\xd8\xffimage-data").decode("ascii")
@@ -306,17 +308,13 @@ def test_hidden_photo_data_url_submission_updates_photo(monkeypatch):
 def test_hidden_cover_data_url_submission_updates_cover(monkeypatch):
     request = _request()
     repo = _Repo()
-    monkeypatch.setattr(
-        card_edit,
-        "find_card_by_slug",
-        lambda _slug: ({}, "tksc4o", {"user": "owner@example.com"}),
-    )
+    _patch_owner_card(monkeypatch)
     monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
     monkeypatch.setattr(card_edit, "_sql_repo", repo)
     monkeypatch.setattr(
         card_edit,
         "_save_resized_image",
-        lambda _data, filename, _size: f"/static/uploads/{filename}?v=cover",
+        lambda _data, filename, _size, **_kwargs: f"/static/uploads/{filename}?v=cover",
     )
     token = csrf.ensure_csrf_token(request)
     data_url = "data:image/jpeg;base64," + base64.b64encode(b"\xff\xd8\xffimage-data").decode("ascii")
@@ -403,17 +401,13 @@ def test_json_photo_upload_avoids_multipart_and_preserves_profile(monkeypatch):
     repo = _Repo()
     token = csrf.ensure_csrf_token(_request())
     request = _photo_json_request(token)
-    monkeypatch.setattr(
-        card_edit,
-        "find_card_by_slug",
-        lambda _slug: ({}, "tksc4o", {"user": "owner@example.com"}),
-    )
+    _patch_owner_card(monkeypatch)
     monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
     monkeypatch.setattr(card_edit, "_sql_repo", repo)
     monkeypatch.setattr(
         card_edit,
         "_save_resized_image",
-        lambda _data, filename, _size: f"/static/uploads/{filename}?v=json",
+        lambda _data, filename, _size, **_kwargs: f"/static/uploads/{filename}?v=json",
     )
 
     response = asyncio.run(card_edit.save_profile_photo("cezar", request))
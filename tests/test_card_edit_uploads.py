@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from api.routers import card_edit
+
+
+def _jpeg_bytes(color: tuple[int, int, int]) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 40), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_save_resized_image_uses_content_addressed_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(card_edit, "UPLOADS_DIR", str(tmp_path))
+    (tmp_path / "uid1.jpg").write_bytes(b"legacy")
+    (tmp_path / "uid1_cover.jpg").write_bytes(b"cover")
+
+    first = card_edit._save_resized_image(_jpeg_bytes((255, 0, 0)), "uid1.jpg", (800, 800))
+    second = card_edit._save_resized_image(_jpeg_bytes((0, 0, 255)), "uid1.jpg", (800, 800))
+
+    assert first != second
+    assert second.startswith("/static/uploads/uid1-") and second.endswith(".jpg")
+    assert "?" not in second
+    # Ate o perfil ser gravado, a versao anterior continua no disco.
+    assert first.rsplit("/", 1)[1] in os.listdir(tmp_path)
+
+    card_edit._prune_replaced_uploads([second], {"photo_url": second})
+    # Versoes anteriores do mesmo slot sao removidas; outros slots ficam intactos.
+    assert sorted(os.listdir(tmp_path)) == sorted([second.rsplit("/", 1)[1], "uid1_cover.jpg"])
+
+
+def test_save_resized_image_writes_vcard_thumbnail_and_prunes_old_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(card_edit, "UPLOADS_DIR", str(tmp_path))
+    big = io.BytesIO()
+    Image.new("RGB", (1000, 600), (10, 20, 30)).save(big, format="JPEG")
+
+    first = card_edit._save_resized_image(big.getvalue(), "uid2.jpg", (800, 800), vcard_thumb=True)
+    first_name = first.rsplit("/", 1)[1]
+    thumb = Image.open(tmp_path / f"{first_name}.qr.jpg")
+    assert max(thumb.size) == 160
+
+    second = card_edit._save_resized_image(_jpeg_bytes((0, 255, 0)), "uid2.jpg", (800, 800), vcard_thumb=True)
+    second_name = second.rsplit("/", 1)[1]
+    card_edit._prune_replaced_uploads([second], {"photo_url": second})
+    assert sorted(os.listdir(tmp_path)) == sorted([second_name, f"{second_name}.qr.jpg"])
+
+
+def test_prune_keeps_compacted_portfolio_file_still_in_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(card_edit, "UPLOADS_DIR", str(tmp_path))
+    card_edit._save_resized_image(_jpeg_bytes((255, 0, 0)), "uid4/portfolio_1.jpg", (1600, 900))
+    second_a = card_edit._save_resized_image(_jpeg_bytes((0, 255, 0)), "uid4/portfolio_2.jpg", (1600, 900))
+    # Slot 1 removido: a lista compactada deixa portfolio_2-A na posicao 1 e o slot 2 recebe upload novo.
+    second_b = card_edit._save_resized_image(_jpeg_bytes((0, 0, 255)), "uid4/portfolio_2.jpg", (1600, 900))
+
+    card_edit._prune_replaced_uploads([second_b], {"portfolio_images": [second_a, second_b]})
+
+    remaining = os.listdir(tmp_path / "uid4")
+    assert second_a.rsplit("/", 1)[1] in remaining
+    assert second_b.rsplit("/", 1)[1] in remaining
+
+
+def test_read_image_upload_stops_reading_past_the_size_limit():
+    class _Upload:
+        content_type = "image/jpeg"
+
+        def __init__(self) -> None:
+            self.requested: list[int] = []
+
+        async def read(self, size: int = -1) -> bytes:
+            self.requested.append(size)
+            data = b"\xff\xd8\xff" + b"0" * (card_edit.MAX_UPLOAD_BYTES * 4)
+            return data if size < 0 else data[:size]
+
+    upload = _Upload()
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(card_edit._read_image_upload(upload))
+    assert exc.value.detail == "Imagem excede 2MB."
+    assert upload.requested == [card_edit.MAX_UPLOAD_BYTES + 1]
+
+
+def test_save_edit_keeps_previous_photo_when_later_validation_fails(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    monkeypatch.setattr(card_edit, "UPLOADS_DIR", str(tmp_path))
+    old_url = card_edit._save_resized_image(_jpeg_bytes((255, 0, 0)), "uid3.jpg", (800, 800))
+    saved = []
+    card = {"user": "owner@example.com"}
+    profile = {"full_name": "Ana", "title": "Dev", "whatsapp": "5534999999999", "photo_url": old_url}
+    monkeypatch.setattr(card_edit, "find_card_with_profile", lambda _slug: ("uid3", card, dict(profile)))
+    monkeypatch.setattr(card_edit, "current_user_email", lambda _request: "owner@example.com")
+    monkeypatch.setattr(card_edit.csrf, "validate_csrf", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(card_edit, "_sql_repo", SimpleNamespace(upsert_profile=lambda _email, prof: saved.append(prof)))
+
+    class _Upload:
+        filename = "foto.jpg"
+        content_type = "image/jpeg"
+
+        async def read(self, size: int = -1) -> bytes:
+            return _jpeg_bytes((0, 0, 255))
+
+    form = dict(
+        full_name="Ana", title="Dev", whatsapp="5534999999999", email_public="", site_url="", address="",
+        google_review_url="", google_review_show="", featured_label="", featured_url="", featured_icon="briefcase",
+        featured_color="#FFB473", featured_enabled="", label1="", href1="", label2="", href2="", label3="",
+        href3="", label4="", href4="", theme_color="", pix_key="", current_password="", new_password="",
+        confirm_password="", password_mode="0", cover_show="1", cover_remove="0", portfolio_enabled="",
+        portfolio_remove1="0", portfolio_remove2="0", portfolio_remove3="0", portfolio_remove4="0",
+        portfolio_remove5="0", cover=None, portfolio1=None, portfolio2=None, portfolio3=None, portfolio4=None,
+        portfolio5=None, csrf_token="",
+    )
+    response = asyncio.run(
+        card_edit.save_edit(
+            "ana", SimpleNamespace(), photo=_Upload(), cover_data_url="data:image/jpeg;base64,AAAA", **form
+        )
+    )
+
+    assert response.status_code == 303
+    assert response.headers["location"].startswith("/edit/ana?error=")
+    assert saved == []
+    # O perfil gravado ainda aponta para a foto antiga: ela precisa continuar no disco.
+    assert old_url.rsplit("/", 1)[1] in os.listdir(tmp_path)
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import os
 from types import SimpleNamespace
 
+import pytest
+
 from api.routers import cards
 
 
+@pytest.fixture(autouse=True)
+def _clear_visitor_html_cache():
+    with cards._visitor_html_lock:
+        cards._visitor_html_cache.clear()
+        cards._visitor_html_bytes = 0
+    yield
+
+
 def test_v1_featured_button_renders_selected_left_icon(monkeypatch):
     monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
     profile = {
@@ -119,6 +130,19 @@ def test_additional_links_respect_visibility_and_explicit_type(monkeypatch):
     assert "Link oculto" not in body
 
 
+def test_link_with_non_string_type_falls_back_to_detection(monkeypatch):
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    profile = {
+        "full_name": "Cezar Damasceno",
+        "links": [{"label": "Insta", "href": "https://instagram.com/cezar", "type": ["site"], "category": {}}],
+    }
+
+    response = cards.visitor_public_card(profile, "cezar", is_owner=False, card={}, request=None)
+
+    assert response.status_code == 200
+    assert "brand-instagram" in response.body.decode("utf-8")
+
+
 def test_active_spotlight_badge_renders_clickable_explanation(monkeypatch):
     monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
     monkeypatch.setattr(
@@ -216,3 +240,441 @@ def test_blocked_card_redirects_to_blocked_screen():
 
     assert response.status_code == 302
     assert response.headers["location"] == "/blocked"
+
+
+def test_qr_png_bytes_is_cached_per_payload():
+    cards._qr_png_bytes.cache_clear()
+    first = cards._qr_png_bytes("00020101021126")
+    second = cards._qr_png_bytes("00020101021126")
+
+    assert first.startswith(b"\x89PNG")
+    assert second is first
+    assert cards._qr_png_bytes.cache_info().hits == 1
+
+
+def test_pix_qr_data_url_is_cached_per_payload():
+    cards._pix_qr_data_url.cache_clear()
+    first = cards._pix_qr_data_url("00020101021126")
+    second = cards._pix_qr_data_url("00020101021126")
+
+    assert first.startswith("data:image/png;base64,")
+    assert second is first
+    assert cards._pix_qr_data_url.cache_info().hits == 1
+
+
+def test_visitor_card_html_is_reused_until_profile_changes(monkeypatch):
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    calls = []
+
+    def _badge(uid):
+        calls.append(uid)
+        return None
+
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", _badge)
+    profile = {"full_name": "Ana Souza", "links": []}
+    card = {"uid": "uidana", "vanity": "ana"}
+
+    first = cards.visitor_public_card(profile, "ana", is_owner=False, card=card, request=None)
+    second = cards.visitor_public_card(profile, "ana", is_owner=False, card=card, request=None)
+    assert second.body == first.body
+    assert calls == ["uidana"]
+
+    edited = cards.visitor_public_card({**profile, "full_name": "Ana Lima"}, "ana", is_owner=False, card=card, request=None)
+    assert "Ana Lima" in edited.body.decode("utf-8")
+    assert calls == ["uidana", "uidana"]
+
+    cards.visitor_public_card(profile, "ana", is_owner=True, card=card, request=None)
+    assert calls == ["uidana", "uidana", "uidana"]
+
+
+def test_visitor_card_keeps_profile_text_unstripped_in_meta_and_offline_vcard(monkeypatch):
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", lambda _uid: None)
+    calls = []
+    monkeypatch.setattr(cards, "_offline_vcard_qr", lambda *args: calls.append(args) or "")
+    profile = {"full_name": " Ana Souza ", "title": " Dev ", "email_public": " ana@x.com ", "links": []}
+
+    body = cards.visitor_public_card(
+        profile, "ana", is_owner=False, card={"uid": "uidana", "vanity": "ana"}, request=None
+    ).body.decode("utf-8")
+
+    assert "<title>Soomei |  Ana Souza </title>" in body
+    assert "<meta property='og:description' content=' Dev '>" in body
+    assert "href='mailto:ana@x.com'" in body
+    assert calls[0][:2] == (" Ana Souza ", " Dev ")
+    assert calls[0][3] == " ana@x.com "
+
+
+def test_visitor_html_key_ignores_view_metrics_and_pin():
+    profile = {"full_name": "Ana Souza"}
+    card = {"uid": "uidana", "vanity": "ana", "status": "active", "pin": "123456", "metrics": {"views": 1}, "custom_domain": {}}
+
+    key = cards._visitor_html_key(profile, "ana", card, None)
+    assert key == cards._visitor_html_key(profile, "ana", {**card, "metrics": {"views": 2}, "pin": "654321"}, None)
+    assert b"123456" not in key[-1]
+    assert key != cards._visitor_html_key(profile, "ana", {**card, "custom_domain": {"active_host": "ana.com"}}, None)
+
+
+def test_offline_vcard_qr_is_rebuilt_only_when_photo_changes(tmp_path, monkeypatch):
+    from PIL import Image
+
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards, "UPLOADS_DIR", str(tmp_path))
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", lambda _uid: None)
+    Image.new("RGB", (32, 32), "red").save(tmp_path / "ana.jpg")
+    cards._offline_vcard_qr.cache_clear()
+    profile = {"full_name": "Ana Souza", "photo_url": "/static/uploads/ana.jpg?v=1", "links": []}
+    card = {"uid": "uidana", "vanity": "ana"}
+
+    cards.visitor_public_card(profile, "ana", is_owner=True, card=card, request=None)
+    cards.visitor_public_card(profile, "ana", is_owner=True, card=card, request=None)
+    assert cards._offline_vcard_qr.cache_info().misses == 1
+    assert cards._offline_vcard_qr.cache_info().hits == 1
+
+    stat = (tmp_path / "ana.jpg").stat()
+    os.utime(tmp_path / "ana.jpg", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cards.visitor_public_card(profile, "ana", is_owner=True, card=card, request=None)
+    assert cards._offline_vcard_qr.cache_info().misses == 2
+
+
+def test_platform_regex_keeps_priority_and_skips_embedded_domains():
+    def detect(text: str) -> str | None:
+        match = cards._PLATFORM_RE.match(text)
+        return match.lastgroup if match else None
+
+    assert detect("facebook https://instagram.com/ana") == "instagram"
+    assert detect(" @ana") == "instagram"
+    assert detect("canal https://youtu.be/abc") == "youtube"
+    assert detect("perfil https://www.x.com/ana") == "twitter"
+    assert detect("arquivos https://dropbox.com/s/abc") is None
+    assert detect("loja https://loja.com") is None
+
+
+def test_vcard_photo_b64_thumbnails_and_folds(tmp_path):
+    import base64
+    import io
+
+    from PIL import Image
+
+    photo = tmp_path / "big.jpg"
+    Image.new("RGB", (1200, 800), "blue").save(photo, format="JPEG")
+    cards._vcard_photo_b64.cache_clear()
+    mtime_ns = photo.stat().st_mtime_ns
+
+    folded = cards._vcard_photo_b64(str(photo), mtime_ns)
+    assert cards._vcard_photo_b64(str(photo), mtime_ns) is folded
+    assert all(len(line.strip()) <= 76 for line in folded.split("\r\n"))
+    thumb = Image.open(io.BytesIO(base64.b64decode(folded.replace("\r\n ", ""))))
+    assert max(thumb.size) == 160
+
+
+def test_link_platform_prefers_explicit_type_and_is_memoized():
+    cards._link_platform.cache_clear()
+
+    assert cards._link_platform("Agenda", "https://cal.com/ana", "calendar") == "calendar"
+    assert cards._link_platform("Meu perfil", "https://instagram.com/ana") == "instagram"
+    assert cards._link_platform("Meu perfil", "https://instagram.com/ana") == "instagram"
+    assert cards._link_platform("Ligue", "tel:+5511999999999") == "phone"
+    assert cards._link_platform.cache_info().hits == 1
+
+
+def test_owner_view_chip_uses_pt_br_thousands_separator(monkeypatch):
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", lambda _uid: None)
+
+    response = cards.visitor_public_card(
+        {"full_name": "Ana Souza", "links": []},
+        "ana",
+        is_owner=True,
+        view_count=1234567,
+        card={"uid": "uidana", "vanity": "ana"},
+        request=None,
+    )
+
+    assert "<span class='view-chip__count'>1.234.567</span>" in response.body.decode("utf-8")
+
+
+def test_maps_links_are_dropped_before_platform_detection(monkeypatch):
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", lambda _uid: None)
+    cards._link_platform.cache_clear()
+    profile = {
+        "full_name": "Ana Souza",
+        "address": "Rua A, 10",
+        "links": [
+            {"label": "Como chegar", "href": "https://Maps.Google.com/?q=rua"},
+            {"label": "Instagram", "href": "https://instagram.com/ana"},
+        ],
+    }
+
+    body = cards.visitor_public_card(profile, "ana", is_owner=False, card={}, request=None).body.decode("utf-8")
+
+    assert "Como chegar" not in body
+    assert "brand-instagram" in body
+    assert cards._link_platform.cache_info().misses == 1
+
+
+def test_cached_visitor_card_answers_matching_etag_with_304(monkeypatch):
+    from starlette.requests import Request
+
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", lambda _uid: None)
+    profile = {"full_name": "Ana Souza", "links": []}
+    card = {"uid": "uidana", "vanity": "ana"}
+
+    def request(headers=()):
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "https",
+                "path": "/ana",
+                "query_string": b"",
+                "headers": [(b"host", b"soomei.cc"), *headers],
+            }
+        )
+
+    first = cards.visitor_public_card(profile, "ana", is_owner=False, card=card, request=request())
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    revisit = cards.visitor_public_card(
+        profile, "ana", is_owner=False, card=card, request=request([(b"if-none-match", f"W/{etag}".encode())])
+    )
+    assert revisit.status_code == 304
+    assert revisit.body == b""
+
+    stale = cards.visitor_public_card(
+        profile, "ana", is_owner=False, card=card, request=request([(b"if-none-match", b'"outro"')])
+    )
+    assert stale.status_code == 200
+    assert stale.body == first.body
+
+    owner = cards.visitor_public_card(profile, "ana", is_owner=True, card=card, request=request())
+    assert "etag" not in owner.headers
+
+
+def test_visitor_card_revisit_gets_304_after_view_count_changes(monkeypatch):
+    from starlette.requests import Request
+
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards._referral_service.repository, "active_badge", lambda _uid: None)
+    profile = {"full_name": "Ana Souza", "links": []}
+    card = {"uid": "uidana", "vanity": "ana", "status": "active", "pin": "123456", "metrics": {"views": 7}}
+
+    def request(headers=()):
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "https",
+                "path": "/ana",
+                "query_string": b"",
+                "headers": [(b"host", b"soomei.cc"), *headers],
+            }
+        )
+
+    first = cards.visitor_public_card(profile, "ana", is_owner=False, card=card, request=request())
+    etag = first.headers["etag"]
+
+    counted = {**card, "metrics": {"views": 8}}
+    revisit = cards.visitor_public_card(
+        profile, "ana", is_owner=False, card=counted, request=request([(b"if-none-match", etag.encode())])
+    )
+    assert revisit.status_code == 304
+    assert revisit.headers["etag"] == etag
+
+    # Depois do TTL/eviction o corpo e renderizado de novo, mas o ETag igual ainda vira 304
+    with cards._visitor_html_lock:
+        cards._visitor_html_cache.clear()
+        cards._visitor_html_bytes = 0
+    expired = cards.visitor_public_card(
+        profile, "ana", is_owner=False, card=counted, request=request([(b"if-none-match", etag.encode())])
+    )
+    assert expired.status_code == 304
+    assert expired.headers["etag"] == etag
+    assert expired.body == b""
+
+
+def test_qr_data_url_falls_back_through_payloads_then_svg():
+    def png_only_short(payload: str) -> bytes:
+        if len(payload) > 10:
+            raise ValueError("payload grande demais")
+        return b"png"
+
+    assert cards._qr_data_url(("x" * 20, "curto"), render_png=png_only_short) == "data:image/png;base64,cG5n"
+    assert cards._qr_data_url(("x" * 20,), render_png=png_only_short).startswith("data:image/svg+xml;base64,")
+    assert cards._qr_data_url(("x" * 8000,)) == ""
+
+
+def test_qr_png_route_reuses_cached_png_and_honours_etag(monkeypatch):
+    from starlette.requests import Request
+
+    monkeypatch.setattr(cards, "_find_card", lambda _slug: ({}, "uidana", {"uid": "uidana", "vanity": "ana"}))
+    cards._qr_png_bytes.cache_clear()
+
+    def request(headers=()):
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "https",
+                "path": "/q/ana.png",
+                "query_string": b"",
+                "headers": [(b"host", b"soomei.cc"), *headers],
+            }
+        )
+
+    first = cards.qr("ana", request())
+    assert first.media_type == "image/png"
+    assert first.body.startswith(b"\x89PNG")
+    assert first.headers["cache-control"] == "public, max-age=3600"
+
+    again = cards.qr("ana", request([(b"if-none-match", first.headers["etag"].encode())]))
+    assert again.status_code == 304
+    assert cards._qr_png_bytes.cache_info().hits == 1
+
+
+def test_fold_vcard_b64_matches_76_column_folding():
+    import base64
+
+    raw = bytes(range(256)) * 3
+    encoded = base64.b64encode(raw).decode("ascii")
+    expected = "\r\n ".join(encoded[i : i + 76] for i in range(0, len(encoded), 76))
+
+    assert cards._fold_vcard_b64(raw) == expected
+    assert cards._fold_vcard_b64(b"") == ""
+
+
+def test_vcard_route_caches_photo_line_and_answers_304(tmp_path, monkeypatch):
+    from PIL import Image
+    from starlette.requests import Request
+
+    Image.new("RGB", (40, 40), "red").save(tmp_path / "ana.jpg")
+    monkeypatch.setattr(cards, "UPLOADS_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        cards,
+        "_find_card_with_profile",
+        lambda _slug: (
+            "uidana",
+            {"uid": "uidana", "vanity": "ana", "user": "ana@x"},
+            {"full_name": "Ana", "photo_url": "/static/uploads/ana.jpg?v=1"},
+        ),
+    )
+    cards._vcard_photo_line.cache_clear()
+
+    def request(headers=()):
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "https",
+                "path": "/v/ana.vcf",
+                "query_string": b"",
+                "headers": [(b"host", b"soomei.cc"), *headers],
+            }
+        )
+
+    first = cards.vcard("ana", request())
+    assert b"PHOTO;ENCODING=b;TYPE=JPEG:" in first.body
+    second = cards.vcard("ana", request())
+    assert second.body == first.body
+    assert cards._vcard_photo_line.cache_info().hits == 1
+
+    revisit = cards.vcard("ana", request([(b"if-none-match", first.headers["etag"].encode())]))
+    assert revisit.status_code == 304
+    assert cards._vcard_photo_line.cache_info().hits == 1
+
+
+def test_vcard_photo_line_encodes_from_mmap_and_skips_empty_files(tmp_path):
+    raw = bytes(range(256)) * 4
+    (tmp_path / "foto.png").write_bytes(raw)
+    (tmp_path / "vazia.jpg").write_bytes(b"")
+    cards._vcard_photo_line.cache_clear()
+
+    line = cards._vcard_photo_line(str(tmp_path / "foto.png"), 1)
+    assert line == f"PHOTO;ENCODING=b;TYPE=PNG:{cards._fold_vcard_b64(raw)}"
+    assert cards._vcard_photo_line(str(tmp_path / "vazia.jpg"), 1) == ""
+
+
+def test_offline_page_qr_is_reused_between_visits(monkeypatch):
+    from starlette.requests import Request
+
+    monkeypatch.setattr(cards, "BRAND_FOOTER", lambda value: value)
+    monkeypatch.setattr(cards, "current_user_email", lambda _request: None)
+    cards._offline_vcard_qr.cache_clear()
+    card = {"uid": "uidana", "status": "active", "user": "ana@x", "vanity": "ana"}
+    profile = {"full_name": "Ana", "whatsapp": "+55 11 99999-8888"}
+    monkeypatch.setattr(cards, "_find_card_with_profile", lambda _slug: ("uidana", card, profile))
+
+    def visit():
+        request = Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "https",
+                "path": "/ana",
+                "query_string": b"offline=1",
+                "headers": [(b"host", b"soomei.cc")],
+                "app": SimpleNamespace(state=SimpleNamespace(templates=object())),
+            }
+        )
+        return cards._serve_slug("ana", request)
+
+    first = visit()
+    second = visit()
+    assert "data:image/png;base64," in first.body.decode("utf-8")
+    assert second.body == first.body
+    assert cards._offline_vcard_qr.cache_info().misses == 1
+    assert cards._offline_vcard_qr.cache_info().hits == 1
+
+
+def test_pix_amount_page_injects_brand_footer_once(monkeypatch):
+    from starlette.requests import Request
+
+    from api.app import _brand_footer_inject
+
+    calls = []
+
+    def footer(value):
+        calls.append(value)
+        return _brand_footer_inject(value)
+
+    monkeypatch.setattr(cards, "BRAND_FOOTER", footer)
+    monkeypatch.setattr(cards, "current_user_email", lambda _request: None)
+    cards._pix_amount_page.cache_clear()
+    card = {"uid": "uidana", "status": "active", "user": "ana@x", "vanity": "ana"}
+    profile = {"full_name": "Ana", "pix_key": "ana@x"}
+    monkeypatch.setattr(cards, "_find_card_with_profile", lambda _slug: ("uidana", card, profile))
+
+    def visit():
+        request = Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "https",
+                "path": "/ana",
+                "query_string": b"pix=amount",
+                "headers": [(b"host", b"soomei.cc")],
+                "app": SimpleNamespace(state=SimpleNamespace(templates=object())),
+            }
+        )
+        return cards._serve_slug("ana", request)
+
+    first = visit().body.decode("utf-8")
+    second = visit().body.decode("utf-8")
+    assert second == first
+    assert "soomei-watermark" in first and "{footer_action_html}" not in first
+    assert first.index("</main>") < first.index("soomei-footer-mark")
+    assert len(calls) == 1
+    assert cards._pix_amount_page.cache_info().hits == 1
+
+
+def test_offline_vcards_share_header_and_footer():
+    with_photo, basic = cards._offline_vcards("Ana", "", "5511999998888", "", "https://soomei.cc/ana", "PHOTO;VALUE=URI:x")
+
+    assert basic == "BEGIN:VCARD\r\nVERSION:3.0\r\nFN:Ana\r\nTEL;TYPE=CELL:5511999998888\r\nURL:https://soomei.cc/ana\r\nEND:VCARD"
+    assert with_photo == basic.replace("FN:Ana\r\n", "FN:Ana\r\nPHOTO;VALUE=URI:x\r\n")
+    assert cards._offline_vcards("Ana", "Dev", "", "a@b.c", "u") == (
+        "BEGIN:VCARD\r\nVERSION:3.0\r\nFN:Ana\r\nTITLE:Dev\r\nEMAIL:a@b.c\r\nURL:u\r\nEND:VCARD",
+    )
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from api.routers import hooks
+
+
+def test_themembers_maps_billing_status_to_card_status(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        hooks._sql_repo,
+        "update_card_status",
+        lambda uid, status, billing_status=None: calls.append((uid, status, billing_status)),
+    )
+
+    assert hooks.themembers({"uid": "c1", "status": "delinquent"}) == {"ok": True}
+    assert hooks.themembers({"uid": "c2"}) == {"ok": True}
+    assert hooks.themembers({"uid": "c3", "status": "trial"}) == {"ok": True}
+    assert hooks.themembers({"status": "blocked"}) == {"ok": True}
+
+    assert calls == [("c1", "blocked", "delinquent"), ("c2", "active", "ok")]
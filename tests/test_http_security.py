@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.core.http_security import SecurityHeadersMiddleware
+
+
+def _client(enforce_hsts: bool) -> TestClient:
+    def plain(_request):
+        return PlainTextResponse("ok")
+
+    def framed(_request):
+        return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    app = Starlette(routes=[Route("/", plain), Route("/framed", framed)])
+    app.add_middleware(SecurityHeadersMiddleware, enforce_hsts=enforce_hsts)
+    return TestClient(app)
+
+
+def test_security_headers_are_added_once_and_keep_route_overrides():
+    client = _client(enforce_hsts=False)
+
+    response = client.get("/")
+    assert response.headers["content-security-policy"].startswith("default-src 'self'; img-src 'self' data:;")
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["referrer-policy"] == "no-referrer-when-downgrade"
+    assert "strict-transport-security" not in response.headers
+
+    framed = client.get("/framed")
+    assert framed.headers.get_list("x-frame-options") == ["SAMEORIGIN"]
+
+
+def test_security_headers_include_hsts_when_enforced():
+    response = _client(enforce_hsts=True).get("/")
+    assert response.headers["strict-transport-security"] == "max-age=31536000; includeSubDomains"
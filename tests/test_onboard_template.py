@@ -184,13 +184,13 @@ def test_cards_utility_pages_and_error_states_use_shared_design():
 
 def test_pages_and_edit_modal_use_redesigned_fallbacks():
     pages = Path("api/routers/pages.py").read_text(encoding="utf-8-sig")
-    edit = Path("api/routers/card_edit.py").read_text(encoding="utf-8-sig")
+    edit_js = Path("web/js/edit.js").read_text(encoding="utf-8")
     slug = Path("api/routers/slug.py").read_text(encoding="utf-8-sig")
 
     assert "Termos indisponíveis" in pages
     assert "class='status-card carbon'" in pages
-    assert "slug-modal-card carbon" in edit
-    assert "slug-modal-preview" in edit
-    assert "soomei.cc/" in edit
+    assert "slug-modal-card carbon" in edit_js
+    assert "slug-modal-preview" in edit_js
+    assert "soomei.cc/" in edit_js
     assert "_slug_message_response" in slug
     assert "class='slug-card carbon'" in slug
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import os
+
+from api.routers import pages
+
+
+def test_legal_terms_html_is_reused_until_file_changes(tmp_path, monkeypatch):
+    terms = tmp_path / "terms.txt"
+    terms.write_text("Termo <1>\nLinha 2", encoding="utf-8")
+    monkeypatch.setattr(pages, "_legal_terms_cache", None)
+
+    first = pages._legal_terms_html(str(terms))
+    assert first == "Termo &lt;1&gt;<br>Linha 2"
+    assert pages._legal_terms_html(str(terms)) is first
+
+    terms.write_text("Novo termo", encoding="utf-8")
+    stat = terms.stat()
+    os.utime(terms, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert pages._legal_terms_html(str(terms)) == "Novo termo"
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from api.core import security
+
+
+def test_verify_password_accepts_argon2_and_legacy_hashes():
+    modern = security.hash_password("s3nha")
+    assert security.verify_password("s3nha", modern)
+    assert not security.verify_password("outra", modern)
+
+    legacy = security._legacy_digest("s3nha").hex()
+    assert security.verify_password("s3nha", legacy)
+    assert not security.verify_password("outra", legacy)
+    assert security.verify_password("s3nha", legacy.upper())
+
+
+def test_verify_password_skips_scrypt_for_unusable_hashes(monkeypatch):
+    def _fail(_password):
+        raise AssertionError("scrypt nao deveria rodar")
+
+    monkeypatch.setattr(security, "_legacy_digest", _fail)
+    assert not security.verify_password("s3nha", "")
+    assert not security.verify_password("s3nha", None)
+    assert not security.verify_password("s3nha", "abc123")
+    assert not security.verify_password("s3nha", "zz" * 64)
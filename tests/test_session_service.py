@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from api.core import config as core_config
+from api.db import models
+from api.db import session as db_session
+from api.repositories.sql_repository import SQLRepository
+from api.services import session_service
+
+
+@pytest.fixture()
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'sessions.db'}")
+    core_config.get_settings.cache_clear()
+    db_session.get_engine.cache_clear()
+    db_session._get_sessionmaker.cache_clear()  # type: ignore[attr-defined]
+    engine = db_session.get_engine()
+    models.Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+    db_session.get_engine.cache_clear()
+    db_session._get_sessionmaker.cache_clear()  # type: ignore[attr-defined]
+    core_config.get_settings.cache_clear()
+
+
+def _request(token: str) -> SimpleNamespace:
+    return SimpleNamespace(cookies={session_service.SESSION_COOKIE_NAME: token})
+
+
+def test_sessions_revoked_in_the_store_stop_authenticating_immediately(temp_db):
+    # Revogacao feita por outro processo (admin, scripts) so e visivel pelo banco
+    repo = SQLRepository()
+    repo.upsert_user("ana@example.com", password_hash="hash")
+    token = session_service.issue_session("ana@example.com")
+    assert session_service.current_user_email(_request(token)) == "ana@example.com"
+
+    repo.delete_user_sessions("ana@example.com")
+
+    assert session_service.current_user_email(_request(token)) is None
+
+
+def test_delete_session_revokes_token(temp_db):
+    SQLRepository().upsert_user("bia@example.com", password_hash="hash")
+    token = session_service.issue_session("bia@example.com")
+    assert session_service.current_user_email(_request(token)) == "bia@example.com"
+
+    session_service.delete_session(token)
+
+    assert session_service.current_user_email(_request(token)) is None
+
+
+def test_delete_unknown_session_keeps_other_sessions(temp_db):
+    SQLRepository().upsert_user("caio@example.com", password_hash="hash")
+    token = session_service.issue_session("caio@example.com")
+
+    session_service.delete_session("token-inexistente")
+
+    assert session_service.current_user_email(_request(token)) == "caio@example.com"
@@ -134,9 +134,7 @@ def test_dashboard_aggregations(temp_db):
     repo.create_card("uidC", "123458", vanity="card-c")
     repo.update_card_status("uidA", "active")
     repo.update_card_status("uidB", "blocked")
-    repo.increment_card_views("uidA")
-    repo.increment_card_views("uidA")
-    repo.increment_card_views("uidB")
+    repo.add_card_views({"uidA": 2, "uidB": 1})
 
     counts = repo.dashboard_card_counts()
     top = repo.top_cards_by_views(limit=2)
@@ -157,3 +155,55 @@ def test_admin_session(temp_db):
     assert session.csrf_token == "csrf123"
     repo.delete_admin_session(token)
     assert repo.get_admin_session(token) is None
+
+
+def test_sqlite_engine_uses_wal_journal(temp_db):
+    with db_session.get_engine().connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+
+
+def test_get_card_by_slug_prefers_vanity_over_uid(temp_db):
+    repo = SQLRepository()
+    repo.create_card("shared", "123450", vanity="card-one")
+    repo.create_card("uidTwo", "123451", vanity="shared")
+
+    assert repo.get_card_by_slug("shared").uid == "uidTwo"
+    assert repo.get_card_by_slug("card-one").uid == "shared"
+    assert repo.get_card_by_slug("missing") is None
+
+
+def test_email_exists_is_case_insensitive(temp_db):
+    repo = SQLRepository()
+    repo.upsert_user("Bia@Example.com", password_hash="hash")
+
+    assert repo.email_exists(" bia@example.COM ")
+    assert not repo.email_exists("outra@example.com")
+    assert not repo.email_exists("")
+
+
+def test_get_card_with_profile_by_slug_joins_owner_profile(temp_db):
+    repo = SQLRepository()
+    repo.upsert_user("ana@example.com", password_hash="hash")
+    repo.create_card("uidana", "111111", vanity="ana", owner_email="ana@example.com")
+    repo.create_card("uidsem", "222222", vanity=None, owner_email=None)
+    repo.upsert_profile("ana@example.com", {"full_name": "Ana"})
+
+    card, profile = repo.get_card_with_profile_by_slug("ana")
+    assert card.uid == "uidana"
+    assert profile == {"full_name": "Ana"}
+
+    card, profile = repo.get_card_with_profile_by_slug("uidsem")
+    assert card.uid == "uidsem"
+    assert profile is None
+
+    assert repo.get_card_with_profile_by_slug("inexistente") == (None, None)
+
+
+def test_add_card_views_applies_batch(temp_db):
+    repo = SQLRepository()
+    repo.create_card("uidW", "123460", vanity="card-w")
+    repo.add_card_views({"uidW": 1})
+
+    repo.add_card_views({"uidW": 4, "missing": 2})
+
+    assert repo.get_card_by_uid("uidW").metrics_views == 5
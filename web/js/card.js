@@ -0,0 +1,382 @@
+// Script do cartao publico (/u/<slug>): compartilhar, Pix, modais, formulario de edicao,
+// carrossel do portfolio e secao offline. Servido com hash no nome e cache imutavel.
+(function(){
+  var __s = document.createElement('style');
+  if (__s) {
+    __s.textContent = '.is-hidden{display:none!important}';
+    document.head.appendChild(__s);
+  }
+  function getShareData(){
+    var pageUrl = window.location.href;
+    var text = "Este \u00e9 o meu Cart\u00e3o de Visita Digital" + " " + pageUrl;
+    return {url: pageUrl, text: text};
+  }
+  var shareBtn = document.getElementById('shareBtn');
+  if (shareBtn) {
+    shareBtn.addEventListener('click', function(e){
+      e.preventDefault();
+      var data = getShareData();
+      if (navigator.share) {
+        navigator.share({title: document.title, text: data.text}).catch(function(err){
+          if (err && err.name === 'AbortError') { return; }
+        });
+        return;
+      }
+      if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(data.url).then(function(){
+          shareBtn.textContent = 'Link copiado';
+          setTimeout(function(){ shareBtn.textContent = 'Compartilhar'; }, 1500);
+        }).catch(function(){});
+        return;
+      }
+      var ta = document.createElement('textarea');
+      ta.value = data.url;
+      ta.setAttribute('readonly','');
+      ta.style.position = 'absolute';
+      ta.style.left = '-9999px';
+      document.body.appendChild(ta);
+      ta.select();
+      try {
+        document.execCommand('copy');
+        shareBtn.textContent = 'Link copiado';
+        setTimeout(function(){ shareBtn.textContent = 'Compartilhar'; }, 1500);
+      } catch (_e) {}
+      document.body.removeChild(ta);
+    });
+  }
+  var pixBtn = document.getElementById('pixBtn');
+  if (pixBtn) {
+    pixBtn.addEventListener('click', function(e){
+      e.preventDefault();
+      var key = pixBtn.getAttribute('data-key') || '';
+      function fallbackCopy(){
+        var ta = document.createElement('textarea');
+        ta.value = key;
+        ta.setAttribute('readonly','');
+        ta.style.position='fixed';
+        ta.style.top='0';
+        ta.style.left='0';
+        ta.style.opacity='0';
+        document.body.appendChild(ta);
+        ta.focus(); ta.select(); ta.setSelectionRange(0, ta.value.length);
+        try {
+          if (document.execCommand('copy')) {
+            pixBtn.textContent = 'PIX copiado';
+            setTimeout(function(){ pixBtn.textContent = 'Copiar PIX'; }, 1500);
+          }
+        } catch (_e) {}
+        document.body.removeChild(ta);
+      }
+      if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(key).then(function(){
+          pixBtn.textContent = 'PIX copiado';
+          setTimeout(function(){ pixBtn.textContent = 'Copiar PIX'; }, 1500);
+        }).catch(fallbackCopy);
+      } else {
+        fallbackCopy();
+      }
+    });
+  }
+  (function(){
+    var spotlightBtn = document.getElementById('soomeiSpotlightBtn');
+    var spotlightModal = document.getElementById('soomeiSpotlightModal');
+    if (!spotlightBtn || !spotlightModal) return;
+    var lastFocus = null;
+    function openSpotlight(){
+      lastFocus = document.activeElement;
+      spotlightModal.classList.remove('is-hidden');
+      document.body.classList.add('spotlight-modal-open');
+      var closeBtn = spotlightModal.querySelector('[data-spotlight-close]');
+      if (closeBtn && closeBtn.focus) closeBtn.focus();
+    }
+    function closeSpotlight(){
+      spotlightModal.classList.add('is-hidden');
+      document.body.classList.remove('spotlight-modal-open');
+      if (lastFocus && lastFocus.focus) lastFocus.focus();
+    }
+    spotlightBtn.addEventListener('click', function(e){
+      e.preventDefault();
+      openSpotlight();
+    });
+    spotlightModal.addEventListener('click', function(e){
+      if (e.target && e.target.hasAttribute('data-spotlight-close')) closeSpotlight();
+    });
+    document.addEventListener('keydown', function(e){
+      if (e.key === 'Escape' && !spotlightModal.classList.contains('is-hidden')) closeSpotlight();
+    });
+  })();
+  (function(){
+    var shareCardBtn = document.getElementById('shareCardBtn');
+    if (!shareCardBtn) return;
+    var shareBackdrop = document.getElementById('shareBackdrop');
+    var sharePhone = document.getElementById('sharePhone');
+    var shareSend = document.getElementById('shareSend');
+    var shareCancel = document.getElementById('shareCancel');
+    var shareClose = document.getElementById('shareClose');
+    var shareError = document.getElementById('shareError');
+    function isMobile(){
+      return /Android|iPhone|iPad|iPod/i.test(navigator.userAgent || '');
+    }
+    function toggleShareError(msg){
+      if (!shareError) return;
+      if (msg){
+        shareError.textContent = msg;
+        shareError.style.display = 'block';
+      } else {
+        shareError.textContent = '';
+        shareError.style.display = 'none';
+      }
+    }
+    function openShareModal(){
+      if (!shareBackdrop) return;
+      toggleShareError('');
+      shareBackdrop.style.display = 'flex';
+      shareBackdrop.classList.add('show');
+      shareBackdrop.setAttribute('aria-hidden','false');
+      if (sharePhone){
+        sharePhone.focus();
+        sharePhone.select();
+      }
+    }
+    function closeShareModal(){
+      if (!shareBackdrop) return;
+      shareBackdrop.classList.remove('show');
+      shareBackdrop.style.display = 'none';
+      shareBackdrop.setAttribute('aria-hidden','true');
+      if (sharePhone) sharePhone.value = '';
+      toggleShareError('');
+    }
+    function sendViaModal(){
+      if (!sharePhone) return;
+      var digits = (sharePhone.value || '').replace(/\D/g,'');
+      if (digits.length < 10){
+        toggleShareError('Informe DDD + telefone com pelo menos 10 dígitos.');
+        return;
+      }
+      var shareData = getShareData();
+      var target = 'https://wa.me/' + digits + '?text=' + encodeURIComponent(shareData.text);
+      window.open(target, '_blank');
+      closeShareModal();
+    }
+    shareCardBtn.addEventListener('click', function(e){
+      e.preventDefault();
+      var shareData = getShareData();
+      if (navigator.share && isMobile()){
+        navigator.share({title: document.title, text: shareData.text}).catch(function(err){
+          if (err && err.name === 'AbortError') { return; }
+          window.location.href = 'https://wa.me/?text=' + encodeURIComponent(shareData.text);
+        });
+        return;
+      }
+      if (isMobile()){
+        window.location.href = 'https://wa.me/?text=' + encodeURIComponent(shareData.text);
+        return;
+      }
+      openShareModal();
+    });
+    if (shareSend) shareSend.addEventListener('click', function(e){ e.preventDefault(); sendViaModal(); });
+    if (shareCancel) shareCancel.addEventListener('click', function(e){ e.preventDefault(); closeShareModal(); });
+    if (shareClose) shareClose.addEventListener('click', function(e){ e.preventDefault(); closeShareModal(); });
+    if (shareBackdrop){
+      shareBackdrop.addEventListener('click', function(ev){
+        if (ev.target === shareBackdrop){ closeShareModal(); }
+      });
+    }
+    document.addEventListener('keydown', function(ev){
+      if (ev.key === 'Escape'){ closeShareModal(); }
+    });
+  })();
+var editForm = document.getElementById('editForm');
+var loaderCtrl = window.soomeiLoader || null;
+if (editForm) {
+  var saveBtn = document.getElementById('saveBtn');
+  var loaderEl = document.getElementById('formLoading');
+  var submitted = false;
+  var originalBtnText = saveBtn ? saveBtn.textContent : '';
+  var canAsyncSubmit = typeof window.fetch === 'function' && typeof window.FormData !== 'undefined';
+  var showLoader = function(){
+    if (loaderCtrl && loaderCtrl.show) {
+      loaderCtrl.show();
+    } else if (loaderEl) {
+      loaderEl.classList.add('show');
+      loaderEl.setAttribute('aria-hidden','false');
+    }
+  };
+  var hideLoader = function(){
+    if (loaderCtrl && loaderCtrl.hide) {
+      loaderCtrl.hide();
+    } else if (loaderEl) {
+      loaderEl.classList.remove('show');
+      loaderEl.setAttribute('aria-hidden','true');
+    }
+  };
+  var resetSubmission = function(message){
+    submitted = false;
+    hideLoader();
+    if (saveBtn) {
+      saveBtn.disabled = false;
+      saveBtn.textContent = originalBtnText || 'Salvar alteraçes';
+    }
+    if (message) {
+      alert(message);
+    }
+  };
+  editForm.addEventListener('submit', function(ev){
+    if (submitted) { return; }
+    if (typeof editForm.reportValidity === 'function') {
+      if (!editForm.reportValidity()) { return; }
+    } else if (typeof editForm.checkValidity === 'function' && !editForm.checkValidity()) {
+      return;
+    }
+    ev.preventDefault();
+    submitted = true;
+    showLoader();
+    if (saveBtn) { saveBtn.disabled = true; saveBtn.textContent = 'Salvando...'; }
+    if (canAsyncSubmit) {
+      var formData = new FormData(editForm);
+      fetch(editForm.action, {
+        method: 'POST',
+        body: formData,
+        credentials: 'same-origin',
+      }).then(function(response){
+        if (response.type === 'opaqueredirect') {
+          window.location.assign(editForm.action);
+          return;
+        }
+        if (response.redirected) {
+          window.location.assign(response.url);
+          return;
+        }
+        if (response.ok) {
+          return response.text().then(function(html){
+            document.open('text/html','replace');
+            document.write(html);
+            document.close();
+          });
+        }
+        return response.text().then(function(body){
+          var clean = (body || '').replace(/<[^>]+>/g, '').trim();
+          throw new Error(clean || 'Erro ao salvar. Tente novamente.');
+        });
+      }).catch(function(err){
+        console.error('Falha ao salvar edicao', err);
+        var msg = (err && err.message) || 'Não foi possível salvar. Verifique sua conexão e tente novamente.';
+        resetSubmission(msg);
+      });
+      return;
+    }
+    var submitAfterPaint = function(){
+      if (window.requestAnimationFrame) {
+        window.requestAnimationFrame(function(){
+          window.requestAnimationFrame(function(){ editForm.submit(); });
+        });
+      } else {
+        setTimeout(function(){ editForm.submit(); }, 16);
+      }
+    };
+    submitAfterPaint();
+  });
+}
+})();
+(function(){
+  var ring = document.querySelector('.portfolio-ring');
+  if (!ring) { return; }
+  var slides = ring.querySelectorAll('.portfolio-slide');
+  if (!slides.length) { return; }
+  var dots = document.querySelectorAll('.portfolio-dot');
+  var carousel = document.querySelector('.portfolio-carousel');
+  var total = slides.length;
+  var active = 0;
+  var timer = null;
+  var prefersReduce = false;
+  var startX = null;
+  var lastDx = 0;
+  var moved = false;
+  try {
+    prefersReduce = window.matchMedia && window.matchMedia('(prefers-reduced-motion: reduce)').matches;
+  } catch (_e) {}
+  function setActive(idx){
+    active = ((idx % total) + total) % total;
+    ring.style.setProperty('--active', active);
+    slides.forEach(function(slide, i){
+      slide.classList.toggle('is-active', i === active);
+    });
+    dots.forEach(function(dot, i){
+      var isCurrent = i === active;
+      dot.classList.toggle('is-active', isCurrent);
+      dot.setAttribute('aria-current', isCurrent ? 'true' : 'false');
+    });
+  }
+  function schedule(){
+    if (timer){ clearInterval(timer); }
+    if (prefersReduce){ return; }
+    timer = setInterval(function(){
+      setActive(active + 1);
+    }, 4200);
+  }
+  dots.forEach(function(dot){
+    dot.addEventListener('click', function(ev){
+      ev.preventDefault();
+      var idx = parseInt(dot.getAttribute('data-index') || '0', 10) || 0;
+      setActive(idx);
+      schedule();
+    });
+  });
+  if (carousel){
+    carousel.addEventListener('pointerdown', function(ev){
+      startX = ev.clientX;
+      moved = false;
+      lastDx = 0;
+      if (timer){ clearInterval(timer); }
+      try { carousel.setPointerCapture(ev.pointerId); } catch(_e){}
+    });
+    carousel.addEventListener('pointermove', function(ev){
+      if (startX === null) return;
+      var dx = ev.clientX - startX;
+      lastDx = dx;
+      if (Math.abs(dx) > 8){ moved = true; }
+    });
+    carousel.addEventListener('pointerup', function(ev){
+      if (startX === null) return;
+      if (Math.abs(lastDx) > 40){
+        var step = lastDx > 0 ? -1 : 1;
+        setActive(active + step);
+      } else if (!moved){
+        setActive(active + 1);
+      }
+      startX = null;
+      schedule();
+    });
+    carousel.addEventListener('mouseenter', function(){ if (timer) { clearInterval(timer); } });
+    carousel.addEventListener('mouseleave', function(){ schedule(); });
+    carousel.addEventListener('wheel', function(ev){
+      ev.preventDefault();
+      var delta = ev.deltaY || ev.deltaX || 0;
+      if (delta === 0) return;
+      setActive(active + (delta > 0 ? 1 : -1));
+      schedule();
+    }, { passive: false });
+  }
+  setActive(0);
+  schedule();
+})();
+(function(){
+  var off = document.getElementById('offlineBtn');
+  var sec = document.getElementById('offlineSection');
+  if (!off || !sec) return;
+  off.setAttribute('aria-controls', 'offlineSection');
+  off.setAttribute('aria-expanded', 'false');
+  function isVisible(el){
+    var cs = window.getComputedStyle(el);
+    return cs.display !== 'none';
+  }
+  off.addEventListener('click', function(e){
+    e.preventDefault();
+    var willHide = isVisible(sec);
+    sec.classList.toggle('is-hidden', willHide);
+    off.setAttribute('aria-expanded', (!willHide).toString());
+    if (!willHide) {
+      try { sec.scrollIntoView({ behavior: 'smooth', block: 'start' }); } catch(_e){}
+    }
+  });
+})();
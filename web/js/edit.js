@@ -0,0 +1,1133 @@
+// Script do editor (/edit/<slug>): secoes, indicacoes, destaque, links, foto, Pix e URL personalizada.
+// Valores por requisicao chegam em window.__SOOMEI_EDIT (ver card_edit.edit_card).
+(function(){
+  var backBtn = document.getElementById('backToCard');
+  if (backBtn){
+    backBtn.addEventListener('click', function(e){
+      e.preventDefault();
+      window.location.href='/' + window.__SOOMEI_EDIT.slug;
+    });
+  }
+  var collapseIndex = 0;
+  var collapseSections = document.querySelectorAll(".edit-section[data-collapsible='1']");
+  var editHero = document.querySelector('.edit-hero');
+  var backToEditMenu = document.getElementById('backToEditMenu');
+  var referralMessage = window.__SOOMEI_EDIT.referralShareMessage;
+  var referralCodeEl = document.getElementById('referralCode');
+  var copyReferralCode = document.getElementById('copyReferralCode');
+  var shareReferralInvite = document.getElementById('shareReferralInvite');
+  var referralShareBackdrop = document.getElementById('referralShareBackdrop');
+  var referralSharePhone = document.getElementById('referralSharePhone');
+  var referralShareSend = document.getElementById('referralShareSend');
+  var referralShareCancel = document.getElementById('referralShareCancel');
+  var referralShareClose = document.getElementById('referralShareClose');
+  var referralShareError = document.getElementById('referralShareError');
+  function copyText(text, btn, label){
+    function done(){ if(btn){ var old=btn.textContent; btn.textContent=label||'Copiado'; setTimeout(function(){btn.textContent=old;},1500); } }
+    if(navigator.clipboard && window.isSecureContext){
+      navigator.clipboard.writeText(text).then(done).catch(function(){});
+    } else {
+      var ta=document.createElement('textarea'); ta.value=text; ta.style.position='absolute'; ta.style.left='-9999px'; document.body.appendChild(ta); ta.select();
+      try{ document.execCommand('copy'); done(); }catch(_e){}
+      document.body.removeChild(ta);
+    }
+  }
+  if(copyReferralCode && referralCodeEl){
+    copyReferralCode.addEventListener('click', function(){ copyText(referralCodeEl.textContent || '', copyReferralCode, 'Código copiado'); });
+  }
+  function isMobile(){
+    return /Android|iPhone|iPad|iPod/i.test(navigator.userAgent || '');
+  }
+  function setReferralShareError(msg){
+    if(!referralShareError) return;
+    if(msg){
+      referralShareError.textContent = msg;
+      referralShareError.style.display = 'block';
+    } else {
+      referralShareError.textContent = '';
+      referralShareError.style.display = 'none';
+    }
+  }
+  function openReferralShareModal(){
+    if(!referralShareBackdrop) return;
+    setReferralShareError('');
+    referralShareBackdrop.style.display = 'flex';
+    referralShareBackdrop.classList.add('show');
+    referralShareBackdrop.setAttribute('aria-hidden','false');
+    if(referralSharePhone){
+      referralSharePhone.focus();
+      referralSharePhone.select();
+    }
+  }
+  function closeReferralShareModal(){
+    if(!referralShareBackdrop) return;
+    referralShareBackdrop.classList.remove('show');
+    referralShareBackdrop.style.display = 'none';
+    referralShareBackdrop.setAttribute('aria-hidden','true');
+    if(referralSharePhone) referralSharePhone.value = '';
+    setReferralShareError('');
+  }
+  function sendReferralViaWhatsApp(){
+    if(!referralSharePhone) return;
+    var digits = (referralSharePhone.value || '').replace(/\D/g,'');
+    if(digits.length < 10){
+      setReferralShareError('Informe DDD + telefone com pelo menos 10 dígitos.');
+      return;
+    }
+    window.open('https://wa.me/' + digits + '?text=' + encodeURIComponent(referralMessage), '_blank');
+    closeReferralShareModal();
+  }
+  if(shareReferralInvite){
+    shareReferralInvite.addEventListener('click', function(ev){
+      ev.preventDefault();
+      if(navigator.share && isMobile()){
+        navigator.share({title:'Convite Soomei', text:referralMessage}).catch(function(err){
+          if(err && err.name === 'AbortError') return;
+          window.location.href = 'https://wa.me/?text=' + encodeURIComponent(referralMessage);
+        });
+        return;
+      }
+      if(isMobile()){
+        window.location.href = 'https://wa.me/?text=' + encodeURIComponent(referralMessage);
+        return;
+      }
+      openReferralShareModal();
+    });
+  }
+  if(referralShareSend) referralShareSend.addEventListener('click', function(ev){ ev.preventDefault(); sendReferralViaWhatsApp(); });
+  if(referralShareCancel) referralShareCancel.addEventListener('click', function(ev){ ev.preventDefault(); closeReferralShareModal(); });
+  if(referralShareClose) referralShareClose.addEventListener('click', function(ev){ ev.preventDefault(); closeReferralShareModal(); });
+  if(referralShareBackdrop){
+    referralShareBackdrop.addEventListener('click', function(ev){
+      if(ev.target === referralShareBackdrop) closeReferralShareModal();
+    });
+  }
+  document.addEventListener('keydown', function(ev){
+    if(ev.key === 'Escape') closeReferralShareModal();
+  });
+  var sectionRegistry = {};
+  var guideButtons = Array.prototype.slice.call(document.querySelectorAll('[data-edit-jump]'));
+  collapseSections.forEach(function(section){
+    var head = section.querySelector('.section-head');
+    if (!head) return;
+    collapseIndex += 1;
+    section.classList.add('collapsible');
+    head.classList.add('collapsible-head');
+    var kicker = section.querySelector('.section-kicker');
+    if (kicker && kicker.parentElement === section && !head.contains(kicker)){
+      head.insertBefore(kicker, head.firstChild);
+    }
+    var targetId = 'collapse-section-' + collapseIndex;
+    var body = document.createElement('div');
+    body.className = 'collapsible-body';
+    body.id = targetId;
+    while (head.nextSibling){
+      body.appendChild(head.nextSibling);
+    }
+    section.appendChild(body);
+    var btn = document.createElement('button');
+    btn.type = 'button';
+    btn.className = 'collapse-btn';
+    btn.setAttribute('aria-expanded','true');
+    btn.setAttribute('data-target', targetId);
+    btn.innerHTML = "<span class='collapse-label'>Ocultar</span><span class='collapse-icon' aria-hidden='true'>&#9662;</span>";
+    head.appendChild(btn);
+    function setState(open){
+      if (open){
+        body.classList.remove('is-collapsed');
+        btn.classList.remove('is-collapsed');
+        btn.setAttribute('aria-expanded','true');
+        var label = btn.querySelector('.collapse-label');
+        if (label) label.textContent = 'Ocultar';
+      } else {
+        body.classList.add('is-collapsed');
+        btn.classList.add('is-collapsed');
+        btn.setAttribute('aria-expanded','false');
+        var label = btn.querySelector('.collapse-label');
+        if (label) label.textContent = 'Expandir';
+      }
+    }
+    btn.addEventListener('click', function(ev){
+      ev.preventDefault();
+      var open = btn.getAttribute('aria-expanded') !== 'true';
+      setState(open);
+    });
+    var panelKey = section.getAttribute('data-edit-panel') || '';
+    if (panelKey){
+      sectionRegistry[panelKey] = { section: section, open: setState };
+    }
+    var startCollapsed = section.getAttribute('data-collapsed') === '1';
+    setState(!startCollapsed);
+  });
+  function setGuideActive(key){
+    guideButtons.forEach(function(btn){
+      btn.classList.toggle('is-active', btn.getAttribute('data-edit-jump') === key);
+    });
+  }
+  function openEditPanel(key, shouldScroll){
+    var entry = sectionRegistry[key];
+    if (!entry) return;
+    Object.keys(sectionRegistry).forEach(function(name){
+      sectionRegistry[name].open(name === key);
+    });
+    setGuideActive(key);
+    if (backToEditMenu) backToEditMenu.classList.remove('is-hidden');
+    if (shouldScroll){
+      window.setTimeout(function(){
+        try{ entry.section.scrollIntoView({behavior:'smooth', block:'start', inline:'nearest'}); }catch(_e){}
+      }, 90);
+    }
+  }
+  function showEditMenu(){
+    if (backToEditMenu) backToEditMenu.classList.add('is-hidden');
+    if (editHero){
+      try{ editHero.scrollIntoView({behavior:'smooth', block:'start', inline:'nearest'}); }catch(_e){}
+    }
+  }
+  guideButtons.forEach(function(btn){
+    btn.addEventListener('click', function(ev){
+      ev.preventDefault();
+      openEditPanel(btn.getAttribute('data-edit-jump'), true);
+    });
+  });
+  if (backToEditMenu){
+    backToEditMenu.addEventListener('click', function(ev){
+      ev.preventDefault();
+      showEditMenu();
+    });
+  }
+  setGuideActive('perfil');
+  var form = document.getElementById('editForm');
+  var saveBtn = document.getElementById('saveBtn');
+  var primaryHint = document.getElementById('primaryInfoHint');
+  var requiredName = document.querySelector("input[id='fullName' name='full_name']");
+  var requiredTitle = document.querySelector("input[id='titleInput' name='title']");
+  var whatsappInput = document.getElementById('whatsapp');
+  var emailInput = document.querySelector("input[id='emailPublic' name='email_public']");
+  function hasValue(el){
+    return !!(el && typeof el.value === 'string' && el.value.trim());
+  }
+  function hasWhatsapp(){
+    if (!whatsappInput) return false;
+    return (whatsappInput.value || '').replace(/\D/g,'').length > 0;
+  }
+  function hasEmail(){
+    if (!emailInput) return false;
+    return !!(emailInput.value || '').trim();
+  }
+  function focusInvalidField(field){
+    if (!field) return;
+    var section = field.closest && field.closest(".edit-section[data-edit-panel]");
+    if (section){
+      var key = section.getAttribute('data-edit-panel');
+      if (key) openEditPanel(key, false);
+    }
+    var target = field.closest('.form-control') || field;
+    try{ target.scrollIntoView({behavior:'smooth', block:'center', inline:'nearest'}); }catch(_e){}
+    window.setTimeout(function(){
+      try{ field.focus({preventScroll:true}); }catch(_e){ try{ field.focus(); }catch(_e2){} }
+      try{ if (field.reportValidity) field.reportValidity(); }catch(_e3){}
+    }, 260);
+  }
+  function updatePrimaryState(){
+    var ok = hasValue(requiredName) && hasValue(requiredTitle) && (hasWhatsapp() || hasEmail());
+    if (saveBtn){
+      if (!ok){
+        saveBtn.disabled = true;
+        saveBtn.setAttribute('aria-disabled','true');
+        saveBtn.setAttribute('data-primary-lock','1');
+      } else if (saveBtn.getAttribute('data-primary-lock') === '1'){
+        saveBtn.disabled = false;
+        saveBtn.removeAttribute('aria-disabled');
+        saveBtn.removeAttribute('data-primary-lock');
+      }
+    }
+    if (primaryHint){
+      primaryHint.classList.toggle('is-error', !ok);
+    }
+    return ok;
+  }
+  [requiredName, requiredTitle, whatsappInput, emailInput].forEach(function(input){
+    if (!input) return;
+    input.addEventListener('input', updatePrimaryState);
+    input.addEventListener('blur', updatePrimaryState);
+  });
+  updatePrimaryState();
+  window.soomeiUploadProfilePhoto = async function(token, selectedPhoto){
+    if (!selectedPhoto) return null;
+    var photoDataUrl = await new Promise(function(resolve, reject){
+      var reader = new FileReader();
+      reader.onload = function(){ resolve(reader.result || ''); };
+      reader.onerror = function(){ reject(new Error('Nao foi possivel ler a foto.')); };
+      reader.readAsDataURL(selectedPhoto);
+    });
+    var photoResponse = await fetch(
+      '/edit/' + window.__SOOMEI_EDIT.slug + '/photo?csrf_token=' + encodeURIComponent(token || ''),
+      {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRF-Token': token || ''
+        },
+        body: JSON.stringify({
+          content_type: selectedPhoto.type || '',
+          filename: selectedPhoto.name || 'foto.jpg',
+          data_url: photoDataUrl
+        })
+      }
+    );
+    if (!photoResponse.ok) {
+      var photoDetail = 'Falha ao salvar a foto.';
+      try {
+        var photoPayload = await photoResponse.json();
+        if (photoPayload && photoPayload.detail) photoDetail = photoPayload.detail;
+      } catch (_photoParseError) {}
+      throw new Error(photoDetail);
+    }
+    return photoResponse.json();
+  };
+  if (form){
+    form.addEventListener('invalid', function(e){
+      focusInvalidField(e.target);
+    }, true);
+    form.addEventListener('submit', function(e){
+      var csrfInput = form.querySelector("input[name='csrf_token']");
+      if (csrfInput && csrfInput.value){
+        var csrfCookie = 'csrf_token=' + encodeURIComponent(csrfInput.value)
+          + '; Path=/; Max-Age=604800; SameSite=Strict';
+        if (window.location.protocol === 'https:') csrfCookie += '; Secure';
+        document.cookie = csrfCookie;
+      }
+      if (!updatePrimaryState()){
+        e.preventDefault();
+        e.stopPropagation();
+        if (!hasValue(requiredName)) focusInvalidField(requiredName);
+        else if (!hasValue(requiredTitle)) focusInvalidField(requiredTitle);
+        else if (whatsappInput) focusInvalidField(whatsappInput);
+        else if (emailInput) focusInvalidField(emailInput);
+        else if (primaryHint){
+          try{ primaryHint.scrollIntoView({behavior:'smooth', block:'center'}); }catch(_e){}
+          try{ primaryHint.focus({preventScroll:true}); }catch(_e){}
+        }
+        return;
+      }
+      e.preventDefault();
+      window.setTimeout(async function(){
+        var token = csrfInput ? csrfInput.value : '';
+        if (window.soomeiLoader && window.soomeiLoader.show) window.soomeiLoader.show();
+        try {
+          var photoControl = document.getElementById('photoInput');
+          var photoDataInput = document.getElementById('photoDataUrl');
+          var selectedPhoto = photoControl && photoControl.files && photoControl.files[0];
+          function readFileAsDataUrl(file) {
+            return new Promise(function(resolve, reject){
+              var reader = new FileReader();
+              reader.onload = function(){ resolve(reader.result || ''); };
+              reader.onerror = function(){ reject(new Error('Nao foi possivel ler a imagem.')); };
+              reader.readAsDataURL(file);
+            });
+          }
+          if (selectedPhoto && photoDataInput && !photoDataInput.value) {
+            photoDataInput.value = await readFileAsDataUrl(selectedPhoto);
+          }
+          if (photoDataInput && photoDataInput.value) {
+            window.soomeiImagePayloads = window.soomeiImagePayloads || {photo:'', cover:'', portfolio:{}};
+            window.soomeiImagePayloads.photo = photoDataInput.value;
+          }
+          var coverControl = document.getElementById('coverInput');
+          var coverDataInput = document.getElementById('coverDataUrl');
+          var selectedCover = coverControl && coverControl.files && coverControl.files[0];
+          if (selectedCover && coverDataInput && !coverDataInput.value) {
+            coverDataInput.value = await readFileAsDataUrl(selectedCover);
+          }
+          if (coverDataInput && coverDataInput.value) {
+            window.soomeiImagePayloads = window.soomeiImagePayloads || {photo:'', cover:'', portfolio:{}};
+            window.soomeiImagePayloads.cover = coverDataInput.value;
+          }
+          for (var pfIdx = 1; pfIdx <= 5; pfIdx += 1) {
+            var pfControl = document.getElementById('portfolioInput' + pfIdx);
+            var pfDataInput = document.getElementById('portfolioDataUrl' + pfIdx);
+            var pfFile = pfControl && pfControl.files && pfControl.files[0];
+            if (pfFile && pfDataInput && !pfDataInput.value) {
+              pfDataInput.value = await readFileAsDataUrl(pfFile);
+            }
+            if (pfDataInput && pfDataInput.value) {
+              window.soomeiImagePayloads = window.soomeiImagePayloads || {photo:'', cover:'', portfolio:{}};
+              window.soomeiImagePayloads.portfolio[pfIdx] = pfDataInput.value;
+            }
+          }
+          var formData = new FormData();
+          var controls = document.querySelectorAll('input[name], select[name], textarea[name]');
+          Array.prototype.forEach.call(controls, function(control){
+            if (!control.name || control.disabled || control === photoControl) return;
+            var type = (control.type || '').toLowerCase();
+            if (type === 'submit' || type === 'button' || type === 'reset') return;
+            if ((type === 'checkbox' || type === 'radio') && !control.checked) return;
+            if (type === 'file') return;
+            formData.append(control.name, control.value || '');
+          });
+          formData.set('csrf_token', token);
+          var imagePayloads = window.soomeiImagePayloads || {};
+          if (imagePayloads.photo) formData.set('photo_data_url', imagePayloads.photo);
+          if (imagePayloads.cover) formData.set('cover_data_url', imagePayloads.cover);
+          if (imagePayloads.portfolio) {
+            for (var imageIdx = 1; imageIdx <= 5; imageIdx += 1) {
+              if (imagePayloads.portfolio[imageIdx]) {
+                formData.set('portfolio_data_url' + imageIdx, imagePayloads.portfolio[imageIdx]);
+              }
+            }
+          }
+          var response = await fetch(form.action, {
+            method: 'POST',
+            body: formData,
+            credentials: 'same-origin',
+            headers: {'X-CSRF-Token': token},
+            redirect: 'follow'
+          });
+          if (response.ok) {
+            window.location.assign(response.url || ('/' + encodeURIComponent(window.__SOOMEI_EDIT.slug)));
+            return;
+          }
+          var detail = 'Falha ao salvar o perfil.';
+          try {
+            var payload = await response.json();
+            if (payload && payload.detail) detail = payload.detail;
+          } catch (_parseError) {}
+          window.alert(detail);
+        } catch (_requestError) {
+          window.alert('Falha de rede ao salvar o perfil.');
+        } finally {
+          if (window.soomeiLoader && window.soomeiLoader.hide) window.soomeiLoader.hide();
+        }
+      }, 0);
+    });
+  }
+  var togglePwd = document.getElementById('togglePassword');
+  var pwdFields = document.getElementById('passwordFields');
+  var pwdMode = document.getElementById('passwordMode');
+  if (togglePwd && pwdFields){
+    function setState(open){
+      if (open){
+        pwdFields.classList.remove('is-hidden');
+        togglePwd.textContent = 'Cancelar alteracao de senha';
+        togglePwd.setAttribute('aria-expanded','true');
+        if (pwdMode){ pwdMode.value = '1'; }
+      } else {
+        pwdFields.classList.add('is-hidden');
+        togglePwd.textContent = 'Alterar senha';
+        togglePwd.setAttribute('aria-expanded','false');
+        var inputs = pwdFields.querySelectorAll('input');
+        Array.prototype.forEach.call(inputs, function(inp){ inp.value = ''; });
+        if (pwdMode){ pwdMode.value = '0'; }
+      }
+    }
+    if (!togglePwd.getAttribute('onclick')) {
+      togglePwd.addEventListener('click', function(e){
+        e.preventDefault();
+        var open = pwdFields.classList.contains('is-hidden');
+        setState(open);
+      });
+    }
+    setState(false);
+  }
+})();
+(function(){
+  // Deixa os knobs dos switches animados mesmo sem CSS externo
+  function hydrateSwitch(selector){
+    var sw = document.querySelector(selector);
+    if (!sw) return;
+    var ui = sw.parentElement && sw.parentElement.querySelector('.switch-ui');
+    var knob = ui && ui.querySelector('.knob');
+    function paint(){
+      if (!ui || !knob) return;
+      if (sw.checked){
+        ui.style.setProperty('background', 'linear-gradient(135deg,#4f8cff,#73d6ff)', 'important');
+        knob.style.left = '22px';
+        knob.style.transform = 'translateX(0)';
+      } else {
+        ui.style.setProperty('background', 'rgba(255,255,255,.1)', 'important');
+        knob.style.left = '3px';
+        knob.style.transform = 'translateX(0)';
+      }
+      var label = sw.parentElement && (sw.parentElement.querySelector('[data-switch-label]') || sw.parentElement.querySelector('.muted'));
+      if (label) label.textContent = sw.checked ? 'Exibindo' : 'Oculto';
+    }
+    sw.addEventListener('click', function(){ setTimeout(paint, 0); });
+    sw.addEventListener('change', paint);
+    paint();
+  }
+  hydrateSwitch("input[id='googleReviewShow' name='google_review_show']");
+  hydrateSwitch("input[id='featuredEnabled' name='featured_enabled']");
+  hydrateSwitch("input[id='spotlightBadgeShow' name='spotlight_badge_show']");
+  hydrateSwitch("input[id='coverShow' name='cover_show']");
+  for (var linkSwitchIndex = 1; linkSwitchIndex <= 4; linkSwitchIndex++) {
+    hydrateSwitch("input[id='linkVisible" + linkSwitchIndex + "']");
+  }
+  var featuredColor = document.getElementById('featuredColor');
+  var featuredReset = document.getElementById('featuredColorReset');
+  if (featuredColor && featuredReset){
+    var defaultColor = (featuredColor.getAttribute('data-default-color') || window.__SOOMEI_EDIT.featuredDefaultColor).toLowerCase();
+    featuredReset.addEventListener('click', function(ev){
+      ev.preventDefault();
+      featuredColor.value = defaultColor;
+      featuredColor.dispatchEvent(new Event('input', { bubbles: true }));
+      featuredColor.dispatchEvent(new Event('change', { bubbles: true }));
+    });
+  }
+  const UID = window.__SOOMEI_EDIT.uid;
+  var csrfValue = window.__SOOMEI_EDIT.csrfToken;
+  window.soomeiCsrfToken = csrfValue;
+  var el = document.getElementById('whatsapp');
+  var form = document.getElementById('editForm');
+  if (!el) return;
+  function formatBR(v){
+    // só dígitos
+    var d = (v||'').replace(/\D/g,'');
+    // força DDI 55 no campo exibido
+    if (!d.startsWith('55')) d = '55' + d;
+    // 55 + 2 DDD + 9 número = 13 dígitos
+    d = d.slice(0, 13);
+    var cc  = d.slice(0,2);   // 55
+    var ddd = d.slice(2,4);   // DD
+    var num = d.slice(4);     // 9 dígitos
+    var p1 = num.slice(0,5);  // 90000
+    var p2 = num.slice(5,9);  // 0000
+    var out = '+' + cc;
+    if (ddd) out += ' (' + ddd + ')';
+    if (p1)  out += ' ' + p1;
+    if (p2)  out += '-' + p2;
+    return out;
+  }
+  function onInput(){
+    var before = el.value;
+    // numero completo ja formatado: formatBR devolveria o mesmo valor
+    if (/^\+55 \(\d{2}\) \d{5}-\d{4}$/.test(before)) return;
+    var start = el.selectionStart || before.length;
+    el.value = formatBR(before);
+    // ajuste simples do cursor
+    var diff = el.value.length - before.length;
+    var pos = start + (diff > 0 ? diff : 0);
+    try { el.setSelectionRange(pos, pos); } catch(_e){}
+  }
+  // formata ao focar/digitar e na carga inicial (se já vier número cru)
+  el.addEventListener('focus', onInput);
+  el.addEventListener('input', onInput);
+  if (/^\+?\d{11,13}$/.test((el.value||'').replace(/\s|[()\-]/g,''))) {
+    el.value = formatBR(el.value);
+  }
+  // no submit, envia apenas dígitos (ex.: 5534999999999)
+  if (form) {
+    form.addEventListener('submit', function(){
+      el.value = el.value.replace(/\D/g,'').slice(0,13);
+    }, true);
+  }
+  var style = document.createElement('style');
+  style.textContent = '.hint{font-size:12px;margin-top:4px}.ok{color:#7bd88f}.bad{color:#f88}'
+    + '#slugInput.is-ok{border-color:#43a047;background:rgba(67,160,71,0.09)}'
+    + '#slugInput.is-bad{border-color:#e53935;background:rgba(229,57,53,0.08)}'
+    + '.tooltip-err{display:inline-block;background:#2a2211;border:1px solid #4d3b12;color:#e5c17a;padding:6px 8px;border-radius:8px;margin-top:4px}'
+    + '.slug-input-row{position:relative;display:flex;align-items:center}'
+    + '.icon-btn.icon-sm{width:26px;height:26px;font-size:14px}'
+    + '.info-tip{position:absolute;right:0;top:100%;margin-top:6px;display:none;max-width:320px;background:#111114;border:1px solid #242427;border-radius:8px;padding:8px 10px;color:#eaeaea;box-shadow:0 2px 8px rgba(0,0,0,.45);z-index:1000}'
+    + '.info-tip.show{display:block}';
+    style.textContent +=
+      '.slug-modal-input{width:100%;text-transform:lowercase}';
+  document.head.appendChild(style);
+  var btn = document.getElementById('addSlug');
+  if (!btn) return;
+  var loaderCtl = window.soomeiLoader || null;
+  var CURRENT = (document.getElementById('slugKey')?.value || '').trim();
+  // referencias do modal, preenchidas uma vez em mountModal
+  var slugBackdrop = null, slugInput = null, slugMsg = null, slugPreview = null, slugSave = null, slugInfoTip = null;
+  function mountModal(){
+    if (slugBackdrop) return;
+    const html = `
+      <div class="modal-backdrop" id="slugBackdrop" role="dialog" aria-modal="true" aria-labelledby="slugTitle" style="display:none">
+        <div class="modal slug-modal-card carbon" id="slugModal">
+          <header class="slug-modal-header"><div><p class="slug-modal-kicker">Endereço público</p><h2 id="slugTitle">Alterar link do cartão</h2></div><button class="close slug-modal-close" id="slugClose" aria-label="Fechar">×</button></header>
+          <div class="slug-modal-body">
+            <p class="slug-modal-intro">Escolha um endereço curto, memorável e profissional para compartilhar seu cartão.</p>
+            <label class="slug-modal-label" for="slugInput">Novo link</label>
+            <div class="slug-input-row slug-modal-row">
+              <span class="slug-prefix">soomei.cc/</span>
+              <input class="slug-modal-input" id="slugInput" placeholder="seu-nome" pattern="[a-z0-9-]{3,30}" inputmode="url" autocomplete="off">
+              <button type="button" class="slug-info-btn" id="slugInfoBtn" aria-label="O que é um slug?" title="O que é um slug?">i</button>
+              <div id="slugInfoTip" class="info-tip slug-info-tip" role="tooltip" aria-hidden="true">Slug é o endereço curto da sua URL pública. Use 3-30 caracteres minúsculos, números ou hífen. Ex.: seu-nome</div>
+            </div>
+            <div id="slugMsg" class="hint slug-msg"></div>
+            <div class="slug-modal-preview"><span>Prévia</span><code id="slugPreview">/${CURRENT||''}</code></div>
+            <div class="slug-modal-tips"><span>✓ minúsculas</span><span>✓ números</span><span>✓ hífen</span></div>
+            <div class="slug-modal-actions"><button type="button" class="btn slug-submit" id="slugSave">Salvar novo link</button></div>
+          </div>
+        </div>
+      </div>`;
+    var tmp = document.createElement('div'); tmp.innerHTML = html; document.body.appendChild(tmp.firstElementChild);
+    slugBackdrop = document.getElementById('slugBackdrop');
+    slugInput = document.getElementById('slugInput');
+    slugMsg = document.getElementById('slugMsg');
+    slugPreview = document.getElementById('slugPreview');
+    slugSave = document.getElementById('slugSave');
+    slugInfoTip = document.getElementById('slugInfoTip');
+    // fechos
+    document.getElementById('slugClose').addEventListener('click', closeModal);
+    slugBackdrop.addEventListener('click', function(e){
+      if (e.target.id === 'slugBackdrop') closeModal();
+    });
+    document.addEventListener('keydown', function esc(e){
+      if (e.key === 'Escape') closeModal();
+    });
+    document.getElementById('slugInfoBtn').addEventListener('click', function(e){
+      e.preventDefault(); e.stopPropagation();
+      slugInfoTip.classList.toggle('show');
+      slugInfoTip.setAttribute('aria-hidden', slugInfoTip.classList.contains('show') ? 'false' : 'true');
+    });
+    document.addEventListener('click', function(){
+      slugInfoTip.classList.remove('show'); slugInfoTip.setAttribute('aria-hidden','true');
+    });
+  }
+  function openModal(){
+    mountModal();
+    slugBackdrop.classList.add('show'); slugBackdrop.style.display = 'flex';
+    slugInput.value = CURRENT || '';
+    slugInput.focus(); slugInput.select();
+    updatePreview();
+    // roda uma checagem inicial se já veio preenchido
+    if (slugInput.value) debounceCheck(slugInput.value);
+  }
+  window.soomeiOpenSlugModal = function(event){
+    if (event && event.preventDefault) event.preventDefault();
+    openModal();
+    return false;
+  };
+  function closeModal(){
+    if (slugBackdrop){ slugBackdrop.classList.remove('show'); slugBackdrop.style.display = 'none'; }
+  }
+  function updatePreview(){
+    slugPreview.textContent = '/' + (slugInput.value||'').trim().toLowerCase();
+  }
+  var tCheck;
+  function debounceCheck(v){
+    clearTimeout(tCheck);
+    tCheck = setTimeout(function(){ checkAvailability(v); }, 220);
+  }
+  async function checkAvailability(v){
+    var el = slugInput;
+    var msg = slugMsg;
+    v = (v||'').trim().toLowerCase();
+    if (!v){ msg.textContent=''; el.classList.remove('is-ok','is-bad'); return; }
+    if (v === CURRENT){
+      msg.innerHTML = '<span class="ok">Slug atual</span>';
+      el.classList.add('is-ok'); el.classList.remove('is-bad'); return;
+    }
+    if (!/^[a-z0-9-]{3,30}$/.test(v)){
+      msg.innerHTML = '<span class="bad">Use 3-30 minúsculos/números/hífen.</span>';
+      el.classList.remove('is-ok'); el.classList.add('is-bad'); return;
+    }
+    try{
+      var r = await fetch('/slug/check?value='+encodeURIComponent(v));
+      var j = await r.json();
+      if (j && j.available){
+        msg.innerHTML = '<span class="ok">Disponível</span>';
+        el.classList.add('is-ok'); el.classList.remove('is-bad');
+      } else {
+        msg.innerHTML = '<span class="bad">Indisponível</span>';
+        el.classList.add('is-bad'); el.classList.remove('is-ok');
+      }
+    }catch(_e){
+      msg.textContent=''; el.classList.remove('is-ok','is-bad');
+    }
+  }
+  // input listeners
+  document.addEventListener('input', function(e){
+    if (e.target && e.target.id === 'slugInput'){
+      var el = e.target;
+      var vv = (el.value||''); var ll = vv.toLowerCase(); if (vv !== ll) el.value = ll;
+      updatePreview();
+      debounceCheck(el.value);
+    }
+  }, true);
+  // enter para salvar
+  document.addEventListener('keydown', function(e){
+    if (e.key === 'Enter' && slugBackdrop && slugBackdrop.classList.contains('show')){
+      e.preventDefault();
+      slugSave.click();
+    }
+  }, true);
+  // salvar -> POST /slug/select/{uid} ; depois volta à edição com o novo slug
+  document.addEventListener('click', async function(e){
+    if (e.target && e.target.id === 'slugSave'){
+      e.preventDefault();
+      var el = slugInput;
+      var v = (el.value||'').trim().toLowerCase();
+      var msg = slugMsg;
+      var saveBtn = slugSave;
+      if (!/^[a-z0-9-]{3,30}$/.test(v)){
+        msg.innerHTML = '<span class="bad tooltip-err">Use 3-30 minúsculos/números/hífen.</span>';
+        try{ el.focus(); }catch(_e){}
+        return;
+      }
+      msg.innerHTML = '<span class="muted">Salvando novo link...</span>';
+      if (saveBtn){ saveBtn.disabled = true; saveBtn.textContent = 'Salvando...'; }
+      if (loaderCtl && loaderCtl.show){ loaderCtl.show(); }
+      try{
+        var resp = await fetch('/slug/select/'+encodeURIComponent(UID), {
+          method: 'POST',
+          headers: {
+            'Content-Type':'application/x-www-form-urlencoded',
+            'Accept':'application/json',
+            'X-Requested-With':'XMLHttpRequest',
+            'X-CSRF-Token': csrfValue
+          },
+          body: 'value='+encodeURIComponent(v)+'&csrf_token='+encodeURIComponent(csrfValue)
+        });
+        var payload = null;
+        try{ payload = await resp.json(); }catch(_jsonErr){ payload = null; }
+        if (resp.ok && payload && payload.ok){
+          window.location.assign(payload.edit_url || ('/edit/'+encodeURIComponent(payload.slug || v)));
+          return;
+        } else if (resp.status === 409){
+          msg.innerHTML = '<span class="bad">'+((payload && payload.message) || 'Indisponível, tente outro.')+'</span>';
+        } else {
+          msg.innerHTML = '<span class="bad">'+((payload && payload.message) || 'Erro ao salvar. Tente novamente.')+'</span>';
+        }
+        if (loaderCtl && loaderCtl.hide){ loaderCtl.hide(); }
+      }catch(_e){
+        if (loaderCtl && loaderCtl.hide){ loaderCtl.hide(); }
+        msg.innerHTML = '<span class="bad">Erro de rede. Tente novamente.</span>';
+      } finally {
+        if (saveBtn){ saveBtn.disabled = false; saveBtn.textContent = 'Salvar novo link'; }
+      }
+    }
+  }, true);
+  // abre modal
+  btn.addEventListener('click', window.soomeiOpenSlugModal);
+  async function salvarSlug(novo) {
+    return fetch("/slug/select/" + encodeURIComponent(UID), {
+      method: "POST",
+      headers: { "Content-Type": "application/x-www-form-urlencoded", "X-CSRF-Token": csrfValue },
+      body: "value=" + encodeURIComponent(novo) + "&csrf_token=" + encodeURIComponent(csrfValue)
+    });
+  }
+})();
+(function(){
+  var MAX_UPLOAD = window.__SOOMEI_EDIT.maxUploadBytes;
+  window.soomeiImagePayloads = window.soomeiImagePayloads || {
+    photo: '',
+    cover: '',
+    portfolio: {}
+  };
+  var input = document.getElementById('photoInput');
+  if (input) {
+    var img = document.getElementById('avatarImg');
+    var photoDataInput = document.getElementById('photoDataUrl');
+    input.addEventListener('change', function(){
+      var f = input.files && input.files[0];
+      if (!f) return;
+      var ok = /^(image\/jpeg|image\/png)$/i.test((f.type || ''));
+      if (!ok) { alert('Formato de imagem nao suportado (use JPEG ou PNG)'); input.value=''; return; }
+      if (f.size > MAX_UPLOAD) { alert('Imagem excede 2MB. Escolha uma foto menor.'); input.value=''; return; }
+      var reader = new FileReader();
+      reader.onload = function(evt){
+        var dataUrl = (evt && evt.target && evt.target.result) ? evt.target.result : '';
+        if (photoDataInput) photoDataInput.value = dataUrl;
+        window.soomeiImagePayloads.photo = dataUrl;
+        if (img && dataUrl) img.src = dataUrl;
+      };
+      reader.readAsDataURL(f);
+    });
+  }
+  var coverInput = document.getElementById('coverInput');
+  if (coverInput) {
+    var coverImg = document.getElementById('coverImg');
+        var coverPlaceholder = document.getElementById('coverPlaceholder');
+        var coverRemoveFlag = document.getElementById('coverRemoveFlag');
+        var coverDataInput = document.getElementById('coverDataUrl');
+        var coverShow = document.getElementById('coverShow');
+    coverInput.addEventListener('change', function(){
+      var f = coverInput.files && coverInput.files[0];
+      if (!f) return;
+      var ok = /^(image\/jpeg|image\/png)$/i.test((f.type || ''));
+      if (!ok) { alert('Formato de imagem nao suportado (use JPEG ou PNG)'); coverInput.value=''; return; }
+      if (f.size > MAX_UPLOAD) { alert('Imagem excede 2MB. Escolha uma foto menor.'); coverInput.value=''; return; }
+      var reader = new FileReader();
+      reader.onload = function(evt){
+        if (coverImg) {
+          coverImg.src = (evt && evt.target && evt.target.result) ? evt.target.result : '';
+          coverImg.style.display = coverImg.src ? 'block' : 'none';
+        }
+        if (coverPlaceholder && coverImg && coverImg.src) {
+          coverPlaceholder.style.display = 'none';
+        }
+        if (coverDataInput) coverDataInput.value = coverImg ? coverImg.src : '';
+        window.soomeiImagePayloads.cover = coverImg ? coverImg.src : '';
+        if (coverRemoveFlag) coverRemoveFlag.value = '0';
+        if (coverShow) {
+          coverShow.checked = true;
+          coverShow.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+      };
+      reader.readAsDataURL(f);
+    });
+    var coverRemove = document.getElementById('coverRemove');
+    if (coverRemove) {
+      coverRemove.addEventListener('click', function(ev){
+        ev.preventDefault();
+        if (coverImg) { coverImg.src = ''; coverImg.style.display = 'none'; }
+        if (coverPlaceholder) { coverPlaceholder.style.display = 'block'; }
+        if (coverRemoveFlag) { coverRemoveFlag.value = '1'; }
+        if (coverDataInput) { coverDataInput.value = ''; }
+        window.soomeiImagePayloads.cover = '';
+        if (coverInput) coverInput.value = '';
+        if (coverShow) {
+          coverShow.checked = false;
+          coverShow.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+      });
+    }
+  }
+  // Atualiza preview de cor imediatamente ao selecionar
+  var colorEl = document.getElementById('themeColor');
+  var prev = document.getElementById('colorPreview');
+  function hexToRgba(hex, alpha){
+    var m = /^#([0-9a-fA-F]{6})$/.exec(hex || '');
+    if (!m) return '';
+    var n = parseInt(m[1], 16);
+    var r = (n >> 16) & 255;
+    var g = (n >> 8) & 255;
+    var b = n & 255;
+    return 'rgba(' + r + ',' + g + ',' + b + ',' + alpha + ')';
+  }
+  function updateColor(){
+    if (!colorEl || !prev) return;
+    var c = (colorEl.value||'').trim();
+    if (/^#[0-9a-fA-F]{6}$/.test(c)) {
+      prev.style.backgroundColor = hexToRgba(c, 0.34);
+      prev.style.boxShadow = '0 16px 42px rgba(0,0,0,.32), inset 0 1px 0 rgba(255,255,255,.05), 0 0 0 1px ' + hexToRgba(c, 0.34);
+    }
+  }
+ if (colorEl && prev) {
+    colorEl.addEventListener('input', updateColor);
+    colorEl.addEventListener('change', updateColor);
+    // Inicializa preview na primeira carga
+    updateColor();
+  }
+ })();
+ // Modal de URL personalizada
+(function(){
+  var trigger = document.getElementById('manageCustomDomain');
+  var dataEl = document.getElementById('customDomainData');
+  var statusEl = document.getElementById('customDomainStatus');
+  if (!trigger || !dataEl || !statusEl) return;
+  var slugId = window.__SOOMEI_EDIT.slug;
+  function esc(str){
+    return (str || '').replace(/[&<>"']/g, function(ch){
+      return { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[ch] || ch;
+    });
+  }
+  var modal = document.createElement('div');
+  modal.className = 'modal-backdrop';
+  modal.setAttribute('role','dialog');
+  modal.setAttribute('aria-modal','true');
+  modal.setAttribute('aria-hidden','true');
+  modal.innerHTML = `
+  <div class='modal'>
+    <header>
+      <h2>URL personalizada</h2>
+      <button class='close' id='customDomainClose' aria-label='Fechar' title='Fechar'>&#10005;</button>
+    </header>
+    <div>
+      <p><strong>Como funciona:</strong></p>
+      <ol style='padding-left:18px;font-size:13px;color:#9aa0a6'>
+        <li>Crie um subdomínio exclusivo do seu site (ex.: nome.suaempresa.com).</li>
+        <li>Adicione um registro <strong>CNAME</strong> apontando para <code>${esc(window.__SOOMEI_EDIT.customDomainTarget)}</code>.</li>
+        <li>Envie o pedido para a Soomei aprovar e liberar o certificado SSL.</li>
+      </ol>
+      <label for='customDomainInput'>Domínio solicitado</label>
+      <input id='customDomainInput' placeholder='ex.: nome.suaempresa.com.br' style='width:100%;margin:8px 0;padding:10px;border-radius:10px;border:1px solid #2a2a2a;background:#0b0b0c;color:#eaeaea'>
+      <div class='panel-actions' style='margin-top:8px'>
+        <button id='customDomainSubmit' class='btn'>Enviar pedido</button>
+        <button id='customDomainCancelBtn' class='btn ghost'>Cancelar solicitação</button>
+        <button id='customDomainRemoveBtn' class='btn ghost' style='display:none'>Remover URL ativa</button>
+      </div>
+      <div id='customDomainFeedback' class='banner' style='display:none;margin-top:10px'></div>
+      <p class='muted hint'>Dica: mantenha o registro CNAME enquanto aguarda a validação para que o SSL seja emitido automaticamente.</p>
+    </div>
+  </div>`;
+  document.body.appendChild(modal);
+  var closeBtn = modal.querySelector('#customDomainClose');
+  var submitBtn = modal.querySelector('#customDomainSubmit');
+  var cancelBtn = modal.querySelector('#customDomainCancelBtn');
+  var removeBtn = modal.querySelector('#customDomainRemoveBtn');
+  var input = modal.querySelector('#customDomainInput');
+  var feedback = modal.querySelector('#customDomainFeedback');
+  function currentState(){
+    return {
+      status: (dataEl.getAttribute('data-status')||'').toLowerCase(),
+      active: dataEl.getAttribute('data-active')||'',
+      requested: dataEl.getAttribute('data-requested')||''
+    };
+  }
+  function statusLabel(code){
+    var labels = {
+      pending: 'Aguardando aprovação',
+      active: 'Ativo',
+      rejected: 'Reprovado',
+      disabled: 'Desativado'
+    };
+    return labels[code] || 'Sem solicitação';
+  }
+  function updateStatus(){
+    var state = currentState();
+    var parts = [];
+    if (state.active) parts.push('Ativo: https://' + esc(state.active));
+    if (state.status === 'pending' && state.requested) parts.push('Pendente: ' + esc(state.requested));
+    if (!parts.length) parts.push('Nenhuma URL personalizada configurada.');
+    statusEl.innerHTML = 'Status: <strong>' + esc(statusLabel(state.status)) + '</strong><br>' + parts.join('<br>');
+  }
+  function setState(partial){
+    if (typeof partial.status !== 'undefined') dataEl.setAttribute('data-status', partial.status || '');
+    if (typeof partial.active !== 'undefined') dataEl.setAttribute('data-active', partial.active || '');
+    if (typeof partial.requested !== 'undefined') dataEl.setAttribute('data-requested', partial.requested || '');
+    updateStatus();
+    updateButtons();
+  }
+  function updateButtons(){
+    var state = currentState();
+    if (state.status === 'pending' && state.requested){
+      input.value = state.requested;
+    } else if (state.active){
+      input.value = state.active;
+    } else {
+      input.value = '';
+    }
+    cancelBtn.style.display = (state.status === 'pending' && !!state.requested) ? '' : 'none';
+    removeBtn.style.display = state.active ? '' : 'none';
+  }
+  function setFeedback(msg, ok){
+    if (!feedback) return;
+    feedback.textContent = msg;
+    feedback.style.display = msg ? 'block' : 'none';
+    feedback.className = 'banner ' + (ok ? 'ok' : 'bad');
+  }
+  function hideModal(){
+    modal.classList.remove('show');
+    modal.setAttribute('aria-hidden','true');
+  }
+  function showModal(){
+    modal.classList.add('show');
+    modal.setAttribute('aria-hidden','false');
+    updateButtons();
+    setFeedback('', true);
+  }
+  function post(url, payload){
+    setFeedback('Enviando...', true);
+    var fd = new FormData();
+    if (payload && payload.host) fd.append('host', payload.host);
+    fetch(url, { method: 'POST', body: fd })
+      .then(function(resp){
+        return resp.json().then(function(data){ return { ok: resp.ok, data: data }; });
+      })
+      .then(function(res){
+        if (!res.ok){
+          var msg = (res.data && res.data.message) ? res.data.message : 'Falha ao processar solicitação.';
+          setFeedback(msg, false);
+          return;
+        }
+        if (typeof res.data.status !== 'undefined'){
+          dataEl.setAttribute('data-status', (res.data.status || '').toLowerCase());
+        }
+        if (typeof res.data.active_host !== 'undefined'){
+          dataEl.setAttribute('data-active', res.data.active_host || '');
+        }
+        if (typeof res.data.requested_host !== 'undefined'){
+          dataEl.setAttribute('data-requested', res.data.requested_host || '');
+        } else if (!res.data.requested_host){
+          dataEl.setAttribute('data-requested', '');
+        }
+        updateStatus();
+        updateButtons();
+        setFeedback('Tudo certo! Atualizamos sua solicitação.', true);
+      }).catch(function(){
+        setFeedback('Não foi possível concluir a solicitação.', false);
+      });
+  }
+  trigger.addEventListener('click', function(ev){
+    ev.preventDefault();
+    showModal();
+  });
+  modal.addEventListener('click', function(ev){
+    if (ev.target === modal) hideModal();
+  });
+  if (closeBtn) closeBtn.addEventListener('click', function(){
+    hideModal();
+  });
+  if (submitBtn) submitBtn.addEventListener('click', function(ev){
+    ev.preventDefault();
+    var v = (input.value || '').trim();
+    if (!v){
+      setFeedback('Informe o domínio que deseja usar.', false);
+      return;
+    }
+    post('/custom-domain/request/' + slugId, { host: v });
+  });
+  if (cancelBtn) cancelBtn.addEventListener('click', function(ev){
+    ev.preventDefault();
+    post('/custom-domain/withdraw/' + slugId);
+  });
+  if (removeBtn) removeBtn.addEventListener('click', function(ev){
+    ev.preventDefault();
+    if (!confirm('Remover a URL personalizada ativa? Isso desativa o domínio imediatamente.')) return;
+    post('/custom-domain/remove/' + slugId);
+  });
+  updateStatus();
+  updateButtons();
+})();
+ // Modal para escolher tipo e valor da chave Pix
+(function(){
+  var ap = document.getElementById('addPix');
+  if (!ap) return;
+  var modal = document.createElement('div');
+  modal.className = 'modal-backdrop';
+  modal.setAttribute('role','dialog');
+  modal.setAttribute('aria-modal','true');
+  modal.setAttribute('aria-hidden','true');
+  modal.innerHTML = `
+  <div class='modal'>
+    <header>
+      <h2>Adicionar chave Pix</h2>
+      <button class='close' id='pixClose' aria-label='Fechar' title='Fechar'>&#10005;</button>
+    </header>
+    <div>
+      <label for='pixType'>Tipo da chave</label>
+      <select id='pixType' style='width:100%;margin:8px 0;padding:10px;border-radius:10px;border:1px solid #2a2a2a;background:#0b0b0c;color:#eaeaea'>
+        <option value='aleatoria'>Aleatória</option>
+        <option value='email'>E-mail</option>
+        <option value='telefone'>Telefone</option>
+        <option value='cpf'>CPF</option>
+        <option value='cnpj'>CNPJ</option>
+      </select>
+      <label for='pixValue'>Valor da chave</label>
+      <input id='pixValue' placeholder='sua-chave' style='width:100%;margin:8px 0;padding:10px;border-radius:10px;border:1px solid #2a2a2a;background:#0b0b0c;color:#eaeaea'>
+      <div style='text-align:right'><a href='#' id='pixSave' class='btn'>Salvar</a></div>
+    </div>
+  </div>
+  `;
+  document.body.appendChild(modal);
+  function showM(){ modal.classList.add('show'); modal.setAttribute('aria-hidden','false'); }
+  function hideM(){ modal.classList.remove('show'); modal.setAttribute('aria-hidden','true'); }
+  ap.addEventListener('click', function(e){ e.preventDefault(); showM(); });
+  modal.addEventListener('click', function(e){ if(e.target===modal) hideM(); });
+  var close = modal.querySelector('#pixClose'); if (close) close.addEventListener('click', function(){ hideM(); });
+  var save = modal.querySelector('#pixSave');
+  var val = modal.querySelector('#pixValue');
+  var type = modal.querySelector('#pixType');
+  var hidden = document.getElementById('pixKey');
+  if (save && val && hidden){
+    save.addEventListener('click', function(e){ e.preventDefault();
+      var v = (val.value||'').trim(); if (!v) return;
+      hidden.value = v; hideM();
+      ap.textContent = 'Chave Pix definida';
+    });
+  }
+  // Remover chave Pix existente
+  var del = document.getElementById('pixDel');
+  var info = document.getElementById('pixInfo');
+  if (del && info && hidden){
+    del.addEventListener('click', function(e){
+      e.preventDefault();
+      hidden.value = '';
+      info.textContent = 'Chave Pix removida';
+    });
+  }
+})();
+(function(){
+  var MAX_SLOTS = 5;
+  var MAX_UPLOAD = window.__SOOMEI_EDIT.maxUploadBytes;
+  window.soomeiImagePayloads = window.soomeiImagePayloads || {photo:'', cover:'', portfolio:{}};
+  var toggle = document.getElementById('portfolioEnabled');
+  var toggleLabel = document.getElementById('portfolioToggleLabel');
+  var toggleUi = toggle ? toggle.nextElementSibling : null;
+  var toggleKnob = toggleUi ? toggleUi.querySelector('.knob') : null;
+  function syncToggle(state){
+    if (toggleLabel){
+      toggleLabel.textContent = state ? 'Exibindo' : 'Oculto';
+    }
+    if (toggleKnob){
+      toggleKnob.style.left = state ? '22px' : '3px';
+    }
+    if (toggleUi){
+      toggleUi.style.background = state ? '#3dd68c55' : '#2a2a2a';
+    }
+  }
+  function buildEmptyContent(idx){
+    return '<span class="placeholder">Foto ' + idx + '</span><div class="thumb-glow"></div>';
+  }
+  function wireSlot(idx){
+    var input = document.getElementById('portfolioInput' + idx);
+    var dataInput = document.getElementById('portfolioDataUrl' + idx);
+    var thumb = document.getElementById('pfThumb' + idx);
+    var removeFlag = document.getElementById('portfolioRemove' + idx);
+    var trigger = document.querySelector('[data-trigger="' + idx + '"]');
+    var remover = document.querySelector('[data-remove="' + idx + '"]');
+    function clearSlot(){
+      if (thumb){
+        thumb.classList.add('is-empty');
+        thumb.innerHTML = buildEmptyContent(idx);
+      }
+      if (removeFlag){ removeFlag.value = '1'; }
+      if (dataInput){ dataInput.value = ''; }
+      window.soomeiImagePayloads.portfolio[idx] = '';
+      if (input){ input.value = ''; }
+    }
+    if (trigger && input){
+      trigger.addEventListener('click', function(ev){
+        ev.preventDefault();
+        input.click();
+      });
+    }
+    if (remover){
+      remover.addEventListener('click', function(ev){
+        ev.preventDefault();
+        clearSlot();
+      });
+    }
+    if (input){
+      input.addEventListener('change', function(){
+        var f = (input.files && input.files[0]) || null;
+        if (!f){ return; }
+        var ok = /^(image\/jpeg|image\/png)$/i.test(f.type || '');
+        if (!ok){
+          alert('Formato de imagem nao suportado (use JPEG ou PNG).');
+          input.value = '';
+          return;
+        }
+        if (f.size > MAX_UPLOAD){
+          alert('Imagem excede 2MB. Escolha uma foto menor.');
+          input.value = '';
+          return;
+        }
+        var reader = new FileReader();
+        reader.onload = function(evt){
+          if (!thumb){ return; }
+          var src = (evt && evt.target && evt.target.result) ? evt.target.result : '';
+          thumb.classList.remove('is-empty');
+          thumb.innerHTML = '<img src="' + src + '" alt="Foto ' + idx + '"><div class="thumb-glow"></div>';
+          if (removeFlag){ removeFlag.value = '0'; }
+          if (dataInput){ dataInput.value = src; }
+          window.soomeiImagePayloads.portfolio[idx] = src;
+        };
+        reader.readAsDataURL(f);
+      });
+    }
+  }
+  for (var i = 1; i <= MAX_SLOTS; i += 1){
+    wireSlot(i);
+  }
+  if (toggle){
+    syncToggle(!!toggle.checked);
+    toggle.addEventListener('change', function(){
+      syncToggle(!!toggle.checked);
+    });
+  }
+})();